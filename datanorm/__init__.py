@@ -2,11 +2,96 @@
 
 # flake8: noqa
 
-from .datanorm_item import DatanormItem
-from .datanorm_files import (
-    DatanormBaseFile,
-    DatanormDiscountFile,
-    DatanormPriceFile,
-    DatanormProductGroupFile,
-    file_name_is_valid,
-)
+from importlib import import_module
+
+# typing is not imported at runtime, type checkers treat this name as True
+TYPE_CHECKING = False
+
+# public names and the submodules defining them, imported on first access
+_EXPORTS = {
+    "DatanormItem": "datanorm_item",
+    "unit_price": "datanorm_item",
+    "DatanormBaseFile": "datanorm_files",
+    "DatanormDiscountFile": "datanorm_files",
+    "DatanormPriceFile": "datanorm_files",
+    "DatanormProductGroupFile": "datanorm_files",
+    "file_name_is_valid": "datanorm_files",
+    "DatanormFieldIndex": "datanorm_index",
+    "DatanormIndex": "datanorm_index",
+    "DatanormManufacturerIndex": "datanorm_index",
+    "DatanormOffsetTable": "datanorm_index",
+    "DatanormBloomFilter": "datanorm_bloom",
+    "DatanormWriter": "datanorm_writer",
+    "DatanormProductGroup": "datanorm_groups",
+    "DatanormProductGroupTree": "datanorm_groups",
+    "DatanormCatalogue": "datanorm_catalogue",
+    "DatanormFederation": "datanorm_catalogue",
+    "enrich_with_prices": "datanorm_merge",
+    "DatanormValidationError": "datanorm_validator",
+    "validate": "datanorm_validator",
+    "DatanormConflict": "datanorm_conflicts",
+    "find_conflicts": "datanorm_conflicts",
+    "decode_item": "datanorm_serialization",
+    "decode_items": "datanorm_serialization",
+    "encode_item": "datanorm_serialization",
+    "encode_items": "datanorm_serialization",
+    "DatanormSharedCatalogue": "datanorm_shared",
+    "DatanormUnitOffer": "datanorm_shared",
+    "cheapest_per_unit": "datanorm_shared",
+    "DatanormCatalogueManager": "datanorm_manager",
+    "DatanormPriceStatistics": "datanorm_analytics",
+    "DatanormPriceTable": "datanorm_analytics",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    # the lazily imported names are not in the module namespace before first use
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .datanorm_item import DatanormItem, unit_price
+    from .datanorm_files import (
+        DatanormBaseFile,
+        DatanormDiscountFile,
+        DatanormPriceFile,
+        DatanormProductGroupFile,
+        file_name_is_valid,
+    )
+    from .datanorm_index import (
+        DatanormFieldIndex,
+        DatanormIndex,
+        DatanormManufacturerIndex,
+        DatanormOffsetTable,
+    )
+    from .datanorm_bloom import DatanormBloomFilter
+    from .datanorm_writer import DatanormWriter
+    from .datanorm_groups import DatanormProductGroup, DatanormProductGroupTree
+    from .datanorm_catalogue import DatanormCatalogue, DatanormFederation
+    from .datanorm_merge import enrich_with_prices
+    from .datanorm_validator import DatanormValidationError, validate
+    from .datanorm_conflicts import DatanormConflict, find_conflicts
+    from .datanorm_serialization import (
+        decode_item,
+        decode_items,
+        encode_item,
+        encode_items,
+    )
+    from .datanorm_shared import (
+        DatanormSharedCatalogue,
+        DatanormUnitOffer,
+        cheapest_per_unit,
+    )
+    from .datanorm_manager import DatanormCatalogueManager
+    from .datanorm_analytics import DatanormPriceStatistics, DatanormPriceTable
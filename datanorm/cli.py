@@ -0,0 +1,352 @@
+"""
+DATANORM Command Line Interface
+-------------------------------
+Bulk lookup, indexing, statistics and export of DATANORM files. All subcommands stream
+their output, so they can be piped and run in constant memory.
+"""
+
+import argparse
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
+import csv
+import datetime
+from decimal import Decimal
+from itertools import islice
+import json
+import os
+import sqlite3
+import sys
+import time
+from . import (
+    DatanormBaseFile,
+    DatanormBloomFilter,
+    DatanormDiscountFile,
+    DatanormFieldIndex,
+    DatanormIndex,
+    DatanormItem,
+    DatanormManufacturerIndex,
+    DatanormOffsetTable,
+    DatanormPriceFile,
+    DatanormProductGroupFile,
+    enrich_with_prices,
+    file_name_is_valid,
+    find_conflicts,
+    validate,
+)
+from .datanorm_catalogue import _load_current
+
+_EXPORT_BATCH_SIZE = 10000
+
+_FILE_TYPES = {
+    "base": DatanormBaseFile,
+    "price": DatanormPriceFile,
+    "wrg": DatanormProductGroupFile,
+    "rab": DatanormDiscountFile,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the ``datanorm`` console script.
+
+    Args:
+        argv (list[str] | None, optional): Command line arguments. Defaults to
+            sys.argv.
+
+    Returns:
+        int: Exit code
+    """
+    args = _build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # the consumer of the pipe stopped reading, e.g. "datanorm export | head"
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="datanorm", description="Handling DATANORM 4 files"
+    )
+    subparsers = parser.add_subparsers(required=True, metavar="command")
+
+    lookup = subparsers.add_parser(
+        "lookup", help="look up EAN/GTIN/Art.No. and print JSON lines"
+    )
+    lookup.add_argument("datanorm_file", help="DATANORM base file")
+    lookup.add_argument("--price", help="DATPREIS file to add the prices")
+    lookup.add_argument("--wrg", help="DATANORM.WRG file to add the group names")
+    lookup.add_argument(
+        "--ids", default="-", help="file with one ID per line (default: stdin)"
+    )
+    lookup.add_argument(
+        "--batch-size",
+        type=int,
+        default=_EXPORT_BATCH_SIZE,
+        help="number of IDs looked up per pass over the files",
+    )
+    lookup.set_defaults(func=_lookup)
+
+    index = subparsers.add_parser("index", help="manage lookup indexes")
+    index_commands = index.add_subparsers(required=True, metavar="command")
+    index_build = index_commands.add_parser("build", help="build a lookup index")
+    index_build.add_argument("datanorm_file", help="DATANORM base file")
+    index_build.add_argument(
+        "-o", "--output", help="index file (default: next to the DATANORM file)"
+    )
+    index_build.add_argument(
+        "--bloom",
+        help="bloom filter file for fast misses (default: next to the DATANORM file)",
+    )
+    index_build.add_argument(
+        "--manufacturers",
+        help="manufacturer index file (default: next to the DATANORM file)",
+    )
+    index_build.add_argument(
+        "--records",
+        help="record offset table for paging (default: next to the DATANORM file)",
+    )
+    index_build.add_argument(
+        "--fields",
+        help="index of EAN, matchcode, alt. article and reference number "
+        "(default: next to the DATANORM file)",
+    )
+    index_build.add_argument(
+        "--false-positive-rate",
+        type=float,
+        default=0.01,
+        help="false positive rate of the bloom filter",
+    )
+    index_build.set_defaults(func=_index_build)
+
+    stats = subparsers.add_parser("stats", help="print record counts and timing")
+    stats.add_argument("datanorm_files", nargs="+", help="DATANORM files")
+    stats.set_defaults(func=_stats)
+
+    export = subparsers.add_parser("export", help="export all articles")
+    export.add_argument("datanorm_file", help="DATANORM base file")
+    export.add_argument(
+        "--price", help="DATPREIS file to add the prices (merge join in one pass)"
+    )
+    export.add_argument(
+        "-f", "--format", choices=("csv", "jsonl", "sqlite"), default="jsonl"
+    )
+    export.add_argument(
+        "-o", "--output", help="output file (default: stdout, required for sqlite)"
+    )
+    export.set_defaults(func=_export)
+
+    validation = subparsers.add_parser(
+        "validate", help="check the structure of files, print errors as JSON lines"
+    )
+    validation.add_argument("datanorm_files", nargs="+", help="DATANORM files")
+    validation.add_argument(
+        "--type",
+        choices=tuple(_FILE_TYPES),
+        help="file type (default: derived from the file name)",
+    )
+    validation.add_argument(
+        "--workers", type=int, default=1, help="number of parallel processes"
+    )
+    validation.add_argument(
+        "--max-errors", type=int, help="stop after the given number of errors"
+    )
+    validation.set_defaults(func=_validate)
+
+    conflicts = subparsers.add_parser(
+        "conflicts",
+        help="find duplicate articles, shared EANs, orphaned and conflicting prices",
+    )
+    conflicts.add_argument("datanorm_file", help="DATANORM base file")
+    conflicts.add_argument("--price", help="DATPREIS file of the base file")
+    conflicts.add_argument(
+        "--partitions",
+        type=_positive_int,
+        default=16,
+        help="number of hash partitions, more partitions need less memory",
+    )
+    conflicts.set_defaults(func=_conflicts)
+
+    return parser
+
+
+def _lookup(args: argparse.Namespace) -> int:
+    base_file = DatanormBaseFile(args.datanorm_file)
+    # unreadable or stale index files are ignored, the lookup scans the file instead
+    base_file.index = _load_current(DatanormIndex, args.datanorm_file)
+    base_file.bloom_filter = _load_current(DatanormBloomFilter, args.datanorm_file)
+
+    price_file = DatanormPriceFile(args.price) if args.price else None
+    wrg_file = DatanormProductGroupFile(args.wrg) if args.wrg else None
+
+    with _open_input(args.ids) as id_lines:
+        ids = (line.strip() for line in id_lines)
+        ids = (id for id in ids if id)
+        while batch := list(islice(ids, args.batch_size)):
+            # indexed IDs are read with a seek each, the misses in a single pass
+            items = base_file.parse_many(batch)
+            if price_file is not None:
+                price_file.parse_many(items.values())
+            for id in batch:
+                di = items.get(id, DatanormItem())
+                if wrg_file is not None:
+                    wrg_file.parse(di)
+                record = {"id": id, **_jsonable(di)}
+                sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+    return 0
+
+
+def _index_build(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    manufacturer_index = DatanormManufacturerIndex(args.datanorm_file)
+    offset_table = DatanormOffsetTable(args.datanorm_file)
+    field_index = DatanormFieldIndex(args.datanorm_file)
+    index = DatanormIndex.build(
+        DatanormBaseFile(args.datanorm_file),
+        manufacturer_index,
+        offset_table,
+        field_index,
+    )
+    index.save(args.output)
+    manufacturer_index.save(args.manufacturers)
+    offset_table.save(args.records)
+    field_index.save(args.fields)
+    DatanormBloomFilter.build(
+        DatanormBaseFile(args.datanorm_file), args.false_positive_rate
+    ).save(args.bloom)
+    print(
+        f"indexed {len(index.offsets)} keys in {time.perf_counter() - start:.3f} s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _stats(args: argparse.Namespace) -> int:
+    for datanorm_file in args.datanorm_files:
+        start = time.perf_counter()
+        # the record counting is independent of the file type
+        records = DatanormBaseFile(datanorm_file).count_records()
+        stats = {
+            "file": datanorm_file,
+            "records": records,
+            "seconds": round(time.perf_counter() - start, 6),
+        }
+        sys.stdout.write(json.dumps(stats) + "\n")
+    return 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    base_file = DatanormBaseFile(args.datanorm_file)
+    if args.price:
+        items = enrich_with_prices(base_file, DatanormPriceFile(args.price))
+    else:
+        items = base_file.iter_items()
+
+    if args.format == "sqlite":
+        if not args.output:
+            print("export to sqlite requires --output", file=sys.stderr)
+            return 2
+        _export_sqlite(items, args.output)
+        return 0
+
+    if args.output:
+        output = open(args.output, "w", encoding="utf-8", newline="")
+    else:
+        output = nullcontext(sys.stdout)
+    with output as stream:
+        if args.format == "csv":
+            writer = csv.writer(stream)
+            writer.writerow(DatanormItem.fields())
+            writer.writerows(_rows(items))
+        else:
+            for di in items:
+                stream.write(json.dumps(_jsonable(di), ensure_ascii=False) + "\n")
+    return 0
+
+
+def _export_sqlite(items: Iterable[DatanormItem], path: str):
+    fields = DatanormItem.fields()
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS articles ({', '.join(fields)})"
+        )
+        insert = (
+            f"INSERT INTO articles ({', '.join(fields)}) "
+            f"VALUES ({', '.join('?' * len(fields))})"
+        )
+        rows = _rows(items)
+        while batch := list(islice(rows, _EXPORT_BATCH_SIZE)):
+            connection.executemany(insert, batch)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _validate(args: argparse.Namespace) -> int:
+    exit_code = 0
+    for datanorm_file in args.datanorm_files:
+        file_type = _FILE_TYPES.get(args.type) or _file_type(datanorm_file)
+        if file_type is None:
+            print(f"unknown file type of {datanorm_file}, use --type", file=sys.stderr)
+            exit_code = 2
+            continue
+        errors = validate(file_type(datanorm_file), args.workers, args.max_errors)
+        for error in errors:
+            record = {"file": datanorm_file, **error._asdict()}
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if errors and exit_code == 0:
+            exit_code = 1
+    return exit_code
+
+
+def _conflicts(args: argparse.Namespace) -> int:
+    price_file = DatanormPriceFile(args.price) if args.price else None
+    conflicts = find_conflicts(
+        DatanormBaseFile(args.datanorm_file), price_file, args.partitions
+    )
+    for conflict in conflicts:
+        sys.stdout.write(json.dumps(conflict._asdict(), ensure_ascii=False) + "\n")
+    return 1 if conflicts else 0
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _file_type(datanorm_file: str) -> type | None:
+    basename = os.path.basename(datanorm_file)
+    for file_type in _FILE_TYPES.values():
+        if file_name_is_valid(file_type, basename):
+            return file_type
+
+
+def _rows(items: Iterable[DatanormItem]) -> Iterator[tuple]:
+    for di in items:
+        yield tuple(_jsonable(di).values())
+
+
+def _jsonable(di: DatanormItem) -> dict:
+    """Converts the fields of a Datanorm item into JSON compatible values"""
+    record = di.to_dict()
+    for field, value in record.items():
+        if isinstance(value, Decimal):
+            record[field] = str(value)
+        elif isinstance(value, datetime.datetime):
+            record[field] = value.date().isoformat()
+    return record
+
+
+def _open_input(path: str):
+    if path == "-":
+        return nullcontext(sys.stdin)
+    return open(path, "r", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
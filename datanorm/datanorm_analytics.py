@@ -0,0 +1,261 @@
+"""
+DATANORM Analytics
+------------------
+Price statistics of a whole catalogue, grouped by main product group, product group,
+discount group or manufacturer. The prices are parsed once into columns, normalised to
+the price of a single unit and aggregated with vectorised numpy operations.
+
+Requires the optional numpy dependency: ``pip install datanorm[analytics]``
+"""
+
+from array import array
+from typing import NamedTuple
+from . import DatanormBaseFile, DatanormItem, DatanormPriceFile
+from .datanorm_item import _PRICE_UNITS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+GROUPINGS = ("main_product_group", "product_group", "discount_group", "manufacturer")
+
+_DISCOUNT_TYPES = {"0": 0, "1": 1, "2": 2, "3": 3}
+
+
+class DatanormPriceStatistics(NamedTuple):
+    count: int
+    retail_min: float
+    retail_median: float
+    retail_max: float
+    wholesale_min: float
+    wholesale_median: float
+    wholesale_max: float
+    margin_min: float
+    margin_median: float
+    margin_max: float
+
+
+class DatanormPriceTable:
+    retail: "np.ndarray"
+    wholesale: "np.ndarray"
+
+    def __init__(
+        self,
+        retail: "np.ndarray",
+        wholesale: "np.ndarray",
+        groups: dict[str, tuple["np.ndarray", list]],
+    ) -> None:
+        """Columns of the prices of a catalogue. Use build() to parse a catalogue.
+
+        Args:
+            retail (np.ndarray): Retail price per unit of each article, NaN if unknown
+            wholesale (np.ndarray): Wholesale price per unit of each article, NaN if
+                unknown
+            groups (dict[str, tuple[np.ndarray, list]]): Group codes of the articles
+                and group labels, indexed by group code, keyed by grouping
+        """
+        self.retail = retail
+        self.wholesale = wholesale
+        self._groups = groups
+
+    @classmethod
+    def build(
+        cls, base_file: DatanormBaseFile, price_file: DatanormPriceFile | None = None
+    ) -> "DatanormPriceTable":
+        """Parses the prices and groups of all articles in one pass over each file.
+
+        Args:
+            base_file (DatanormBaseFile): DATANORM base file
+            price_file (DatanormPriceFile | None, optional): DATPREIS file with the
+                prices of the articles. Defaults to None.
+
+        Raises:
+            ImportError: If numpy is not installed
+
+        Returns:
+            DatanormPriceTable: Price columns of the catalogue
+        """
+        if np is None:
+            raise ImportError(
+                "numpy is required for the price analytics, "
+                "install datanorm[analytics]"
+            )
+        encoding = base_file.encoding
+        labels = {grouping: dict() for grouping in GROUPINGS}
+        codes = {grouping: array("I") for grouping in GROUPINGS}
+        prices = array("q")
+        units = array("i")
+        records = dict()
+        duplicates = dict()
+        split_manufacturer = DatanormItem.split_manufacturer
+
+        for record_number, (_, line_a, line_b) in enumerate(base_file._iter_records()):
+            fields_a = line_a.decode(encoding).split(";", 13)
+            article_id = fields_a[2]
+            if records.setdefault(article_id, record_number) != record_number:
+                duplicates.setdefault(article_id, []).append(record_number)
+            prices.append(int(fields_a[9]) if fields_a[9].isdigit() else 0)
+            units.append(_PRICE_UNITS.get(fields_a[7], 0))
+            group_id = line_b.split(b";", 13)[11].decode(encoding)
+            keys = (
+                fields_a[11],
+                (fields_a[11], group_id),
+                fields_a[10],
+                split_manufacturer(fields_a[4])[0],
+            )
+            for grouping, key in zip(GROUPINGS, keys):
+                mapping = labels[grouping]
+                codes[grouping].append(mapping.setdefault(key, len(mapping)))
+
+        retail = np.frombuffer(prices, dtype=np.int64).astype(np.float64)
+        wholesale = np.zeros_like(retail)
+        if price_file is not None:
+            _apply_prices(price_file, records, duplicates, retail, wholesale)
+
+        # prices per single unit, articles without price or price unit are left out
+        units = np.frombuffer(units, dtype=np.int32)
+        divisor = np.where(units > 0, 100.0 * units, np.nan)
+        retail = np.where(retail > 0, retail / divisor, np.nan)
+        wholesale = np.where(wholesale > 0, wholesale / divisor, np.nan)
+
+        groups = {
+            grouping: (
+                np.frombuffer(codes[grouping], dtype=np.uint32),
+                list(labels[grouping]),
+            )
+            for grouping in GROUPINGS
+        }
+        return cls(retail, wholesale, groups)
+
+    def __len__(self) -> int:
+        return len(self.retail)
+
+    @property
+    def margin(self) -> "np.ndarray":
+        """Margin of each article relative to its retail price, NaN if unknown"""
+        return (self.retail - self.wholesale) / self.retail
+
+    def statistics(self, by: str = "product_group") -> dict:
+        """Computes min, median and max of the retail price, wholesale price and
+        margin of each group. Articles without the respective price are left out.
+
+        Args:
+            by (str, optional): Grouping, one of "main_product_group",
+                "product_group" (keyed by main product group and product group ID),
+                "discount_group" and "manufacturer". Defaults to "product_group".
+
+        Raises:
+            ValueError: If the grouping is unknown
+
+        Returns:
+            dict: DatanormPriceStatistics keyed by group
+        """
+        if by not in self._groups:
+            raise ValueError(f"Unknown grouping '{by}', use one of {GROUPINGS}")
+        codes, labels = self._groups[by]
+        counts = np.bincount(codes, minlength=len(labels))
+        columns = [
+            _grouped_min_median_max(codes, values, len(labels))
+            for values in (self.retail, self.wholesale, self.margin)
+        ]
+        summary = np.concatenate(columns, axis=1).tolist()
+        return {
+            label: DatanormPriceStatistics(int(count), *values)
+            for label, count, values in zip(labels, counts, summary)
+        }
+
+
+def _apply_prices(
+    price_file: DatanormPriceFile,
+    records: dict[str, int],
+    duplicates: dict[str, list[int]],
+    retail: "np.ndarray",
+    wholesale: "np.ndarray",
+):
+    """Updates the price columns with the entries of the price file in cents, the
+    same way DatanormPriceFile updates a single item. Later entries win.
+    """
+    entry_records = array("q")
+    price_types = array("b")
+    prices = array("q")
+    discount_types = array("b")
+    factors = array("q")
+
+    for _, line in price_file.iter_lines():
+        if not line.startswith(b"P"):
+            continue
+        # every price entry consists of 9 fields, following "P;A;"
+        fields = line.decode(price_file.encoding).rstrip("\r\n").split(";")
+        for start in range(2, len(fields) - 8, 9):
+            article_id, price_type, price, discount_type, factor = fields[
+                start : start + 5
+            ]
+            record_number = records.get(article_id)
+            if record_number is None or price_type not in ("1", "2"):
+                continue
+            if not price.isdigit():
+                continue
+            for record_number in (record_number, *duplicates.get(article_id, ())):
+                entry_records.append(record_number)
+                price_types.append(int(price_type))
+                prices.append(int(price))
+                discount_types.append(_DISCOUNT_TYPES.get(discount_type, -1))
+                factors.append(int(factor) if factor.isdigit() else 0)
+
+    entry_records = np.frombuffer(entry_records, dtype=np.int64)
+    price_types = np.frombuffer(price_types, dtype=np.int8)
+    prices = np.frombuffer(prices, dtype=np.int64).astype(np.float64)
+    discount_types = np.frombuffer(discount_types, dtype=np.int8)
+    factors = np.frombuffer(factors, dtype=np.int64)
+
+    # price type 1 sets the retail price and the discounted wholesale price
+    discounted = np.select(
+        [discount_types == 0, discount_types == 1, discount_types == 2],
+        [
+            prices,
+            np.round(prices * (1 - factors / 10000)),
+            np.round(prices * factors / 1000),
+        ],
+        np.round(prices * (1 + factors / 100)),
+    )
+    is_retail = price_types == 1
+    retail_entries = _last_per_record(entry_records, is_retail)
+    retail[entry_records[retail_entries]] = prices[retail_entries]
+
+    is_wholesale = (price_types == 2) | (is_retail & (discount_types >= 0))
+    values = np.where(is_retail, discounted, prices)
+    wholesale_entries = _last_per_record(entry_records, is_wholesale)
+    wholesale[entry_records[wholesale_entries]] = values[wholesale_entries]
+
+
+def _last_per_record(entry_records: "np.ndarray", mask: "np.ndarray") -> "np.ndarray":
+    """Indices of the last selected entry of each record"""
+    selected = np.flatnonzero(mask)
+    _, first_of_reversed = np.unique(entry_records[selected][::-1], return_index=True)
+    return selected[len(selected) - 1 - first_of_reversed]
+
+
+def _grouped_min_median_max(
+    codes: "np.ndarray", values: "np.ndarray", group_count: int
+) -> "np.ndarray":
+    """Min, median and max of the values of each group, NaN for groups without
+    values. The values are sorted by group and value once, so each statistic is a
+    lookup at the group boundaries.
+    """
+    known = ~np.isnan(values)
+    codes, values = codes[known], values[known]
+    order = np.lexsort((values, codes))
+    values = values[order]
+
+    counts = np.bincount(codes, minlength=group_count)
+    starts = np.cumsum(counts) - counts
+    result = np.full((group_count, 3), np.nan)
+    filled = counts > 0
+    starts, counts = starts[filled], counts[filled]
+    result[filled, 0] = values[starts]
+    result[filled, 1] = (
+        values[starts + (counts - 1) // 2] + values[starts + counts // 2]
+    ) / 2
+    result[filled, 2] = values[starts + counts - 1]
+    return result
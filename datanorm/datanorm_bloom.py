@@ -0,0 +1,194 @@
+"""
+DATANORM Bloom Filter
+---------------------
+Compact probabilistic set of the field values of the B records of a DATANORM base file,
+i.e. of every value a lookup matches an ID with: article number, EAN/GTIN, matchcode,
+alternative article number, reference number and the remaining fields. A negative
+answer is definite, so lookups of IDs missing in a file return without touching the
+file. Positive answers are wrong with the configured false positive rate.
+"""
+
+from collections.abc import Iterable
+from hashlib import blake2b
+import math
+import struct
+from . import DatanormBaseFile
+from .datanorm_files import file_signature
+
+
+class DatanormBloomFilter:
+    _MAGIC = b"DNBLOOM"
+    _VERSION = 2
+    _HEADER = struct.Struct("<7sBQBQqq")
+
+    datanorm_file: str
+    size: int
+    hash_count: int
+    count: int
+
+    def __init__(
+        self,
+        datanorm_file: str,
+        capacity: int,
+        false_positive_rate: float = 0.01,
+    ) -> None:
+        """Bloom filter over the field values of the B records of a DATANORM file.
+
+        Args:
+            datanorm_file (str): path to the DATANORM base file, the filter represents
+            capacity (int): Expected number of keys
+            false_positive_rate (float, optional): Probability of a false positive
+                answer at full capacity. Defaults to 0.01.
+        """
+        capacity = max(capacity, 1)
+        self.datanorm_file = datanorm_file
+        self.size = max(
+            8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._file_signature = file_signature(datanorm_file)
+
+    @classmethod
+    def build(
+        cls, base_file: DatanormBaseFile, false_positive_rate: float = 0.01
+    ) -> "DatanormBloomFilter":
+        """Builds the filter over all field values of the B records of the file.
+
+        Args:
+            base_file (DatanormBaseFile): DATANORM base file
+            false_positive_rate (float, optional): Probability of a false positive
+                answer. Defaults to 0.01.
+
+        Returns:
+            DatanormBloomFilter: Filter of the given file
+        """
+        keys = set()
+        for _, _, line_b in base_file._iter_records():
+            keys.update(base_file._search_keys(line_b))
+        return cls.from_keys(base_file.datanorm_file, keys, false_positive_rate)
+
+    @classmethod
+    def from_keys(
+        cls,
+        datanorm_file: str,
+        keys: Iterable[str],
+        false_positive_rate: float = 0.01,
+    ) -> "DatanormBloomFilter":
+        """Builds the filter from already collected keys. A filter, which does not
+        contain all field values of the B records, may only be used for lookups of
+        the contained keys.
+
+        Args:
+            datanorm_file (str): path to the DATANORM base file, the keys belong to
+            keys (Iterable[str]): Field values of the B records
+            false_positive_rate (float, optional): Probability of a false positive
+                answer. Defaults to 0.01.
+
+        Returns:
+            DatanormBloomFilter: Filter of the given keys
+        """
+        keys = keys if isinstance(keys, (list, set, dict)) else list(keys)
+        bloom_filter = cls(datanorm_file, len(keys), false_positive_rate)
+        bloom_filter.update(keys)
+        return bloom_filter
+
+    @staticmethod
+    def default_path(datanorm_file: str) -> str:
+        """Path of the filter file next to the DATANORM file"""
+        return f"{datanorm_file}.bloom"
+
+    def add(self, key: str):
+        """Adds a field value to the filter"""
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[str]):
+        """Adds several field values to the filter"""
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def is_stale(self) -> bool:
+        """Checks if the DATANORM file changed since the filter was built.
+
+        Returns:
+            bool: True if the filter does not match the DATANORM file anymore
+        """
+        return self._file_signature != file_signature(self.datanorm_file)
+
+    def save(self, path: str | None = None):
+        """Writes the filter to disk.
+
+        Args:
+            path (str | None, optional): Path of the filter file. Defaults to the
+                default path next to the DATANORM file.
+        """
+        path = path or self.default_path(self.datanorm_file)
+        with open(path, "wb") as file_obj:
+            file_obj.write(
+                self._HEADER.pack(
+                    self._MAGIC,
+                    self._VERSION,
+                    self.size,
+                    self.hash_count,
+                    self.count,
+                    *self._file_signature,
+                )
+            )
+            file_obj.write(self._bits)
+
+    @classmethod
+    def load(
+        cls, datanorm_file: str, path: str | None = None
+    ) -> "DatanormBloomFilter":
+        """Reads a filter from disk.
+
+        Args:
+            datanorm_file (str): path to the DATANORM base file, the filter represents
+            path (str | None, optional): Path of the filter file. Defaults to the
+                default path next to the DATANORM file.
+
+        Raises:
+            ValueError: If the file is not a DATANORM bloom filter
+
+        Returns:
+            DatanormBloomFilter: Loaded filter
+        """
+        path = path or cls.default_path(datanorm_file)
+        with open(path, "rb") as file_obj:
+            header = file_obj.read(cls._HEADER.size)
+            bits = bytearray(file_obj.read())
+        if len(header) != cls._HEADER.size:
+            raise ValueError(f"{path} is not a DATANORM bloom filter")
+        magic, version, size, hash_count, count, file_size, mtime = cls._HEADER.unpack(
+            header
+        )
+        if magic != cls._MAGIC or version != cls._VERSION or len(bits) * 8 < size:
+            raise ValueError(f"{path} is not a DATANORM bloom filter")
+
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.datanorm_file = datanorm_file
+        bloom_filter.size = size
+        bloom_filter.hash_count = hash_count
+        bloom_filter.count = count
+        bloom_filter._bits = bits
+        bloom_filter._file_signature = (file_size, mtime)
+        return bloom_filter
+
+    def _positions(self, key: str) -> list[int]:
+        """Bit positions of the key, using double hashing of a single digest"""
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        hash_1 = int.from_bytes(digest[:8], "little")
+        hash_2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(hash_1 + i * hash_2) % size for i in range(self.hash_count)]
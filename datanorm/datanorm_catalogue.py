@@ -0,0 +1,230 @@
+"""
+DATANORM Catalogues
+-------------------
+A catalogue groups the DATANORM files of a single supplier (base, price and product
+group file). The federation looks up articles in the catalogues of many suppliers
+concurrently.
+"""
+
+from collections.abc import Iterable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+import logging
+import os
+import threading
+import time
+from . import (
+    DatanormBaseFile,
+    DatanormBloomFilter,
+    DatanormFieldIndex,
+    DatanormIndex,
+    DatanormItem,
+    DatanormOffsetTable,
+    DatanormPriceFile,
+    DatanormProductGroupFile,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DatanormCatalogue:
+    name: str
+    base_file: DatanormBaseFile
+    price_file: DatanormPriceFile | None
+    product_group_file: DatanormProductGroupFile | None
+
+    def __init__(
+        self,
+        base_file: str,
+        price_file: str | None = None,
+        product_group_file: str | None = None,
+        name: str = "",
+    ) -> None:
+        """DATANORM files of a single supplier.
+
+        Args:
+            base_file (str): path to the DATANORM base file
+            price_file (str | None, optional): path to the DATPREIS file
+            product_group_file (str | None, optional): path to the DATANORM.WRG file
+            name (str, optional): Name of the supplier, used as tag of the items.
+                Defaults to the name of the directory of the base file.
+        """
+        directory = os.path.dirname(os.path.abspath(base_file))
+        self.name = name or os.path.basename(directory)
+        self.base_file = DatanormBaseFile(base_file)
+        self.price_file = DatanormPriceFile(price_file) if price_file else None
+        self.product_group_file = (
+            DatanormProductGroupFile(product_group_file) if product_group_file else None
+        )
+
+    def load_indexes(self):
+        """Attaches the index, bloom filter, offset table and field index files next
+        to the base file, if they exist, are readable and match the current base file.
+        """
+        path = self.base_file.datanorm_file
+        index = _load_current(DatanormIndex, path)
+        if index is not None:
+            self.base_file.index = index
+        bloom_filter = _load_current(DatanormBloomFilter, path)
+        if bloom_filter is not None:
+            self.base_file.bloom_filter = bloom_filter
+        offset_table = _load_current(DatanormOffsetTable, path)
+        if offset_table is not None:
+            self.base_file.offset_table = offset_table
+        field_index = _load_current(DatanormFieldIndex, path)
+        if field_index is not None:
+            self.base_file.field_index = field_index
+
+    def lookup(self, id: str) -> DatanormItem | None:
+        """Looks up an EAN/GTIN/Art.No. and adds the prices and product group names.
+
+        Args:
+            id (str): EAN/GTIN/Art.No. to search for
+
+        Returns:
+            DatanormItem | None: Datanorm item, tagged with the catalogue name
+        """
+        di = DatanormItem(self.name)
+        self.base_file.parse(di, id)
+        if not di.is_valid:
+            return
+        if self.price_file is not None:
+            self.price_file.parse(di)
+        if self.product_group_file is not None:
+            self.product_group_file.parse(di)
+        return di
+
+
+class DatanormFederation:
+    catalogues: list[DatanormCatalogue]
+
+    def __init__(
+        self,
+        catalogues: Iterable[DatanormCatalogue],
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        """Concurrent lookup in the catalogues of many suppliers.
+
+        Args:
+            catalogues (Iterable[DatanormCatalogue]): Catalogues to search
+            max_workers (int | None, optional): Number of threads of the default
+                thread pool. Defaults to one thread per catalogue.
+            executor (Executor | None, optional): Executor to run the lookups, e.g. a
+                ProcessPoolExecutor. Defaults to a thread pool owned by the
+                federation, which is shut down by close().
+        """
+        self.catalogues = list(catalogues)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers or max(1, len(self.catalogues)),
+            thread_name_prefix="datanorm",
+        )
+        # scans still running after a timed out lookup, by catalogue position
+        self._running: dict[int, Future] = dict()
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, id: str, first_hit: bool = False, timeout: float | None = None
+    ) -> list[DatanormItem]:
+        """Looks up an EAN/GTIN/Art.No. in all catalogues in parallel.
+
+        Args:
+            id (str): EAN/GTIN/Art.No. to search for
+            first_hit (bool, optional): Return as soon as a catalogue contains the
+                article and cancel the pending lookups. Defaults to False.
+            timeout (float | None, optional): Maximum time in seconds to wait for the
+                catalogues. Catalogues not answering in time are left out, and are
+                skipped by later lookups until their scan finished. Defaults to None.
+
+        Returns:
+            list[DatanormItem]: Found articles, cheapest wholesale price per single
+                unit first. Articles without wholesale price are ranked last.
+                Catalogues failing to look up the ID are logged and left out.
+        """
+        with self._lock:
+            self._running = {
+                position: future
+                for position, future in self._running.items()
+                if not future.done()
+            }
+            busy = set(self._running)
+        futures = {
+            self._executor.submit(_lookup, catalogue, id): position
+            for position, catalogue in enumerate(self.catalogues)
+            if position not in busy
+        }
+        pending = set(futures)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        items = list()
+        try:
+            while pending:
+                remaining = None
+                if deadline is not None:
+                    remaining = max(0, deadline - time.monotonic())
+                done, pending = wait(
+                    pending, timeout=remaining, return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    try:
+                        di = future.result()
+                    except Exception:
+                        # a single unreadable supplier must not fail the whole lookup
+                        name = self.catalogues[futures[future]].name
+                        logger.exception("Lookup of %s in %s failed", id, name)
+                        continue
+                    if di:
+                        items.append(di)
+                if first_hit and items:
+                    break
+        finally:
+            for future in pending:
+                if not future.cancel():
+                    with self._lock:
+                        self._running[futures[future]] = future
+        return sorted(items, key=_wholesale_rank)
+
+    def close(self):
+        """Shuts the thread pool of the federation down. A given executor is left to
+        its owner.
+        """
+        if self._owns_executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "DatanormFederation":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _load_current(index_class: type, datanorm_file: str):
+    """Loads the index file of the given class next to the base file. None if the file
+    does not exist, is unreadable or does not match the current base file.
+    """
+    if not os.path.isfile(index_class.default_path(datanorm_file)):
+        return None
+    try:
+        index = index_class.load(datanorm_file)
+    except ValueError:
+        # e.g. a truncated file or a file of an older version, rebuilt by "index build"
+        return None
+    return None if index.is_stale() else index
+
+
+def _lookup(catalogue: DatanormCatalogue, id: str) -> DatanormItem | None:
+    # module level function, so it can be sent to process pools
+    return catalogue.lookup(id)
+
+
+def _wholesale_rank(di: DatanormItem) -> tuple[bool, int]:
+    # compare the price of a single unit, not the price of the "Preiseinheit"
+    price = di.unit_price_wholesale
+    return (not price, price or 0)
@@ -0,0 +1,177 @@
+"""
+DATANORM Conflicts
+------------------
+Detection of duplicate article numbers, EAN/GTIN shared by several articles, price
+entries without article and conflicting prices in a base file and its DATPREIS file.
+The keys of all records are spread over hash partitions in temporary files first, so
+each partition is grouped in memory on its own and the memory stays bounded for any
+file size.
+"""
+
+from decimal import Decimal
+import os
+import tempfile
+from typing import NamedTuple
+from zlib import crc32
+from . import DatanormBaseFile, DatanormPriceFile
+
+DUPLICATE_ARTICLE = "duplicate_article"
+SHARED_EAN = "shared_ean"
+ORPHAN_PRICE = "orphan_price"
+CONFLICTING_PRICE = "conflicting_price"
+
+_PRICE_TYPES = {"1": "retail", "2": "wholesale", "3": "factory"}
+
+
+class DatanormConflict(NamedTuple):
+    kind: str
+    key: str
+    offsets: tuple[int, ...]
+    message: str
+
+
+def find_conflicts(
+    base_file: DatanormBaseFile,
+    price_file: DatanormPriceFile | None = None,
+    partitions: int = 16,
+    temp_dir: str | None = None,
+) -> list[DatanormConflict]:
+    """Finds duplicate and conflicting records in two passes, one over the files and
+    one over the partitions.
+
+    Args:
+        base_file (DatanormBaseFile): DATANORM base file
+        price_file (DatanormPriceFile | None, optional): DATPREIS file of the base
+            file. Defaults to None.
+        partitions (int, optional): Number of hash partitions, each partition is
+            loaded into memory at once. Defaults to 16.
+        temp_dir (str | None, optional): Directory for the temporary partition files.
+            Defaults to the system default.
+
+    Raises:
+        ValueError: If the number of partitions is less than 1
+
+    Returns:
+        list[DatanormConflict]: Found conflicts, ordered by kind and byte offset. The
+            offsets refer to the A records of the base file, for orphans and
+            conflicting price entries to the P records of the price file.
+    """
+    if partitions < 1:
+        raise ValueError(f"At least one partition is required, got {partitions}")
+    conflicts = list()
+    with tempfile.TemporaryDirectory(dir=temp_dir) as tmp_dir:
+        paths = [os.path.join(tmp_dir, f"{index}.part") for index in range(partitions)]
+        partition_files = [
+            open(path, "w", encoding="utf-8", newline="\n") for path in paths
+        ]
+        try:
+            _spill(base_file, price_file, partition_files)
+        finally:
+            for partition_file in partition_files:
+                partition_file.close()
+        for path in paths:
+            conflicts.extend(_partition_conflicts(path))
+    return sorted(conflicts, key=lambda conflict: (conflict.kind, conflict.offsets))
+
+
+def _spill(
+    base_file: DatanormBaseFile,
+    price_file: DatanormPriceFile | None,
+    partition_files: list,
+):
+    """Writes the keys of all records to the partition of their key. Articles and
+    their price entries share the partition of the article number.
+    """
+    count = len(partition_files)
+
+    def write(tag: str, key: str, *values):
+        namespace = "E" if tag == "E" else "A"
+        partition = crc32(f"{namespace}{key}".encode("utf-8")) % count
+        partition_files[partition].write("\t".join((tag, key, *values)) + "\n")
+
+    encoding = base_file.encoding
+    for offset, line_a, line_b in base_file._iter_records():
+        fields_a = line_a.decode(encoding).split(";", 11)
+        write("A", fields_a[2], str(offset), fields_a[9])
+        ean = line_b.split(b";", 10)[9].decode(encoding).strip()
+        if ean:
+            write("E", ean, str(offset), fields_a[2])
+
+    if price_file is None:
+        return
+    for offset, line in price_file.iter_lines():
+        if not line.startswith(b"P"):
+            continue
+        # every price entry consists of 9 fields, following "P;A;"
+        fields = line.decode(price_file.encoding).rstrip("\r\n").split(";")
+        for start in range(2, len(fields) - 8, 9):
+            article_id, price_type, price = fields[start : start + 3]
+            write("P", article_id, str(offset), price_type, price)
+
+
+def _partition_conflicts(path: str) -> list[DatanormConflict]:
+    """Groups the records of a single partition by key and compares them"""
+    articles = dict()
+    eans = dict()
+    entries = dict()
+    with open(path, "r", encoding="utf-8") as partition_file:
+        for line in partition_file:
+            tag, key, offset, *values = line.rstrip("\n").split("\t")
+            if tag == "A":
+                articles.setdefault(key, []).append((int(offset), values[0]))
+            elif tag == "E":
+                eans.setdefault(key, []).append((int(offset), values[0]))
+            else:
+                entries.setdefault(key, []).append((int(offset), *values))
+
+    conflicts = list()
+    for article_id, records in articles.items():
+        if len(records) > 1:
+            offsets = tuple(offset for offset, _ in records)
+            message = f"article number occurs in {len(records)} records"
+            conflicts.append(
+                DatanormConflict(DUPLICATE_ARTICLE, article_id, offsets, message)
+            )
+            prices = _distinct(price for _, price in records)
+            if len(prices) > 1:
+                message = f"different prices in the A records: {_format(prices)}"
+                conflicts.append(
+                    DatanormConflict(CONFLICTING_PRICE, article_id, offsets, message)
+                )
+
+    for ean, records in eans.items():
+        article_ids = _distinct(article_id for _, article_id in records)
+        if len(article_ids) > 1:
+            offsets = tuple(offset for offset, _ in records)
+            message = f"EAN/GTIN shared by the articles {', '.join(article_ids)}"
+            conflicts.append(DatanormConflict(SHARED_EAN, ean, offsets, message))
+
+    for article_id, records in entries.items():
+        if article_id not in articles:
+            offsets = tuple(_distinct(offset for offset, *_ in records))
+            message = "price entry without article in the base file"
+            conflicts.append(
+                DatanormConflict(ORPHAN_PRICE, article_id, offsets, message)
+            )
+        for price_type, name in _PRICE_TYPES.items():
+            typed = [record for record in records if record[1] == price_type]
+            prices = _distinct(price for *_, price in typed)
+            if len(prices) > 1:
+                offsets = tuple(_distinct(offset for offset, *_ in typed))
+                message = f"different {name} prices: {_format(prices)}"
+                conflicts.append(
+                    DatanormConflict(CONFLICTING_PRICE, article_id, offsets, message)
+                )
+    return conflicts
+
+
+def _distinct(values) -> list:
+    """Distinct values in the order of their first occurrence"""
+    return list(dict.fromkeys(values))
+
+
+def _format(prices: list[str]) -> str:
+    return ", ".join(
+        str(Decimal(price).scaleb(-2)) if price.isdigit() else repr(price)
+        for price in prices
+    )
@@ -8,8 +8,13 @@ REFERENCE for technical details: https://docplayer.org/115761786-Technische-spez
 """
 
 from abc import ABC
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 import datetime
 from decimal import Decimal
+import functools
+import io
+from itertools import islice
 import mmap
 import os
 import re
@@ -25,10 +30,44 @@ DATANORM_REGEX = {
     "T": r"^(?P<Satzkennzeichen>[T]);(?P<Verarbeitungskennzeichen>.{1});(?P<Langtextnummer>[^;]*);(?P<Zeilennummer>\d*);(?P<Unterkennzeichen>[^;]*);(?P<Text>[^;]*);(?P<Zeilentext>[^;]*);",  # noqa: E501
     "P": r"^(?P<Satzkennzeichen>[P]);(?P<Verarbeitungskennzeichen>.{1});(?P<Artikelnummer>[^;]*);(?P<Preiskennzeichen>\d*);(?P<Preis>\d*);(?P<RabattkennzeichenA>[^;]*);(?P<RabattOrMultiplikatorA>[^;]*);(?P<RabattkennzeichenB>[^;]*);(?P<RabattOrMultiplikatorB>[^;]*);(?P<RabattkennzeichenC>[^;]*);(?P<RabattOrMultiplikatorC>[^;]*);(?P<NaechsterArtikel>.*)",  # noqa: E501
     "P_SUB": r"^(?P<Artikelnummer>[^;]*);(?P<Preiskennzeichen>\d*);(?P<Preis>\d*);(?P<RabattkennzeichenA>[^;]*);(?P<RabattOrMultiplikatorA>[^;]*);(?P<RabattkennzeichenB>[^;]*);(?P<RabattOrMultiplikatorB>[^;]*);(?P<RabattkennzeichenC>[^;]*);(?P<RabattOrMultiplikatorC>[^;]*);(?P<NaechsterArtikel>.*)",  # noqa: E501
-    "R": r"^(?P<Satzkennzeichen>[R]);(?P<NONE>[^;]*);(?P<Rabattgruppe>[^;]*);(?P<Rabattkennzeichen>\d*);(?P<RabattOrMultiplikator>\d*);(?P<Rabattgruppenbezeichnung>[^;]*);(?P<NONE>[^;]*);",  # noqa: E501
+    "R": r"^(?P<Satzkennzeichen>[R]);(?P<NONE>[^;]*);(?P<Rabattgruppe>[^;]*);(?P<Rabattkennzeichen>\d*);(?P<RabattOrMultiplikator>\d*);(?P<Rabattgruppenbezeichnung>[^;]*);(?P<NONE_2>[^;]*);",  # noqa: E501
 }
 
 
+@functools.cache
+def _pattern(record_type: str) -> re.Pattern[str]:
+    """Compiled pattern of a record type, compiled on first use and cached"""
+    return re.compile(DATANORM_REGEX[record_type])
+
+
+_HEADER_FIELDS = ("date", "header_1", "header_2", "header_3", "version", "currency")
+
+# positions of the identifying fields in the B record, searchable by find_by()
+_SEARCH_FIELDS = {
+    "article_id": 2,
+    "matchcode": 3,
+    "alt_article_id": 4,
+    "ean": 9,
+    "reference_number": 15,
+}
+
+
+def file_signature(path: str) -> tuple[int, int]:
+    """Size and modification time of a file, to detect changes of indexed files.
+
+    Args:
+        path (str): Path of the file
+
+    Returns:
+        tuple[int, int]: Size in bytes and modification time in ns, (-1, -1) if the
+            file does not exist
+    """
+    if not os.path.isfile(path):
+        return (-1, -1)
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
 class DatanormFile(ABC):
     encoding = "cp850"
     datanorm_file: str
@@ -67,6 +106,48 @@ class DatanormFile(ABC):
         """
         pass
 
+    def iter_lines(self) -> Iterator[tuple[int, bytes]]:
+        """Streams the raw lines of the DATANORM file.
+
+        Yields:
+            tuple[int, bytes]: Byte offset and content of each line
+        """
+        if not os.path.isfile(self.datanorm_file):
+            return
+
+        with self._mapped() as mm_object:
+            offset = 0
+            for line in iter(mm_object.readline, b""):
+                yield offset, line
+                offset += len(line)
+
+    def count_records(self) -> dict[str, int]:
+        """Counts the records of the DATANORM file per "Satzkennzeichen".
+
+        Returns:
+            dict[str, int]: Number of records per "Satzkennzeichen"
+        """
+        counts = dict()
+        for _, line in self.iter_lines():
+            record_type = line[:1].decode(self.encoding)
+            if record_type.strip():
+                counts[record_type] = counts.get(record_type, 0) + 1
+        return counts
+
+    @contextmanager
+    def _mapped(self):
+        """Maps the DATANORM file read-only into memory."""
+        with open(self.datanorm_file, "rb") as file_obj:
+            if os.fstat(file_obj.fileno()).st_size == 0:
+                # mmap refuses to map empty files
+                yield io.BytesIO(b"")
+                return
+            mm_object = mmap.mmap(file_obj.fileno(), length=0, access=mmap.ACCESS_READ)
+            try:
+                yield mm_object
+            finally:
+                mm_object.close()
+
     def _parse_line(self, line: tuple, di: DatanormItem):
         """Updates the datanorm item with the information from the given lines.
 
@@ -81,6 +162,11 @@ class DatanormBaseFile(DatanormFile):
     _regex_filename_prefix = r"^DATANORM"
     _regex_filename_suffix = r"\.\d{3}$"
 
+    index = None
+    bloom_filter = None
+    offset_table = None
+    field_index = None
+
     def parse(self, di: DatanormItem, id: str | None = None):
         """Searches for EAN/GTIN/Art.No. in the given DATANORM file and updates the
         Datanorm item.
@@ -96,6 +182,269 @@ class DatanormBaseFile(DatanormFile):
                 self._parse_line(line, di)
             di.is_valid = True
 
+    def parse_many(self, ids: Iterable[str]) -> dict[str, DatanormItem]:
+        """Searches for several EAN/GTIN/Art.No. in a single pass over the file. With
+        an index, the indexed IDs are read with a seek each and only the remaining IDs
+        are searched for in the pass over the file.
+
+        Args:
+            ids (Iterable[str]): EAN/GTIN/Art.No. to search for
+
+        Returns:
+            dict[str, DatanormItem]: Datanorm items of the found IDs, keyed by ID
+        """
+        bloom_filter = self.bloom_filter
+        if bloom_filter is not None and not bloom_filter.is_stale():
+            ids = (id for id in ids if id in bloom_filter)
+        items = dict()
+        index = self.index
+        if index is not None and not index.is_stale():
+            misses = list()
+            for id in ids:
+                offset = index.lookup(id)
+                lines = self._lines_at(offset) if offset is not None else None
+                if lines is None:
+                    misses.append(id)
+                    continue
+                di = DatanormItem()
+                for line in lines.items():
+                    self._parse_line(line, di)
+                di.is_valid = True
+                items[id] = di
+            ids = misses
+
+        pending = {bytes(id, encoding=self.encoding) for id in ids}
+        if not pending:
+            return items
+
+        header = self.read_header()
+        for _, line_a, line_b in self._iter_records():
+            # same semantics as the ";{id};" pattern of the single lookup
+            hits = pending.intersection(line_b.rstrip(b"\r\n").split(b";")[1:-1])
+            if hits:
+                di = self._item_from_lines(header, line_a, line_b)
+                for hit in hits:
+                    items[hit.decode(self.encoding)] = di
+                pending -= hits
+                if not pending:
+                    break
+        return items
+
+    def iter_items(self) -> Iterator[DatanormItem]:
+        """Streams all articles of the DATANORM file.
+
+        Yields:
+            DatanormItem: One Datanorm item per A/B record pair
+        """
+        header = self.read_header()
+        for _, line_a, line_b in self._iter_records():
+            yield self._item_from_lines(header, line_a, line_b)
+
+    def page(self, offset: int, limit: int) -> list[DatanormItem]:
+        """Reads a page of articles. With an offset table the page is read with a
+        single seek, otherwise or if the file changed since the table was built, the
+        file is scanned up to the page.
+
+        Args:
+            offset (int): Record number of the first article of the page
+            limit (int): Maximum number of articles of the page
+
+        Raises:
+            ValueError: If offset or limit is negative
+
+        Returns:
+            list[DatanormItem]: Articles of the page, in the order of the file
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative")
+        offset_table = self.offset_table
+        if offset_table is None or offset_table.is_stale():
+            return list(islice(self.iter_items(), offset, offset + limit))
+        if offset >= len(offset_table) or limit == 0:
+            return []
+
+        header = self.read_header()
+        items = list()
+        line_a = None
+        with self._mapped() as mm_object:
+            mm_object.seek(offset_table[offset])
+            for line in iter(mm_object.readline, b""):
+                if line.startswith(b"A"):
+                    line_a = line
+                elif line.startswith(b"B") and line_a is not None:
+                    items.append(self._item_from_lines(header, line_a, line))
+                    line_a = None
+                    if len(items) == limit:
+                        break
+        return items
+
+    def item_at(self, record_number: int) -> DatanormItem | None:
+        """Reads the article with the given record number.
+
+        Args:
+            record_number (int): Index of the A/B record pair in the file
+
+        Returns:
+            DatanormItem | None: Datanorm item, None if the file has less records
+        """
+        items = self.page(record_number, 1)
+        return items[0] if items else None
+
+    def find_by(self, **fields: str) -> list[DatanormItem]:
+        """Finds all articles whose fields equal the given values. Unlike parse(),
+        each value is only compared with its own field. With a field index the
+        articles are read with a seek each, otherwise or if the file changed since the
+        index was built, the file is scanned once.
+
+        Args:
+            **fields (str): Values of article_id, ean, alt_article_id, matchcode or
+                reference_number, all have to match
+
+        Raises:
+            ValueError: If no or an unknown field is given
+
+        Returns:
+            list[DatanormItem]: Matching articles, in the order of the file
+        """
+        unknown = set(fields) - set(_SEARCH_FIELDS)
+        if not fields or unknown:
+            raise ValueError(
+                f"Expected fields out of {tuple(_SEARCH_FIELDS)}, got {tuple(fields)}"
+            )
+        criteria = {_SEARCH_FIELDS[name]: value for name, value in fields.items()}
+
+        if self.field_index is not None and not self.field_index.is_stale():
+            offsets = None
+            for name, value in fields.items():
+                found = set(self.field_index.lookup(name, value))
+                offsets = found if offsets is None else offsets & found
+            return self._items_at(sorted(offsets))
+
+        needles = [value.encode(self.encoding) for value in fields.values()]
+        header = self.read_header()
+        items = list()
+        for _, line_a, line_b in self._iter_records():
+            if not all(needle in line_b for needle in needles):
+                continue
+            values = line_b.decode(self.encoding).rstrip("\r\n").split(";")
+            if all(
+                position < len(values) and values[position].strip() == value
+                for position, value in criteria.items()
+            ):
+                items.append(self._item_from_lines(header, line_a, line_b))
+        return items
+
+    def read_header(self) -> DatanormItem:
+        """Reads the V record of the DATANORM file.
+
+        Returns:
+            DatanormItem: Datanorm item, containing only the header information
+        """
+        header = DatanormItem()
+        for _, line in self.iter_lines():
+            if line.startswith(b"V"):
+                self._parse_line(("V", line.decode(self.encoding).strip()), header)
+            break
+        return header
+
+    def _record_keys(self, line_a: bytes, line_b: bytes) -> list[str]:
+        """Article number and EAN/GTIN of a raw A/B record pair, fields missing in
+        malformed records are left out
+        """
+        keys = list()
+        fields_a = line_a.split(b";")
+        if len(fields_a) > 2:
+            keys.append(fields_a[2].decode(self.encoding))
+        fields_b = line_b.split(b";")
+        ean = fields_b[9].decode(self.encoding).strip() if len(fields_b) > 9 else ""
+        if ean:
+            keys.append(ean)
+        return keys
+
+    def _search_keys(self, line_b: bytes) -> set[str]:
+        """Field values of a raw B record, any of them is matched by a lookup"""
+        fields = line_b.decode(self.encoding).rstrip("\r\n").split(";")[1:-1]
+        return {field for field in fields if field}
+
+    def _iter_records(self) -> Iterator[tuple[int, bytes, bytes]]:
+        """Streams the raw A/B record pairs of the DATANORM file.
+
+        Yields:
+            tuple[int, bytes, bytes]: Byte offset of the A record, A and B record
+        """
+        offset_a = None
+        line_a = None
+        for offset, line in self.iter_lines():
+            if line.startswith(b"A"):
+                offset_a = offset
+                line_a = line
+            elif line.startswith(b"B") and line_a is not None:
+                yield offset_a, line_a, line
+                line_a = None
+
+    def _item_from_lines(
+        self, header: DatanormItem, line_a: bytes, line_b: bytes
+    ) -> DatanormItem:
+        """Creates a Datanorm item from a raw A/B record pair.
+
+        Args:
+            header (DatanormItem): Datanorm item with the header information
+            line_a (bytes): A record
+            line_b (bytes): B record
+
+        Returns:
+            DatanormItem: Valid Datanorm item
+        """
+        di = DatanormItem()
+        for field in _HEADER_FIELDS:
+            setattr(di, field, getattr(header, field))
+        self._parse_line(("A", line_a.decode(self.encoding).strip()), di)
+        self._parse_line(("B", line_b.decode(self.encoding).strip()), di)
+        di.is_valid = True
+        return di
+
+    def _items_at(self, offsets: Iterable[int]) -> list[DatanormItem]:
+        """Reads the A/B record pairs starting at the given byte offsets.
+
+        Args:
+            offsets (Iterable[int]): Byte offsets of the A records
+
+        Returns:
+            list[DatanormItem]: Datanorm items of the valid record pairs
+        """
+        header = self.read_header()
+        items = list()
+        with self._mapped() as mm_object:
+            for offset in offsets:
+                mm_object.seek(offset)
+                line_a = mm_object.readline()
+                line_b = mm_object.readline()
+                if line_a.startswith(b"A") and line_b.startswith(b"B"):
+                    items.append(self._item_from_lines(header, line_a, line_b))
+        return items
+
+    def _lines_at(self, offset: int) -> dict | None:
+        """Reads the A/B record pair starting at the given byte offset.
+
+        Args:
+            offset (int): Byte offset of the A record
+
+        Returns:
+            dict | None: Parsed lines, containing the product at the given offset
+        """
+        with self._mapped() as mm_object:
+            line_v = mm_object.readline()
+            mm_object.seek(offset)
+            line_a = mm_object.readline()
+            line_b = mm_object.readline()
+        if not line_a.startswith(b"A") or not line_b.startswith(b"B"):
+            return
+        return {
+            "A": line_a.decode(self.encoding).strip(),
+            "B": line_b.decode(self.encoding).strip(),
+            "V": line_v.decode(self.encoding).strip(),
+        }
+
     def _search_file_for_id(self, id: str) -> dict | None:
         """Lookup EAN/GTIN/Art.No. in the DATANORM file
 
@@ -108,6 +457,19 @@ class DatanormBaseFile(DatanormFile):
         if not os.path.isfile(self.datanorm_file):
             return
 
+        # the filter covers all field values of the B records, a miss is definite
+        if (
+            self.bloom_filter is not None
+            and not self.bloom_filter.is_stale()
+            and id not in self.bloom_filter
+        ):
+            return
+
+        if self.index is not None and not self.index.is_stale():
+            offset = self.index.lookup(id)
+            if offset is not None:
+                return self._lines_at(offset)
+
         ean_pattern = bytes(f";{id};", encoding=self.encoding)
         lines = None
 
@@ -138,7 +500,7 @@ class DatanormBaseFile(DatanormFile):
             line (tuple): "Satzkennzeichen" and the whole line
             di (DatanormItem): datanorm item to update
         """
-        match = re.search(DATANORM_REGEX[line[0]], line[1])
+        match = _pattern(line[0]).search(line[1])
         if match.group("Satzkennzeichen") == "V":
             di.date = datetime.datetime.strptime(match.group("Datum"), "%d%m%y")
             di.header_1 = match.group("Informationstext1").rstrip()
@@ -234,7 +596,7 @@ class DatanormProductGroupFile(DatanormFile):
         Args:
             match (re.Match[str]): Match object for a single DATANORM line
         """
-        match = re.search(DATANORM_REGEX[line[0]], line[1])
+        match = _pattern(line[0]).search(line[1])
 
         if match.group("Satzkennzeichen") == "S" and di.main_product_group_name is None:
             di.main_product_group_name = match.group("HauptwarengruppeName")
@@ -285,6 +647,39 @@ class DatanormPriceFile(DatanormFile):
                 for line in lines.items():
                     self._parse_line(line, di)
 
+    def parse_many(self, items: Iterable[DatanormItem]):
+        """Updates several Datanorm items in a single pass over the file.
+
+        Args:
+            items (Iterable[DatanormItem]): Datanorm items to update
+        """
+        pending = dict()
+        for di in items:
+            if di.is_valid:
+                pending.setdefault(di.article_id, []).append(di)
+        if not pending:
+            return
+
+        for match in self._iter_entries():
+            for di in pending.get(match.group("Artikelnummer"), ()):
+                self._update_prices(di, match)
+
+    def _iter_entries(self) -> Iterator[re.Match[str]]:
+        """Streams the price entries of all P records in file order.
+
+        Yields:
+            re.Match[str]: Match object of a single price entry
+        """
+        for _, line in self.iter_lines():
+            if not line.startswith(b"P"):
+                continue
+            next_article = line.decode(self.encoding).strip()[4:]
+            # iterate over the articles in the line
+            while next_article:
+                match = _pattern("P_SUB").search(next_article)
+                yield match
+                next_article = match.group("NaechsterArtikel").strip()
+
     def _search_file_for_article_id(self, article_id: str) -> dict | None:
         """Lookup Art.No. in the DATPREIS file
 
@@ -321,13 +716,13 @@ class DatanormPriceFile(DatanormFile):
         return lines
 
     def _parse_line(self, line: tuple, di: DatanormItem):
-        match = re.search(DATANORM_REGEX[line[0]], line[1])
+        match = _pattern(line[0]).search(line[1])
 
         if match.group("Satzkennzeichen") == "P":
             next_article = line[1][4:]
             # iterate over the articles in the line
             while next_article:
-                match = re.search(DATANORM_REGEX["P_SUB"], next_article)
+                match = _pattern("P_SUB").search(next_article)
                 # skip wrong article IDs
                 if match.group("Artikelnummer") == di.article_id:
                     self._update_prices(di, match)
@@ -0,0 +1,176 @@
+"""
+DATANORM Product Group Tree
+---------------------------
+Hierarchy of the main product groups and product groups of a DATANORM.WRG file, joined
+with the articles of a DATANORM base file. Each group holds a sorted posting list of
+the record numbers of its articles, so browsing the tree needs no file access.
+"""
+
+from array import array
+from collections.abc import Iterator
+from . import DatanormBaseFile, DatanormProductGroupFile
+
+
+class DatanormProductGroup:
+    id: str
+    name: str | None
+    main_group_id: str | None
+    children: dict[str, "DatanormProductGroup"]
+    postings: array
+
+    def __init__(
+        self, id: str, name: str | None = None, main_group_id: str | None = None
+    ) -> None:
+        """Node of the product group tree.
+
+        Args:
+            id (str): ID of the (main) product group
+            name (str | None, optional): Name of the (main) product group
+            main_group_id (str | None, optional): ID of the main product group, None
+                for main product groups
+        """
+        self.id = id
+        self.name = name
+        self.main_group_id = main_group_id
+        self.children = dict()
+        self.postings = array("I")
+
+    @property
+    def count(self) -> int:
+        """Number of articles in the group, including its sub groups"""
+        return len(self.postings)
+
+    def __repr__(self) -> str:
+        return f"DatanormProductGroup({self.id!r}, {self.name!r}, count={self.count})"
+
+
+class DatanormProductGroupTree:
+    main_groups: dict[str, DatanormProductGroup]
+    article_ids: list[str]
+
+    def __init__(self) -> None:
+        """Tree of the main product groups and their product groups. The postings of
+        the groups refer to the record numbers of the A/B record pairs of the base
+        file, which index article_ids.
+        """
+        self.main_groups = dict()
+        self.article_ids = list()
+        self._groups = dict()
+
+    @classmethod
+    def build(
+        cls,
+        product_group_file: DatanormProductGroupFile,
+        base_file: DatanormBaseFile | None = None,
+    ) -> "DatanormProductGroupTree":
+        """Builds the tree in a single pass over each file.
+
+        Args:
+            product_group_file (DatanormProductGroupFile): DATANORM.WRG file
+            base_file (DatanormBaseFile | None, optional): DATANORM base file with the
+                articles of the groups. Defaults to None.
+
+        Returns:
+            DatanormProductGroupTree: Product group tree
+        """
+        tree = cls()
+        encoding = product_group_file.encoding
+        for _, line in product_group_file.iter_lines():
+            if not line.startswith(b"S"):
+                continue
+            fields = line.decode(encoding).rstrip("\r\n").split(";")
+            if len(fields) < 6:
+                # malformed records are skipped, validate() reports them
+                continue
+            main_group_id, main_group_name = fields[2], fields[3].strip()
+            group_id, group_name = fields[4], fields[5].strip()
+            main_group = tree._main_group(main_group_id)
+            if main_group_name and main_group.name is None:
+                main_group.name = main_group_name
+            if group_id.strip():
+                group = tree._group(main_group_id, group_id)
+                if group_name and group.name is None:
+                    group.name = group_name
+
+        if base_file is not None:
+            tree.add_articles(base_file)
+        return tree
+
+    def add_articles(self, base_file: DatanormBaseFile):
+        """Adds the articles of a base file to the posting lists of their groups.
+
+        Args:
+            base_file (DatanormBaseFile): DATANORM base file
+        """
+        encoding = base_file.encoding
+        for _, line_a, line_b in base_file._iter_records():
+            fields_a = line_a.split(b";", 12)
+            fields_b = line_b.split(b";", 12)
+            record_number = len(self.article_ids)
+            if len(fields_a) < 12 or len(fields_b) < 12:
+                # malformed records keep their record number without group,
+                # validate() reports them
+                article_id = fields_a[2] if len(fields_a) > 2 else b""
+                self.article_ids.append(article_id.decode(encoding))
+                continue
+            main_group_id = fields_a[11].decode(encoding)
+            group_id = fields_b[11].decode(encoding)
+
+            self.article_ids.append(fields_a[2].decode(encoding))
+            self._main_group(main_group_id).postings.append(record_number)
+            if group_id.strip():
+                self._group(main_group_id, group_id).postings.append(record_number)
+
+    def group(
+        self, main_group_id: str, group_id: str | None = None
+    ) -> DatanormProductGroup | None:
+        """Looks up a main product group or one of its product groups.
+
+        Args:
+            main_group_id (str): ID of the main product group
+            group_id (str | None, optional): ID of the product group. Defaults to
+                None, which returns the main product group.
+
+        Returns:
+            DatanormProductGroup | None: Node of the tree
+        """
+        if group_id is None:
+            return self.main_groups.get(main_group_id)
+        return self._groups.get((main_group_id, group_id))
+
+    def article_ids_of(
+        self, main_group_id: str, group_id: str | None = None
+    ) -> list[str]:
+        """Article numbers of a main product group or product group.
+
+        Args:
+            main_group_id (str): ID of the main product group
+            group_id (str | None, optional): ID of the product group. Defaults to
+                None.
+
+        Returns:
+            list[str]: Article numbers in the order of the base file
+        """
+        group = self.group(main_group_id, group_id)
+        if group is None:
+            return []
+        return [self.article_ids[record_number] for record_number in group.postings]
+
+    def __iter__(self) -> Iterator[DatanormProductGroup]:
+        """Iterates over the main product groups"""
+        return iter(self.main_groups.values())
+
+    def _main_group(self, main_group_id: str) -> DatanormProductGroup:
+        main_group = self.main_groups.get(main_group_id)
+        if main_group is None:
+            main_group = DatanormProductGroup(main_group_id)
+            self.main_groups[main_group_id] = main_group
+        return main_group
+
+    def _group(self, main_group_id: str, group_id: str) -> DatanormProductGroup:
+        group = self._groups.get((main_group_id, group_id))
+        if group is None:
+            group = DatanormProductGroup(group_id, main_group_id=main_group_id)
+            self._groups[(main_group_id, group_id)] = group
+            self._main_group(main_group_id).children[group_id] = group
+        return group
@@ -0,0 +1,510 @@
+"""
+DATANORM Index
+--------------
+Persistent lookup index for DATANORM base files. The index maps article numbers and
+EAN/GTIN to the byte offset of the A record, so a lookup needs a single seek instead
+of a full file scan. The manufacturer index maps the manufacturer names to the article
+numbers of the manufacturer. The offset table maps the record numbers of the A/B record
+pairs to the byte offsets of their A records, for paging through the file. The field
+index maps the values of single fields, like EAN or matchcode, to the byte offsets of
+all articles with that value.
+"""
+
+from array import array
+import sys
+from . import DatanormBaseFile, DatanormItem
+from .datanorm_files import _SEARCH_FIELDS, file_signature
+
+
+def _header_signature(header: str, magic: str, version: int) -> tuple[int, int] | None:
+    """File signature stored in the header line of an index file, None if the header
+    is not the one of the expected format and version.
+    """
+    fields = header.rstrip("\n").split("\t")
+    if len(fields) != 4 or fields[0] != magic or fields[1] != str(version):
+        return None
+    try:
+        return int(fields[2]), int(fields[3])
+    except ValueError:
+        return None
+
+
+class DatanormIndex:
+    _MAGIC = "DATANORM-INDEX"
+    _VERSION = 1
+
+    datanorm_file: str
+    offsets: dict[str, int]
+
+    def __init__(self, datanorm_file: str, offsets: dict[str, int] | None = None):
+        """Lookup index for a DATANORM base file.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            offsets (dict[str, int] | None, optional): Byte offsets of the A records,
+                keyed by article number and EAN/GTIN. Defaults to None.
+        """
+        self.datanorm_file = datanorm_file
+        self.offsets = offsets if offsets is not None else dict()
+        self._file_signature = file_signature(datanorm_file)
+
+    @classmethod
+    def build(
+        cls,
+        base_file: DatanormBaseFile,
+        manufacturer_index: "DatanormManufacturerIndex | None" = None,
+        offset_table: "DatanormOffsetTable | None" = None,
+        field_index: "DatanormFieldIndex | None" = None,
+    ) -> "DatanormIndex":
+        """Builds the index in a single pass over the DATANORM base file.
+
+        Args:
+            base_file (DatanormBaseFile): DATANORM base file to index
+            manufacturer_index (DatanormManufacturerIndex | None, optional): Empty
+                manufacturer index, filled in the same pass. Defaults to None.
+            offset_table (DatanormOffsetTable | None, optional): Empty offset table,
+                filled in the same pass. Defaults to None.
+            field_index (DatanormFieldIndex | None, optional): Empty field index,
+                filled in the same pass. Defaults to None.
+
+        Returns:
+            DatanormIndex: Index of the given file
+        """
+        offsets = dict()
+        for offset, line_a, line_b in base_file._iter_records():
+            for key in base_file._record_keys(line_a, line_b):
+                # the first record wins, like in the file scan
+                offsets.setdefault(key, offset)
+            if manufacturer_index is not None:
+                manufacturer_index._add_record(line_a, base_file.encoding)
+            if offset_table is not None:
+                offset_table.offsets.append(offset)
+            if field_index is not None:
+                field_index._add_record(offset, line_b, base_file.encoding)
+        return cls(base_file.datanorm_file, offsets)
+
+    @staticmethod
+    def default_path(datanorm_file: str) -> str:
+        """Path of the index file next to the DATANORM file"""
+        return f"{datanorm_file}.idx"
+
+    def lookup(self, id: str) -> int | None:
+        """Byte offset of the A record with the given article number or EAN/GTIN"""
+        return self.offsets.get(id)
+
+    def is_stale(self) -> bool:
+        """Checks if the DATANORM file changed since the index was built.
+
+        Returns:
+            bool: True if the index does not match the DATANORM file anymore
+        """
+        return self._file_signature != file_signature(self.datanorm_file)
+
+    def save(self, path: str | None = None):
+        """Writes the index to disk.
+
+        Args:
+            path (str | None, optional): Path of the index file. Defaults to the
+                default path next to the DATANORM file.
+        """
+        path = path or self.default_path(self.datanorm_file)
+        size, mtime = self._file_signature
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as file_obj:
+            file_obj.write(f"{self._MAGIC}\t{self._VERSION}\t{size}\t{mtime}\n")
+            file_obj.writelines(
+                f"{key}\t{offset}\n" for key, offset in self.offsets.items()
+            )
+
+    @classmethod
+    def load(cls, datanorm_file: str, path: str | None = None) -> "DatanormIndex":
+        """Reads an index from disk.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            path (str | None, optional): Path of the index file. Defaults to the
+                default path next to the DATANORM file.
+
+        Raises:
+            ValueError: If the file is not a DATANORM index
+
+        Returns:
+            DatanormIndex: Loaded index
+        """
+        path = path or cls.default_path(datanorm_file)
+        with open(path, "r", encoding="utf-8", buffering=1 << 20) as file_obj:
+            try:
+                signature = _header_signature(
+                    file_obj.readline(), cls._MAGIC, cls._VERSION
+                )
+                offsets = dict()
+                if signature is not None:
+                    for line in file_obj:
+                        key, offset = line.rstrip("\n").rsplit("\t", 1)
+                        offsets[key] = int(offset)
+            except ValueError:
+                # e.g. a truncated file
+                signature = None
+        if signature is None:
+            raise ValueError(f"{path} is not a DATANORM index")
+        index = cls(datanorm_file, offsets)
+        index._file_signature = signature
+        return index
+
+
+class DatanormManufacturerIndex:
+    _MAGIC = "DATANORM-MANUFACTURERS"
+    _VERSION = 1
+
+    datanorm_file: str
+    article_ids: dict[str, list[str]]
+
+    def __init__(
+        self, datanorm_file: str, article_ids: dict[str, list[str]] | None = None
+    ):
+        """Facet index of the manufacturers of a DATANORM base file.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            article_ids (dict[str, list[str]] | None, optional): Article numbers,
+                keyed by manufacturer name. Defaults to None.
+        """
+        self.datanorm_file = datanorm_file
+        self.article_ids = article_ids if article_ids is not None else dict()
+        self._file_signature = file_signature(datanorm_file)
+
+    @classmethod
+    def build(cls, base_file: DatanormBaseFile) -> "DatanormManufacturerIndex":
+        """Builds the index in a single pass over the DATANORM base file.
+
+        Args:
+            base_file (DatanormBaseFile): DATANORM base file to index
+
+        Returns:
+            DatanormManufacturerIndex: Manufacturer index of the given file
+        """
+        manufacturer_index = cls(base_file.datanorm_file)
+        for _, line_a, _ in base_file._iter_records():
+            manufacturer_index._add_record(line_a, base_file.encoding)
+        return manufacturer_index
+
+    @staticmethod
+    def default_path(datanorm_file: str) -> str:
+        """Path of the index file next to the DATANORM file"""
+        return f"{datanorm_file}.mfr"
+
+    def add(self, manufacturer: str, article_id: str):
+        """Adds an article of the given manufacturer to the index"""
+        self.article_ids.setdefault(manufacturer, []).append(article_id)
+
+    def lookup(self, manufacturer: str) -> list[str]:
+        """Article numbers of the given manufacturer"""
+        return self.article_ids.get(manufacturer, [])
+
+    def counts(self) -> dict[str, int]:
+        """Number of articles per manufacturer, most articles first"""
+        counts = {name: len(ids) for name, ids in self.article_ids.items()}
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+    def is_stale(self) -> bool:
+        """Checks if the DATANORM file changed since the index was built.
+
+        Returns:
+            bool: True if the index does not match the DATANORM file anymore
+        """
+        return self._file_signature != file_signature(self.datanorm_file)
+
+    def save(self, path: str | None = None):
+        """Writes the index to disk.
+
+        Args:
+            path (str | None, optional): Path of the index file. Defaults to the
+                default path next to the DATANORM file.
+        """
+        path = path or self.default_path(self.datanorm_file)
+        size, mtime = self._file_signature
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as file_obj:
+            file_obj.write(f"{self._MAGIC}\t{self._VERSION}\t{size}\t{mtime}\n")
+            file_obj.writelines(
+                "\t".join((manufacturer, *ids)) + "\n"
+                for manufacturer, ids in self.article_ids.items()
+            )
+
+    @classmethod
+    def load(
+        cls, datanorm_file: str, path: str | None = None
+    ) -> "DatanormManufacturerIndex":
+        """Reads an index from disk.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            path (str | None, optional): Path of the index file. Defaults to the
+                default path next to the DATANORM file.
+
+        Raises:
+            ValueError: If the file is not a DATANORM manufacturer index
+
+        Returns:
+            DatanormManufacturerIndex: Loaded index
+        """
+        path = path or cls.default_path(datanorm_file)
+        with open(path, "r", encoding="utf-8", buffering=1 << 20) as file_obj:
+            try:
+                signature = _header_signature(
+                    file_obj.readline(), cls._MAGIC, cls._VERSION
+                )
+                article_ids = dict()
+                if signature is not None:
+                    for line in file_obj:
+                        manufacturer, *ids = line.rstrip("\n").split("\t")
+                        article_ids[manufacturer] = ids
+            except ValueError:
+                # e.g. a truncated file
+                signature = None
+        if signature is None:
+            raise ValueError(f"{path} is not a DATANORM manufacturer index")
+        manufacturer_index = cls(datanorm_file, article_ids)
+        manufacturer_index._file_signature = signature
+        return manufacturer_index
+
+    def _add_record(self, line_a: bytes, encoding: str):
+        """Adds the article of a raw A record to the index"""
+        fields = line_a.split(b";", 5)
+        if len(fields) < 5:
+            # malformed records are skipped, validate() reports them
+            return
+        manufacturer, _ = DatanormItem.split_manufacturer(fields[4].decode(encoding))
+        if manufacturer is not None:
+            self.add(manufacturer, fields[2].decode(encoding))
+
+
+class DatanormOffsetTable:
+    _MAGIC = "DATANORM-RECORDS"
+    _VERSION = 1
+
+    datanorm_file: str
+    offsets: array
+
+    def __init__(self, datanorm_file: str, offsets: array | None = None):
+        """Byte offsets of the records of a DATANORM base file.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            offsets (array | None, optional): Byte offsets of the A records, indexed
+                by record number. Defaults to None.
+        """
+        self.datanorm_file = datanorm_file
+        self.offsets = offsets if offsets is not None else array("Q")
+        self._file_signature = file_signature(datanorm_file)
+
+    @classmethod
+    def build(cls, base_file: DatanormBaseFile) -> "DatanormOffsetTable":
+        """Builds the table in a single pass over the DATANORM base file.
+
+        Args:
+            base_file (DatanormBaseFile): DATANORM base file to index
+
+        Returns:
+            DatanormOffsetTable: Offset table of the given file
+        """
+        offset_table = cls(base_file.datanorm_file)
+        offset_table.offsets.extend(
+            offset for offset, _, _ in base_file._iter_records()
+        )
+        return offset_table
+
+    @staticmethod
+    def default_path(datanorm_file: str) -> str:
+        """Path of the offset table next to the DATANORM file"""
+        return f"{datanorm_file}.rec"
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, record_number: int) -> int:
+        """Byte offset of the A record with the given record number"""
+        return self.offsets[record_number]
+
+    def is_stale(self) -> bool:
+        """Checks if the DATANORM file changed since the table was built.
+
+        Returns:
+            bool: True if the table does not match the DATANORM file anymore
+        """
+        return self._file_signature != file_signature(self.datanorm_file)
+
+    def save(self, path: str | None = None):
+        """Writes the table to disk, a header line followed by the offsets as little
+        endian uint64.
+
+        Args:
+            path (str | None, optional): Path of the table file. Defaults to the
+                default path next to the DATANORM file.
+        """
+        path = path or self.default_path(self.datanorm_file)
+        size, mtime = self._file_signature
+        offsets = self.offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        with open(path, "wb") as file_obj:
+            header = f"{self._MAGIC}\t{self._VERSION}\t{size}\t{mtime}\n"
+            file_obj.write(header.encode("utf-8"))
+            file_obj.write(offsets.tobytes())
+
+    @classmethod
+    def load(
+        cls, datanorm_file: str, path: str | None = None
+    ) -> "DatanormOffsetTable":
+        """Reads a table from disk.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            path (str | None, optional): Path of the table file. Defaults to the
+                default path next to the DATANORM file.
+
+        Raises:
+            ValueError: If the file is not a DATANORM offset table
+
+        Returns:
+            DatanormOffsetTable: Loaded table
+        """
+        path = path or cls.default_path(datanorm_file)
+        with open(path, "rb") as file_obj:
+            header = file_obj.readline().decode("utf-8", errors="replace")
+            signature = _header_signature(header, cls._MAGIC, cls._VERSION)
+            offsets = array("Q")
+            try:
+                if signature is not None:
+                    offsets.frombytes(file_obj.read())
+            except ValueError:
+                # e.g. a truncated file
+                signature = None
+        if signature is None:
+            raise ValueError(f"{path} is not a DATANORM offset table")
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        offset_table = cls(datanorm_file, offsets)
+        offset_table._file_signature = signature
+        return offset_table
+
+
+class DatanormFieldIndex:
+    _MAGIC = "DATANORM-FIELDS"
+    _VERSION = 1
+
+    datanorm_file: str
+    offsets: dict[str, dict[str, list[int]]]
+
+    def __init__(
+        self,
+        datanorm_file: str,
+        offsets: dict[str, dict[str, list[int]]] | None = None,
+    ):
+        """Secondary indexes of the identifying fields of a DATANORM base file.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            offsets (dict[str, dict[str, list[int]]] | None, optional): Byte offsets
+                of the A records, keyed by field name and value. Defaults to None.
+        """
+        self.datanorm_file = datanorm_file
+        self.offsets = offsets if offsets is not None else dict()
+        for field in _SEARCH_FIELDS:
+            self.offsets.setdefault(field, dict())
+        self._file_signature = file_signature(datanorm_file)
+
+    @classmethod
+    def build(cls, base_file: DatanormBaseFile) -> "DatanormFieldIndex":
+        """Builds the indexes of all fields in a single pass over the DATANORM file.
+
+        Args:
+            base_file (DatanormBaseFile): DATANORM base file to index
+
+        Returns:
+            DatanormFieldIndex: Field index of the given file
+        """
+        field_index = cls(base_file.datanorm_file)
+        for offset, _, line_b in base_file._iter_records():
+            field_index._add_record(offset, line_b, base_file.encoding)
+        return field_index
+
+    @staticmethod
+    def default_path(datanorm_file: str) -> str:
+        """Path of the index file next to the DATANORM file"""
+        return f"{datanorm_file}.fld"
+
+    def lookup(self, field: str, value: str) -> list[int]:
+        """Byte offsets of the A records of all articles with the given field value"""
+        return self.offsets[field].get(value, [])
+
+    def is_stale(self) -> bool:
+        """Checks if the DATANORM file changed since the index was built.
+
+        Returns:
+            bool: True if the index does not match the DATANORM file anymore
+        """
+        return self._file_signature != file_signature(self.datanorm_file)
+
+    def save(self, path: str | None = None):
+        """Writes the index to disk.
+
+        Args:
+            path (str | None, optional): Path of the index file. Defaults to the
+                default path next to the DATANORM file.
+        """
+        path = path or self.default_path(self.datanorm_file)
+        size, mtime = self._file_signature
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as file_obj:
+            file_obj.write(f"{self._MAGIC}\t{self._VERSION}\t{size}\t{mtime}\n")
+            for field, values in self.offsets.items():
+                file_obj.writelines(
+                    f"{field}\t{value}\t{','.join(map(str, offsets))}\n"
+                    for value, offsets in values.items()
+                )
+
+    @classmethod
+    def load(cls, datanorm_file: str, path: str | None = None) -> "DatanormFieldIndex":
+        """Reads an index from disk.
+
+        Args:
+            datanorm_file (str): path to the indexed DATANORM base file
+            path (str | None, optional): Path of the index file. Defaults to the
+                default path next to the DATANORM file.
+
+        Raises:
+            ValueError: If the file is not a DATANORM field index
+
+        Returns:
+            DatanormFieldIndex: Loaded index
+        """
+        path = path or cls.default_path(datanorm_file)
+        with open(path, "r", encoding="utf-8", buffering=1 << 20) as file_obj:
+            try:
+                signature = _header_signature(
+                    file_obj.readline(), cls._MAGIC, cls._VERSION
+                )
+                offsets = {field: dict() for field in _SEARCH_FIELDS}
+                if signature is not None:
+                    for line in file_obj:
+                        field, rest = line.rstrip("\n").split("\t", 1)
+                        value, values_offsets = rest.rsplit("\t", 1)
+                        offsets[field][value] = [
+                            int(offset) for offset in values_offsets.split(",")
+                        ]
+            except (KeyError, ValueError):
+                # e.g. a truncated file
+                signature = None
+        if signature is None:
+            raise ValueError(f"{path} is not a DATANORM field index")
+        field_index = cls(datanorm_file, offsets)
+        field_index._file_signature = signature
+        return field_index
+
+    def _add_record(self, offset: int, line_b: bytes, encoding: str):
+        """Adds the fields of a raw B record to the indexes"""
+        values = line_b.decode(encoding).rstrip("\r\n").split(";")
+        for field, position in _SEARCH_FIELDS.items():
+            if position < len(values):
+                value = values[position].strip()
+                if value:
+                    self.offsets[field].setdefault(value, []).append(offset)
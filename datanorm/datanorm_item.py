@@ -8,9 +8,59 @@ import datetime
 from decimal import Decimal
 import re
 
+# fixed-point scale of the prices per single unit, 1 = one millionth of the currency
+UNIT_PRICE_SCALE = 10**6
+
+# "Preiseinheit" and number of units of the price
+_PRICE_UNITS = {"0": 1, "1": 10, "2": 100, "3": 1000}
+_PRICE_UNIT_CODES = {units: code for code, units in _PRICE_UNITS.items()}
+
+
+def unit_price(price: Decimal, price_unit_raw: str | None) -> int | None:
+    """Normalises a price to the price of a single unit.
+
+    Args:
+        price (Decimal): Price of the number of units given by the "Preiseinheit"
+        price_unit_raw (str | None): "Preiseinheit" of the price
+
+    Returns:
+        int | None: Price of a single unit in millionths of the currency
+            (UNIT_PRICE_SCALE), None if the price unit is unknown
+    """
+    units = _PRICE_UNITS.get(price_unit_raw)
+    if units is None:
+        return None
+    return int((price * UNIT_PRICE_SCALE / units).to_integral_value())
+
+
+class _PriceField:
+    """Price or "Preiseinheit" of an item. Setting it stores the depending prices per
+    single unit, so they are computed once per change instead of on every access.
+    """
+
+    def __init__(self, default, prices: tuple[str, ...]) -> None:
+        self.default = default
+        self.prices = prices
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, di, owner=None):
+        if di is None:
+            return self.default
+        return di.__dict__.get(self.name, self.default)
+
+    def __set__(self, di, value):
+        di.__dict__[self.name] = value
+        for price in self.prices:
+            di.__dict__[f"_unit_{price}"] = unit_price(
+                getattr(di, price), di.price_unit_raw
+            )
+
 
 class DatanormItem:
     _MANUFACTURER_REGEX = r"^([A-Z|0-9|\'|-]{2,})\s"
+    _MANUFACTURER_PATTERN = re.compile(_MANUFACTURER_REGEX)
 
     is_valid: bool = False
 
@@ -26,12 +76,11 @@ class DatanormItem:
     short_text_1: str = ""
     short_text_2: str = ""
     price_indicator: str = ""  # 1: Brutto, 2: Netto
-    price_unit_raw: str = (
-        ""  # 0: per 1 unit, 1: per 10 units, 2: per 100 units 3: per 1000 units
-    )
+    # 0: per 1 unit, 1: per 10 units, 2: per 100 units 3: per 1000 units
+    price_unit_raw: str = _PriceField("", ("price_retail", "price_wholesale"))
     unit_of_measure: str = ""
-    price_retail: Decimal = Decimal("0")
-    price_wholesale: Decimal = Decimal("0")
+    price_retail: Decimal = _PriceField(Decimal("0"), ("price_retail",))
+    price_wholesale: Decimal = _PriceField(Decimal("0"), ("price_wholesale",))
     discount_group: str = ""
     main_product_group_id: str = ""
     main_product_group_name: str | None = None
@@ -59,25 +108,53 @@ class DatanormItem:
         """
         self.tag = tag
 
+    def to_dict(self) -> dict:
+        """Collects the DATANORM fields of the item in a dictionary.
+
+        Returns:
+            dict: Field names and values in declaration order
+        """
+        return {field: getattr(self, field) for field in self.fields()}
+
+    @classmethod
+    def fields(cls) -> tuple[str, ...]:
+        """Names of the DATANORM fields of an item in declaration order"""
+        return tuple(cls.__annotations__)
+
     @property
     def manufacturer_name(self) -> str | None:
         """Extracts Manufacturer name from the short_text_1 field.
         Therefor the manufacturer has to be written in upper case.
         """
-        company_name = None
-        match = re.match(self._MANUFACTURER_REGEX, self.short_text_1)
-        if match is not None:
-            company_name = match.group().rstrip()
-        return company_name
+        return self._split_short_text_1()[0]
 
     @property
     def item_name(self) -> str | None:
         """Extracts item name from the short_text_1 field"""
-        item_name = self.short_text_1
-        match = re.match(self._MANUFACTURER_REGEX, self.short_text_1)
-        if match is not None:
-            item_name = self.short_text_1[match.span()[1] :].lstrip()
-        return item_name
+        return self._split_short_text_1()[1]
+
+    @classmethod
+    def split_manufacturer(cls, short_text_1: str) -> tuple[str | None, str]:
+        """Splits a short text into manufacturer name and item name.
+
+        Args:
+            short_text_1 (str): First short text of an article
+
+        Returns:
+            tuple[str | None, str]: Manufacturer name and item name
+        """
+        match = cls._MANUFACTURER_PATTERN.match(short_text_1)
+        if match is None:
+            return None, short_text_1
+        return match.group().rstrip(), short_text_1[match.end() :].lstrip()
+
+    def _split_short_text_1(self) -> tuple[str | None, str]:
+        """Manufacturer and item name, cached until short_text_1 changes"""
+        cache = self.__dict__.get("_manufacturer_cache")
+        if cache is None or cache[0] is not self.short_text_1:
+            cache = (self.short_text_1, *self.split_manufacturer(self.short_text_1))
+            self._manufacturer_cache = cache
+        return cache[1:]
 
     @property
     def description(self) -> str:
@@ -118,27 +195,29 @@ class DatanormItem:
     @property
     def price_unit(self) -> int | None:
         """Number of units for the given price"""
-        if self.price_unit_raw == "0":
-            units = 1
-        elif self.price_unit_raw == "1":
-            units = 10
-        elif self.price_unit_raw == "2":
-            units = 100
-        elif self.price_unit_raw == "3":
-            units = 1000
-        else:
-            units = None
-        return units
+        return _PRICE_UNITS.get(self.price_unit_raw)
 
     @price_unit.setter
     def price_unit(self, units: int):
-        if units == 1:
-            self.price_unit_raw = "0"
-        elif units == 10:
-            self.price_unit_raw = "1"
-        elif units == 100:
-            self.price_unit_raw = "2"
-        elif units == 1000:
-            self.price_unit_raw = "3"
-        else:
-            self.price_unit_raw = None
+        self.price_unit_raw = _PRICE_UNIT_CODES.get(units)
+
+    @property
+    def unit_price_retail(self) -> int | None:
+        """Retail price of a single unit in millionths of the currency, None if the
+        price unit is unknown. Stored when the price or the price unit is set.
+        """
+        return self._unit_price("price_retail")
+
+    @property
+    def unit_price_wholesale(self) -> int | None:
+        """Wholesale price of a single unit in millionths of the currency, None if the
+        price unit is unknown. Stored when the price or the price unit is set.
+        """
+        return self._unit_price("price_wholesale")
+
+    def _unit_price(self, price: str) -> int | None:
+        key = f"_unit_{price}"
+        if key not in self.__dict__:
+            # default prices and items restored without setting their prices
+            self.__dict__[key] = unit_price(getattr(self, price), self.price_unit_raw)
+        return self.__dict__[key]
@@ -0,0 +1,145 @@
+"""
+DATANORM Catalogue Manager
+--------------------------
+Keeps a catalogue up to date while a service is running. The manager polls size and
+modification time of the supplier files, compiles a changed catalogue in a background
+thread and swaps the compiled catalogue in with a single reference assignment. Lookups
+always use a complete, immutable catalogue and never wait for a rebuild.
+"""
+
+import threading
+from . import DatanormCatalogue, DatanormItem, DatanormSharedCatalogue
+from .datanorm_files import file_signature
+
+
+class DatanormCatalogueManager:
+    catalogue: DatanormCatalogue
+    interval: float
+    version: int
+    last_error: Exception | None
+
+    def __init__(
+        self,
+        base_file: str,
+        price_file: str | None = None,
+        product_group_file: str | None = None,
+        name: str = "",
+        interval: float = 10.0,
+    ) -> None:
+        """Hot reloading catalogue of a single supplier. The catalogue is compiled once
+        on creation, start() watches the files for changes.
+
+        Args:
+            base_file (str): path to the DATANORM base file
+            price_file (str | None, optional): path to the DATPREIS file
+            product_group_file (str | None, optional): path to the DATANORM.WRG file
+            name (str, optional): Name of the supplier, used as tag of the items.
+                Defaults to the name of the directory of the base file.
+            interval (float, optional): Seconds between two checks of the files.
+                Defaults to 10.0.
+        """
+        self.catalogue = DatanormCatalogue(
+            base_file, price_file, product_group_file, name
+        )
+        self.interval = interval
+        self.version = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._signatures = self._file_signatures()
+        self._failed_signatures = None
+        self._compiled = DatanormSharedCatalogue.build(self.catalogue)
+
+    @property
+    def compiled(self) -> DatanormSharedCatalogue:
+        """Current version of the compiled catalogue"""
+        return self._compiled
+
+    def lookup(self, id: str) -> DatanormItem | None:
+        """Looks up an EAN/GTIN/Art.No. in the current version of the catalogue.
+
+        Args:
+            id (str): EAN/GTIN/Art.No. to search for
+
+        Returns:
+            DatanormItem | None: Datanorm item, tagged with the catalogue name
+        """
+        return self._compiled.lookup(id)
+
+    def check(self) -> bool:
+        """Compiles and swaps in the catalogue if one of its files changed. Files still
+        being written while compiling are picked up by the next check. A missing or
+        empty base file and a base file without articles, replacing one with articles,
+        count as failed rebuild, e.g. while a delivery is deleted and copied again.
+
+        Returns:
+            bool: True if a new version was swapped in
+        """
+        with self._lock:
+            signatures = self._file_signatures()
+            if signatures in (self._signatures, self._failed_signatures):
+                return False
+            try:
+                # the base file comes first, its size is -1 if it does not exist
+                if signatures[0][0] <= 0:
+                    raise FileNotFoundError(
+                        f"{self.catalogue.base_file.datanorm_file} is missing or empty"
+                    )
+                compiled = DatanormSharedCatalogue.build(self.catalogue)
+                if len(compiled) == 0 and len(self._compiled) > 0:
+                    raise ValueError(
+                        f"{self.catalogue.base_file.datanorm_file} contains no articles"
+                    )
+            except Exception as error:
+                # keep serving the previous version, e.g. for incomplete files
+                self.last_error = error
+                self._failed_signatures = signatures
+                return False
+            if signatures != self._file_signatures():
+                return False
+            self._compiled = compiled
+            self._signatures = signatures
+            self.version += 1
+            self.last_error = None
+            return True
+
+    def start(self):
+        """Starts watching the files in a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="datanorm-reload", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stops watching the files and waits for a running rebuild"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "DatanormCatalogueManager":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def _file_signatures(self) -> tuple:
+        files = (
+            self.catalogue.base_file,
+            self.catalogue.price_file,
+            self.catalogue.product_group_file,
+        )
+        return tuple(
+            file_signature(datanorm_file.datanorm_file)
+            for datanorm_file in files
+            if datanorm_file is not None
+        )
@@ -0,0 +1,200 @@
+"""
+DATANORM Merge Join
+-------------------
+Enriches a whole DATANORM base file with the prices of a DATPREIS file. Both files are
+streamed side by side and joined on the article number, so the whole catalogue is
+priced in one linear pass over both files instead of one DATPREIS scan per article.
+Unsorted files are sorted externally in bounded memory beforehand.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+import heapq
+from itertools import groupby, islice
+import re
+import tempfile
+from . import DatanormBaseFile, DatanormItem, DatanormPriceFile
+from .datanorm_files import _pattern
+
+
+def enrich_with_prices(
+    base_file: DatanormBaseFile,
+    price_file: DatanormPriceFile,
+    sorted_input: bool | None = None,
+    chunk_size: int = 100000,
+    temp_dir: str | None = None,
+) -> Iterator[DatanormItem]:
+    """Streams all articles of the base file, updated with the prices of the price
+    file.
+
+    Args:
+        base_file (DatanormBaseFile): DATANORM base file
+        price_file (DatanormPriceFile): DATPREIS file
+        sorted_input (bool | None, optional): True if both files are known to be
+            sorted by article number (alphabetically), False to always sort them
+            externally. Defaults to None, which checks the order of both files
+            in an additional pass.
+        chunk_size (int, optional): Number of records sorted in memory at once by
+            the external sort. Defaults to 100000.
+        temp_dir (str | None, optional): Directory for the temporary files of the
+            external sort. Defaults to the system default.
+
+    Yields:
+        DatanormItem: Priced Datanorm items, in the order of the base file if it was
+            sorted, otherwise ordered by article number
+    """
+    key = _alphabetical
+    sort_base = sort_prices = sorted_input is False
+    if sorted_input is None:
+        base_order = _order(_base_keys(base_file))
+        price_order = _order(_price_keys(price_file))
+        if base_order[0] and price_order[0]:
+            key = _alphabetical
+        elif base_order[1] and price_order[1]:
+            key = _numerical
+        else:
+            sort_base = not base_order[0]
+            sort_prices = not price_order[0]
+
+    header = base_file.read_header()
+    with tempfile.TemporaryDirectory(dir=temp_dir) as tmp_dir:
+        records = (
+            (line_a.split(b";")[2].decode(base_file.encoding), line_a, line_b)
+            for _, line_a, line_b in base_file._iter_records()
+        )
+        if sort_base:
+            records = _external_sort(
+                records,
+                _write_record,
+                lambda file_obj: _read_records(file_obj, base_file.encoding),
+                chunk_size,
+                tmp_dir,
+            )
+
+        entries = (
+            (match.group("Artikelnummer"), match)
+            for match in price_file._iter_entries()
+        )
+        if sort_prices:
+            entries = _external_sort(
+                ((id, _entry_text(match)) for id, match in entries),
+                _write_entry,
+                _read_entries,
+                chunk_size,
+                tmp_dir,
+            )
+            entries = ((id, _match_entry(text)) for id, text in entries)
+
+        groups = groupby(entries, key=lambda entry: entry[0])
+        group_id, group = next(groups, (None, None))
+        group_key = None if group_id is None else key(group_id)
+        matches = list(group) if group is not None else []
+
+        for article_id, line_a, line_b in records:
+            di = base_file._item_from_lines(header, line_a, line_b)
+            record_key = key(article_id)
+            while group_key is not None and group_key < record_key:
+                group_id, group = next(groups, (None, None))
+                group_key = None if group_id is None else key(group_id)
+                matches = list(group) if group is not None else []
+            if group_key == record_key:
+                for _, match in matches:
+                    price_file._update_prices(di, match)
+            yield di
+
+
+def _alphabetical(article_id: str) -> str:
+    return article_id
+
+
+def _numerical(article_id: str) -> tuple[int, str]:
+    # the article number itself breaks ties, "0100" and "100" are different articles
+    return int(article_id), article_id
+
+
+def _order(keys: Iterable[str]) -> tuple[bool, bool]:
+    """Checks if the keys are sorted alphabetically and numerically"""
+    alphabetical = numerical = True
+    previous = None
+    for article_id in keys:
+        numerical = numerical and article_id.isdigit()
+        if previous is not None:
+            alphabetical = alphabetical and previous <= article_id
+            numerical = numerical and _numerical(previous) <= _numerical(article_id)
+        if not alphabetical and not numerical:
+            break
+        previous = article_id
+    return alphabetical, numerical
+
+
+def _base_keys(base_file: DatanormBaseFile) -> Iterator[str]:
+    for _, line_a, _ in base_file._iter_records():
+        yield line_a.split(b";")[2].decode(base_file.encoding)
+
+
+def _price_keys(price_file: DatanormPriceFile) -> Iterator[str]:
+    # every price entry consists of 9 fields, following "P;A;"
+    for _, line in price_file.iter_lines():
+        if line.startswith(b"P"):
+            fields = line.rstrip(b"\r\n").split(b";")
+            for article_id in fields[2:-1:9]:
+                yield article_id.decode(price_file.encoding)
+
+
+def _entry_text(match: re.Match[str]) -> str:
+    return match.string[: match.start("NaechsterArtikel")]
+
+
+def _match_entry(text: str) -> re.Match[str]:
+    return _pattern("P_SUB").search(text)
+
+
+def _write_record(file_obj, record: tuple[str, bytes, bytes]):
+    _, line_a, line_b = record
+    file_obj.write(line_a.rstrip(b"\r\n") + b"\n" + line_b.rstrip(b"\r\n") + b"\n")
+
+
+def _read_records(file_obj, encoding: str) -> Iterator[tuple[str, bytes, bytes]]:
+    for line_a in file_obj:
+        line_b = file_obj.readline()
+        yield line_a.split(b";")[2].decode(encoding), line_a, line_b
+
+
+def _write_entry(file_obj, entry: tuple[str, str]):
+    file_obj.write(entry[1].encode("utf-8") + b"\n")
+
+
+def _read_entries(file_obj) -> Iterator[tuple[str, str]]:
+    for line in file_obj:
+        text = line.decode("utf-8").rstrip("\n")
+        yield text.split(";", 1)[0], text
+
+
+def _external_sort(
+    elements: Iterable[tuple],
+    write: Callable,
+    read: Callable,
+    chunk_size: int,
+    tmp_dir: str,
+) -> Iterator[tuple]:
+    """Sorts the elements by their first item in chunks, spilled to temporary files,
+    and merges the sorted chunks.
+    """
+    elements = iter(elements)
+    chunk_files = list()
+    while chunk := list(islice(elements, chunk_size)):
+        # stable sort, so records with equal keys keep the file order
+        chunk.sort(key=lambda element: element[0])
+        chunk_file = tempfile.TemporaryFile(dir=tmp_dir)
+        for element in chunk:
+            write(chunk_file, element)
+        chunk_file.seek(0)
+        chunk_files.append(chunk_file)
+
+    try:
+        yield from heapq.merge(
+            *(read(chunk_file) for chunk_file in chunk_files),
+            key=lambda element: element[0],
+        )
+    finally:
+        for chunk_file in chunk_files:
+            chunk_file.close()
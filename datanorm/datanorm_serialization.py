@@ -0,0 +1,288 @@
+"""
+DATANORM Serialization
+----------------------
+Compact, versioned binary encoding of DatanormItems for caches and worker pools.
+
+Layout of an encoded batch (little endian):
+
+- magic ``DN``, format version (1 byte), number of items (uint32)
+- number of distinct V headers (uint32), their dates in microseconds since 1970
+  (int64 each) and DATANORM versions (uint16 each)
+- per item: header index (uint32), flags (1 byte), retail and wholesale price in
+  cents (int64 each)
+- length of the text block (uint32) and the text block, all text fields of the
+  headers and items, UTF-8 encoded and separated by the unit separator
+
+Header data shared by the items of a batch is stored only once. A single item is
+encoded as batch of one item, which is decoded with a single unpack of its fixed size
+part.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+import datetime
+from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter
+import struct
+import sys
+from . import DatanormItem
+
+FORMAT_VERSION = 1
+
+_MAGIC = b"DN"
+_PREFIX = struct.Struct("<2sBI")
+_LENGTH = struct.Struct("<I")
+# batch of a single item with a single header, up to the text block
+_SINGLE = struct.Struct("<2sBIIqHIBqqI")
+_SEPARATOR = "\x1f"
+_NONE = "\x1e"
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+# marks prices with fractions of cents, which are stored in the text block
+_NOT_IN_CENTS = -(2**63)
+
+_HEADER_TEXT_FIELDS = ("header_1", "header_2", "header_3", "currency")
+_ITEM_TEXT_FIELDS = tuple(
+    field
+    for field, annotation in DatanormItem.__annotations__.items()
+    if field not in _HEADER_TEXT_FIELDS and annotation in (str, str | None)
+) + ("tag",)
+
+_ITEM_FIELDS = _ITEM_TEXT_FIELDS + ("is_valid", "price_retail", "price_wholesale")
+
+_FLAG_VALID = 1
+
+_get_header = attrgetter("date", "version", *_HEADER_TEXT_FIELDS)
+_get_texts = attrgetter(*_ITEM_TEXT_FIELDS)
+
+
+def encode_item(di: DatanormItem) -> bytes:
+    """Encodes a single Datanorm item.
+
+    Args:
+        di (DatanormItem): Datanorm item to encode
+
+    Returns:
+        bytes: Encoded item
+    """
+    return encode_items((di,))
+
+
+def decode_item(data: bytes) -> DatanormItem:
+    """Decodes a single Datanorm item.
+
+    Args:
+        data (bytes): Item encoded by encode_item
+
+    Raises:
+        ValueError: If the data does not contain exactly one item
+
+    Returns:
+        DatanormItem: Decoded item
+    """
+    try:
+        fields = _SINGLE.unpack_from(data, 0)
+    except struct.error:
+        # too short for a single item, e.g. an empty batch
+        return _single(decode_items(data))
+    magic, version, count, header_count, date, dn_version, *item = fields
+    if magic != _MAGIC or version != FORMAT_VERSION or count != 1 or header_count != 1:
+        return _single(decode_items(data))
+    _, flags, retail, wholesale, text_length = item
+    texts = _split(bytes(data[_SINGLE.size : _SINGLE.size + text_length]))
+    header_end = len(_ITEM_TEXT_FIELDS) + len(_HEADER_TEXT_FIELDS)
+    header = _header(texts[len(_ITEM_TEXT_FIELDS) : header_end], date, dn_version)
+    extra_texts = iter(texts[header_end:])
+    return _item(header, texts, flags, retail, wholesale, extra_texts)
+
+
+def encode_items(items: Iterable[DatanormItem]) -> bytes:
+    """Encodes a batch of Datanorm items.
+
+    Args:
+        items (Iterable[DatanormItem]): Datanorm items to encode
+
+    Raises:
+        ValueError: If a text field contains the control characters used as
+            separators
+
+    Returns:
+        bytes: Encoded batch
+    """
+    headers = dict()
+    header_indices = array("I")
+    flags = bytearray()
+    prices = array("q")
+    texts = list()
+    extra_texts = list()
+
+    for di in items:
+        header_indices.append(headers.setdefault(_get_header(di), len(headers)))
+        flags.append(_FLAG_VALID if di.is_valid else 0)
+        for price in (di.price_retail, di.price_wholesale):
+            numerator, denominator = Decimal(price).as_integer_ratio()
+            if 100 % denominator == 0:
+                prices.append(numerator * (100 // denominator))
+            else:
+                prices.append(_NOT_IN_CENTS)
+                extra_texts.append(str(price))
+        texts.extend(_get_texts(di))
+
+    dates = array("q", ((date - _EPOCH) // _MICROSECOND for date, *_ in headers))
+    versions = array("H", (version for _, version, *_ in headers))
+    for _, _, *header_texts in headers:
+        texts.extend(header_texts)
+    texts.extend(extra_texts)
+    text_block = _join(texts)
+
+    for numbers in (dates, versions, header_indices, prices):
+        if sys.byteorder != "little":
+            numbers.byteswap()
+
+    return b"".join(
+        (
+            _PREFIX.pack(_MAGIC, FORMAT_VERSION, len(flags)),
+            _LENGTH.pack(len(headers)),
+            dates.tobytes(),
+            versions.tobytes(),
+            header_indices.tobytes(),
+            bytes(flags),
+            prices.tobytes(),
+            _LENGTH.pack(len(text_block)),
+            text_block,
+        )
+    )
+
+
+def decode_items(data: bytes) -> list[DatanormItem]:
+    """Decodes a batch of Datanorm items.
+
+    Args:
+        data (bytes): Batch encoded by encode_items
+
+    Raises:
+        ValueError: If the data is not an encoded batch of a supported version
+
+    Returns:
+        list[DatanormItem]: Decoded items
+    """
+    view = memoryview(data)
+    try:
+        magic, version, count = _PREFIX.unpack_from(view, 0)
+    except struct.error:
+        raise ValueError("Data is not an encoded Datanorm item") from None
+    if magic != _MAGIC:
+        raise ValueError("Data is not an encoded Datanorm item")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version {version}")
+    position = _PREFIX.size
+    (header_count,) = _LENGTH.unpack_from(view, position)
+    position += _LENGTH.size
+
+    dates, position = _read_array("q", view, position, header_count)
+    versions, position = _read_array("H", view, position, header_count)
+    header_indices, position = _read_array("I", view, position, count)
+    flags = view[position : position + count]
+    position += count
+    prices, position = _read_array("q", view, position, 2 * count)
+    (text_length,) = _LENGTH.unpack_from(view, position)
+    position += _LENGTH.size
+    texts = _split(bytes(view[position : position + text_length]))
+
+    stride = len(_ITEM_TEXT_FIELDS)
+    header_fields = len(_HEADER_TEXT_FIELDS)
+    header_start = count * stride
+    headers = list()
+    for index in range(header_count):
+        offset = header_start + index * header_fields
+        header_texts = texts[offset : offset + header_fields]
+        headers.append(_header(header_texts, dates[index], versions[index]))
+    extra_texts = iter(texts[header_start + header_count * header_fields :])
+
+    return [
+        _item(
+            headers[header_indices[index]],
+            texts[index * stride : (index + 1) * stride],
+            flags[index],
+            prices[2 * index],
+            prices[2 * index + 1],
+            extra_texts,
+        )
+        for index in range(count)
+    ]
+
+
+def _single(items: list[DatanormItem]) -> DatanormItem:
+    if len(items) != 1:
+        raise ValueError(f"Expected a single Datanorm item, got {len(items)}")
+    return items[0]
+
+
+def _header(texts: list[str | None], date: int, version: int) -> dict:
+    """Field values of a V header, with placeholders for the fields of the items, so
+    the copies for the items are not resized while their fields are added
+    """
+    header = dict.fromkeys(_ITEM_FIELDS)
+    header.update(zip(_HEADER_TEXT_FIELDS, texts))
+    header["date"] = _EPOCH + date * _MICROSECOND
+    header["version"] = version
+    return header
+
+
+def _item(
+    header: dict,
+    texts: list[str | None],
+    flags: int,
+    retail: int,
+    wholesale: int,
+    extra_texts: Iterator[str],
+) -> DatanormItem:
+    """Builds an item from its decoded fields, the text fields of the item first"""
+    values = header.copy()
+    values.update(zip(_ITEM_TEXT_FIELDS, texts))
+    values["is_valid"] = bool(flags & _FLAG_VALID)
+    values["price_retail"] = (
+        _decimal(retail) if retail != _NOT_IN_CENTS else Decimal(next(extra_texts))
+    )
+    values["price_wholesale"] = (
+        _decimal(wholesale)
+        if wholesale != _NOT_IN_CENTS
+        else Decimal(next(extra_texts))
+    )
+    di = DatanormItem.__new__(DatanormItem)
+    di.__dict__ = values
+    return di
+
+
+@lru_cache(maxsize=4096)
+def _decimal(cents: int) -> Decimal:
+    # prices repeat a lot in catalogues, the cache is faster than creating them
+    return Decimal(cents).scaleb(-2)
+
+
+def _read_array(typecode: str, view: memoryview, position: int, count: int):
+    numbers = array(typecode)
+    end = position + count * numbers.itemsize
+    numbers.frombytes(view[position:end])
+    if sys.byteorder != "little":
+        numbers.byteswap()
+    return numbers, end
+
+
+def _join(texts: list[str | None]) -> bytes:
+    texts = [_NONE if text is None else text for text in texts]
+    text_block = _SEPARATOR.join(texts)
+    if texts and text_block.count(_SEPARATOR) != len(texts) - 1:
+        raise ValueError("Text fields must not contain the unit separator")
+    return text_block.encode("utf-8")
+
+
+def _split(text_block: bytes) -> list[str | None]:
+    if not text_block:
+        return []
+    text = text_block.decode("utf-8")
+    texts = text.split(_SEPARATOR)
+    if _NONE in text:
+        texts = [None if text == _NONE else text for text in texts]
+    return texts
@@ -0,0 +1,432 @@
+"""
+DATANORM Shared Catalogue
+-------------------------
+Compiled, read-only catalogue for multi-process servers. The articles of a catalogue
+are parsed, priced and named once, compiled into a compact binary image and placed in
+shared memory or a memory mapped file. Other processes attach to the image without
+copying it and decode only the articles they look up.
+
+The retail and wholesale prices per single unit are computed once while compiling and
+stored as fixed-point columns, so prices of whole catalogues can be compared without
+decoding any article.
+
+Layout of the image (little endian):
+
+- magic ``DNSC``, format version (uint32), number of articles n (uint64), number of
+  keys k (uint64), size of the image (uint64)
+- n + 1 offsets of the encoded articles in the data section (uint64 each)
+- k sorted key hashes (uint64 each) and the record numbers of the keys (uint64 each)
+- k + 1 offsets of the keys in the key section (uint64 each)
+- n retail and n wholesale prices per unit in millionths of the currency (int64 each)
+- key section, the UTF-8 encoded article numbers and EAN/GTIN in hash order
+- data section, the articles encoded by encode_item
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from hashlib import blake2b
+import mmap
+from multiprocessing import resource_tracker, shared_memory
+import os
+import struct
+import sys
+from typing import NamedTuple
+from . import DatanormCatalogue, DatanormItem, decode_item, encode_item
+from .datanorm_groups import DatanormProductGroupTree
+from .datanorm_merge import enrich_with_prices
+
+FORMAT_VERSION = 2
+
+# SharedMemory(track=False) is available since Python 3.13
+_TRACK_ARGUMENT = sys.version_info >= (3, 13)
+
+_MAGIC = b"DNSC"
+_HEADER = struct.Struct("<4sIQQQ")
+
+
+class DatanormUnitOffer(NamedTuple):
+    catalogue: "DatanormSharedCatalogue"
+    record_number: int
+    unit_price: int
+
+
+class DatanormSharedCatalogue:
+    name: str | None
+
+    def __init__(self, buffer, name: str | None = None, owner=None) -> None:
+        """Read-only view of a compiled catalogue. Use create(), attach(), compile()
+        or open() to get an instance.
+
+        Args:
+            buffer: Buffer with the compiled catalogue
+            name (str | None, optional): Name of the shared memory block
+            owner (optional): Shared memory block or mapped file backing the buffer
+        """
+        self.name = name
+        self._owner = owner
+        self._buffer = memoryview(buffer)
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError("Buffer does not contain a compiled DATANORM catalogue")
+        magic, version, count, key_count, _ = _HEADER.unpack_from(self._buffer, 0)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Buffer does not contain a compiled DATANORM catalogue")
+        if sys.byteorder != "little":
+            raise ValueError("Compiled catalogues require a little endian platform")
+
+        position = _HEADER.size
+        columns = list()
+        for typecode, length in (
+            ("Q", count + 1),
+            ("Q", key_count),
+            ("Q", key_count),
+            ("Q", key_count + 1),
+            ("q", count),
+            ("q", count),
+        ):
+            column = self._buffer[position : position + 8 * length]
+            columns.append(column.cast(typecode))
+            position += 8 * length
+        (
+            self._offsets,
+            self._hashes,
+            self._records,
+            self._key_offsets,
+            self._unit_prices_retail,
+            self._unit_prices_wholesale,
+        ) = columns
+        key_size = self._key_offsets[-1]
+        self._keys = self._buffer[position : position + key_size]
+        self._data = self._buffer[position + key_size :]
+
+    @classmethod
+    def build(cls, catalogue: DatanormCatalogue) -> "DatanormSharedCatalogue":
+        """Compiles the catalogue into the private memory of this process. The image
+        is independent of the DATANORM files, which may change afterwards.
+
+        Args:
+            catalogue (DatanormCatalogue): Catalogue to compile
+
+        Returns:
+            DatanormSharedCatalogue: View of the compiled catalogue
+        """
+        size, parts = _compile(catalogue)
+        image = bytearray(size)
+        _write_parts(image, parts)
+        return cls(image)
+
+    @classmethod
+    def create(
+        cls, catalogue: DatanormCatalogue, name: str | None = None
+    ) -> "DatanormSharedCatalogue":
+        """Compiles the catalogue into a new shared memory block. The creating process
+        owns the block and has to unlink() it when it is not needed anymore.
+
+        Args:
+            catalogue (DatanormCatalogue): Catalogue to compile
+            name (str | None, optional): Name of the shared memory block. Defaults to
+                a random name.
+
+        Returns:
+            DatanormSharedCatalogue: View of the shared catalogue
+        """
+        size, parts = _compile(catalogue)
+        block = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _write_parts(block.buf, parts)
+        return cls(block.buf[:size], block.name, block)
+
+    @classmethod
+    def attach(cls, name: str) -> "DatanormSharedCatalogue":
+        """Attaches to a shared catalogue, created by another process.
+
+        Args:
+            name (str): Name of the shared memory block
+
+        Returns:
+            DatanormSharedCatalogue: View of the shared catalogue
+        """
+        # Only the creating process may remove the block. The resource tracker of
+        # an attaching process would remove it when the process exits, so attached
+        # blocks are not tracked.
+        if _TRACK_ARGUMENT:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            block = shared_memory.SharedMemory(name=name)
+            _untrack(block)
+        # the block may be larger than the image, rounded up to whole pages
+        size = _HEADER.unpack_from(block.buf, 0)[4]
+        return cls(block.buf[:size], block.name, block)
+
+    @classmethod
+    def compile(cls, catalogue: DatanormCatalogue, path: str):
+        """Compiles the catalogue into a file, to be memory mapped by open().
+
+        Args:
+            catalogue (DatanormCatalogue): Catalogue to compile
+            path (str): Path of the compiled catalogue
+        """
+        _, parts = _compile(catalogue)
+        with open(path, "wb") as file_obj:
+            file_obj.writelines(parts)
+
+    @classmethod
+    def open(cls, path: str) -> "DatanormSharedCatalogue":
+        """Maps a compiled catalogue file read-only into memory. The pages are shared
+        by all processes mapping the same file.
+
+        Args:
+            path (str): Path of the compiled catalogue
+
+        Returns:
+            DatanormSharedCatalogue: View of the compiled catalogue
+        """
+        with open(path, "rb") as file_obj:
+            mm_object = mmap.mmap(file_obj.fileno(), length=0, access=mmap.ACCESS_READ)
+        return cls(mm_object, owner=mm_object)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, record_number: int) -> DatanormItem:
+        """Decodes the article with the given record number"""
+        if not 0 <= record_number < len(self):
+            raise IndexError("record number out of range")
+        start = self._offsets[record_number]
+        return decode_item(self._data[start : self._offsets[record_number + 1]])
+
+    def __iter__(self) -> Iterator[DatanormItem]:
+        for record_number in range(len(self)):
+            yield self[record_number]
+
+    def lookup(self, id: str) -> DatanormItem | None:
+        """Looks up an article number or EAN/GTIN.
+
+        Args:
+            id (str): Article number or EAN/GTIN
+
+        Returns:
+            DatanormItem | None: Decoded Datanorm item
+        """
+        record_numbers = self.record_numbers(id)
+        if record_numbers:
+            return self[record_numbers[0]]
+
+    def record_numbers(self, id: str) -> list[int]:
+        """Record numbers of all articles with the given article number or EAN/GTIN.
+
+        Args:
+            id (str): Article number or EAN/GTIN
+
+        Returns:
+            list[int]: Record numbers in the order of the base file
+        """
+        key = id.encode("utf-8")
+        key_hash = _hash(id)
+        position = bisect_left(self._hashes, key_hash)
+        record_numbers = list()
+        # different keys might share a hash, so the candidates are compared
+        while position < len(self._hashes) and self._hashes[position] == key_hash:
+            start, end = self._key_offsets[position], self._key_offsets[position + 1]
+            if self._keys[start:end] == key:
+                record_numbers.append(self._records[position])
+            position += 1
+        return record_numbers
+
+    def unit_price_columns(self) -> tuple[memoryview, memoryview]:
+        """Retail and wholesale prices per single unit of all articles, indexed by
+        record number, in millionths of the currency. Unknown prices are 0.
+
+        Returns:
+            tuple[memoryview, memoryview]: Read-only int64 columns of the image
+        """
+        return self._unit_prices_retail, self._unit_prices_wholesale
+
+    def unit_prices(self, ids: Iterable[str]) -> dict[str, tuple[int, int]]:
+        """Retail and wholesale prices per single unit of a batch of articles, read
+        from the precomputed columns without decoding the articles.
+
+        Args:
+            ids (Iterable[str]): Article numbers or EAN/GTIN
+
+        Returns:
+            dict[str, tuple[int, int]]: Retail and wholesale price per unit in
+                millionths of the currency of the first article of each found ID
+        """
+        prices = dict()
+        for id in ids:
+            record_numbers = self.record_numbers(id)
+            if record_numbers:
+                record_number = record_numbers[0]
+                prices[id] = (
+                    self._unit_prices_retail[record_number],
+                    self._unit_prices_wholesale[record_number],
+                )
+        return prices
+
+    def close(self):
+        """Releases the view of this process"""
+        for view in (
+            self._offsets,
+            self._hashes,
+            self._records,
+            self._key_offsets,
+            self._unit_prices_retail,
+            self._unit_prices_wholesale,
+            self._keys,
+            self._data,
+        ):
+            view.release()
+        self._buffer.release()
+        if self._owner is not None:
+            self._owner.close()
+
+    def unlink(self):
+        """Removes the shared memory block, called by the creating process"""
+        if isinstance(self._owner, shared_memory.SharedMemory):
+            if not _TRACK_ARGUMENT and os.name == "posix":
+                # an attaching child process might have untracked the block in the
+                # resource tracker it shares with this process, unlink() untracks it
+                resource_tracker.register(_tracked_name(self._owner), "shared_memory")
+            self._owner.unlink()
+
+    def __enter__(self) -> "DatanormSharedCatalogue":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def cheapest_per_unit(
+    catalogues: Iterable[DatanormSharedCatalogue],
+    ids: Iterable[str],
+    price: str = "wholesale",
+) -> dict[str, DatanormUnitOffer]:
+    """Finds the cheapest offer per single unit of each article across the compiled
+    catalogues of several suppliers. Only the precomputed price columns are compared,
+    the articles are not decoded. Articles without the price are left out.
+
+    Args:
+        catalogues (Iterable[DatanormSharedCatalogue]): Compiled catalogues
+        ids (Iterable[str]): Article numbers or EAN/GTIN
+        price (str, optional): Compared price, "retail" or "wholesale". Defaults to
+            "wholesale".
+
+    Raises:
+        ValueError: If the price is unknown
+
+    Returns:
+        dict[str, DatanormUnitOffer]: Cheapest offer of each found ID, the price per
+            unit in millionths of the currency. Ties go to the first catalogue.
+    """
+    if price not in ("retail", "wholesale"):
+        raise ValueError(f"Unknown price '{price}', use 'retail' or 'wholesale'")
+    columns = list()
+    for catalogue in catalogues:
+        retail, wholesale = catalogue.unit_price_columns()
+        columns.append((catalogue, retail if price == "retail" else wholesale))
+    offers = dict()
+    for id in ids:
+        for catalogue, column in columns:
+            for record_number in catalogue.record_numbers(id):
+                value = column[record_number]
+                if value > 0 and (id not in offers or value < offers[id].unit_price):
+                    offers[id] = DatanormUnitOffer(catalogue, record_number, value)
+    return offers
+
+
+def _compile(catalogue: DatanormCatalogue) -> tuple[int, list]:
+    """Parses, prices and names all articles of the catalogue into the parts of an
+    image. The parts are written one after another, without joining them first.
+
+    Returns:
+        tuple[int, list]: Size of the image and its parts
+    """
+    if catalogue.price_file is not None:
+        items = enrich_with_prices(catalogue.base_file, catalogue.price_file)
+    else:
+        items = catalogue.base_file.iter_items()
+    tree = None
+    if catalogue.product_group_file is not None:
+        tree = DatanormProductGroupTree.build(catalogue.product_group_file)
+
+    offsets = array("Q", [0])
+    unit_prices_retail = array("q")
+    unit_prices_wholesale = array("q")
+    keys = list()
+    data = bytearray()
+    for record_number, di in enumerate(items):
+        di.tag = catalogue.name
+        if tree is not None:
+            _name_groups(di, tree)
+        data += encode_item(di)
+        offsets.append(len(data))
+        # prices stored by the item while parsing, 0 for unknown price units
+        unit_prices_retail.append(di.unit_price_retail or 0)
+        unit_prices_wholesale.append(di.unit_price_wholesale or 0)
+        keys.append((_hash(di.article_id), record_number, di.article_id))
+        if di.ean.strip():
+            keys.append((_hash(di.ean), record_number, di.ean))
+
+    keys.sort()
+    hashes = array("Q", (key_hash for key_hash, _, _ in keys))
+    records = array("Q", (record_number for _, record_number, _ in keys))
+    encoded_keys = [key.encode("utf-8") for _, _, key in keys]
+    key_offsets = array("Q", [0])
+    for key in encoded_keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+    columns = (
+        offsets,
+        hashes,
+        records,
+        key_offsets,
+        unit_prices_retail,
+        unit_prices_wholesale,
+    )
+    if sys.byteorder != "little":
+        for numbers in columns:
+            numbers.byteswap()
+    size = _HEADER.size + sum(len(numbers) * 8 for numbers in columns)
+    size += key_offsets[-1] + len(data)
+    header = _HEADER.pack(_MAGIC, FORMAT_VERSION, len(offsets) - 1, len(keys), size)
+    return size, [header, *columns, *encoded_keys, data]
+
+
+def _write_parts(buffer, parts: list):
+    """Copies the parts of an image one after another into the buffer"""
+    view = memoryview(buffer)
+    position = 0
+    for part in parts:
+        with memoryview(part) as source:
+            end = position + source.nbytes
+            view[position:end] = source.cast("B")
+            position = end
+    view.release()
+
+
+def _untrack(block: shared_memory.SharedMemory):
+    """Removes an attached block from the resource tracker, for Python versions
+    without the track argument of SharedMemory (before 3.13). Only POSIX systems track
+    shared memory.
+    """
+    if os.name == "posix":
+        resource_tracker.unregister(_tracked_name(block), "shared_memory")
+
+
+def _tracked_name(block: shared_memory.SharedMemory) -> str:
+    # POSIX shared memory names start with a slash, which the name property omits
+    return "/" + block.name
+
+
+def _name_groups(di: DatanormItem, tree: DatanormProductGroupTree):
+    main_group = tree.group(di.main_product_group_id)
+    if main_group is not None:
+        di.main_product_group_name = main_group.name
+    group = tree.group(di.main_product_group_id, di.product_group_id)
+    if group is not None:
+        di.product_group_name = group.name
+
+
+def _hash(key: str) -> int:
+    # stable across processes, unlike the builtin hash()
+    digest = blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
@@ -0,0 +1,274 @@
+"""
+DATANORM Validator
+------------------
+Structural validation of DATANORM files in a single pass. The validator checks the
+encoding, the V header, the record types of the file type, the field layout of each
+record, numeric fields and the pairing of A and B records. Each problem is reported
+with line number and byte offset, so broken deliveries can be rejected before they
+are indexed or imported. Large files can be validated in parallel chunks.
+
+REFERENCE for technical details: https://docplayer.org/115761786-Technische-spezifikationen-der-datanorm-dateien-in-haufe-lexware.html  # noqa: E501
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+import mmap
+import os
+from typing import NamedTuple
+from . import (
+    DatanormBaseFile,
+    DatanormDiscountFile,
+    DatanormPriceFile,
+    DatanormProductGroupFile,
+)
+from .datanorm_files import DatanormFile, _pattern
+
+# record types, allowed in addition to the V header
+_RECORD_TYPES = {
+    DatanormBaseFile: "ABDT",
+    DatanormPriceFile: "P",
+    DatanormProductGroupFile: "S",
+    DatanormDiscountFile: "R",
+}
+
+# fields of a single price entry in a P record
+_PRICE_ENTRY_FIELDS = 9
+
+
+class DatanormValidationError(NamedTuple):
+    line: int
+    offset: int
+    record_type: str
+    message: str
+
+
+def validate(
+    datanorm_file: DatanormFile,
+    workers: int = 1,
+    max_errors: int | None = None,
+) -> list[DatanormValidationError]:
+    """Validates the structure of a DATANORM file.
+
+    Args:
+        datanorm_file (DatanormFile): DATANORM file to validate, the checked record
+            types depend on the file type
+        workers (int, optional): Number of processes validating chunks of the file in
+            parallel. Defaults to 1.
+        max_errors (int | None, optional): Stop after the given number of errors.
+            Defaults to None.
+
+    Raises:
+        ValueError: If the file type can not be validated
+
+    Returns:
+        list[DatanormValidationError]: Found problems, ordered by line number
+    """
+    path = datanorm_file.datanorm_file
+    if not os.path.isfile(path):
+        return [DatanormValidationError(0, 0, "", "file does not exist")]
+    size = os.path.getsize(path)
+    if size == 0:
+        return [DatanormValidationError(1, 0, "", "missing V header")]
+
+    record_types = next(
+        (
+            types
+            for cls, types in _RECORD_TYPES.items()
+            if isinstance(datanorm_file, cls)
+        ),
+        None,
+    )
+    if record_types is None:
+        raise ValueError(f"Unsupported file type {type(datanorm_file).__name__}")
+    bounds = _chunk_bounds(path, size, workers, record_types[0].encode())
+    args = [
+        (path, datanorm_file.encoding, record_types, start, end, max_errors)
+        for start, end in bounds
+    ]
+    if len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_validate_chunk, *zip(*args)))
+    else:
+        results = [_validate_chunk(*args[0])]
+
+    errors = list()
+    first_line = 1
+    for chunk_errors, line_count in results:
+        errors.extend(
+            error._replace(line=error.line + first_line) for error in chunk_errors
+        )
+        first_line += line_count
+    # each chunk stops at max_errors, so the first max_errors of all chunks remain
+    errors.sort(key=lambda error: error.line)
+    return errors[:max_errors]
+
+
+def _chunk_bounds(
+    path: str, size: int, chunks: int, record_start: bytes
+) -> list[tuple[int, int]]:
+    """Splits the file into chunks, starting at records of the first record type.
+    Thereby A/B record pairs are never split.
+    """
+    if chunks <= 1:
+        return [(0, size)]
+    with open(path, "rb") as file_obj:
+        with mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            starts = [0]
+            for chunk in range(1, chunks):
+                position = max(size * chunk // chunks, starts[-1])
+                start = data.find(b"\n" + record_start, position)
+                if start == -1:
+                    break
+                starts.append(start + 1)
+    starts = sorted(set(starts))
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _validate_chunk(
+    path: str,
+    encoding: str,
+    record_types: str,
+    start: int,
+    end: int,
+    max_errors: int | None,
+) -> tuple[list[DatanormValidationError], int]:
+    """Validates the lines between the byte offsets start and end.
+
+    Returns:
+        tuple[list[DatanormValidationError], int]: Found problems with line numbers
+            relative to the chunk and number of lines in the chunk, also if the
+            validation stopped early
+    """
+    errors = list()
+    line_index = 0
+    pending_a = None
+
+    def report(index: int, offset: int, record_type: str, message: str):
+        errors.append(DatanormValidationError(index, offset, record_type, message))
+
+    with open(path, "rb") as file_obj:
+        with mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            data.seek(start)
+            offset = start
+            while offset < end and (max_errors is None or len(errors) < max_errors):
+                raw = data.readline()
+                try:
+                    line = raw.decode(encoding).rstrip("\r\n")
+                except UnicodeDecodeError as error:
+                    message = f"not encoded in {encoding}: {error.reason}"
+                    report(line_index, offset, "", message)
+                    line = raw.decode(encoding, errors="replace").rstrip("\r\n")
+                else:
+                    if _is_utf_8(raw, encoding):
+                        message = f"not encoded in {encoding}: UTF-8 characters"
+                        report(line_index, offset, "", message)
+                record_type = line[:1]
+
+                if record_type == "B" and "A" in record_types:
+                    _check_pairing(line, pending_a, line_index, offset, report)
+                    pending_a = None
+                elif pending_a is not None:
+                    report(*pending_a[:2], "A", "A record without B record")
+                    pending_a = None
+
+                if offset == 0 and record_type != "V":
+                    report(line_index, offset, record_type, "missing V header")
+                if record_type == "V":
+                    _check_header(line, offset, line_index, report)
+                elif record_type in record_types:
+                    message = _check_record(record_type, line)
+                    if message:
+                        report(line_index, offset, record_type, message)
+                    if record_type == "A":
+                        pending_a = (line_index, offset, line.split(";")[2:3])
+                elif line.strip():
+                    report(line_index, offset, record_type, "unknown record type")
+
+                offset += len(raw)
+                line_index += 1
+
+            # the line numbers of the following chunks depend on all lines
+            line_count = line_index + _count_lines(data, offset, end)
+
+    # a validation stopped early does not know the following B record
+    if pending_a is not None and offset >= end:
+        report(*pending_a[:2], "A", "A record without B record")
+    return errors, line_count
+
+
+def _is_utf_8(raw: bytes, encoding: str) -> bool:
+    """Checks if a line of a single byte encoded file contains UTF-8 encoded
+    characters. cp850 decodes every byte, so UTF-8 deliveries are only recognised by
+    their valid multi-byte sequences, which are rare in cp850 and cp1252 text.
+    """
+    if raw.isascii() or encoding == "utf-8":
+        return False
+    try:
+        raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _count_lines(data: mmap.mmap, start: int, end: int) -> int:
+    """Counts the lines between the byte offsets start and end, including a last
+    line without line break
+    """
+    count = 0
+    block_size = 1 << 20
+    for position in range(start, end, block_size):
+        count += data[position : min(position + block_size, end)].count(b"\n")
+    if start < end and data[end - 1 : end] != b"\n":
+        count += 1
+    return count
+
+
+def _check_header(line: str, offset: int, line_index: int, report):
+    if offset != 0:
+        report(line_index, offset, "V", "V header not at the beginning of the file")
+    match = _pattern("V").match(line)
+    if match is None:
+        report(line_index, offset, "V", "malformed V header")
+        return
+    try:
+        datetime.datetime.strptime(match.group("Datum"), "%d%m%y")
+    except ValueError:
+        report(line_index, offset, "V", f"invalid date {match.group('Datum')}")
+
+
+def _check_pairing(line: str, pending_a, line_index: int, offset: int, report):
+    if pending_a is None:
+        report(line_index, offset, "B", "B record without A record")
+    elif pending_a[2] != line.split(";")[2:3]:
+        report(line_index, offset, "B", "article number differs from A record")
+
+
+def _check_record(record_type: str, line: str) -> str | None:
+    """Checks the field layout and the numeric fields of a single record.
+
+    Returns:
+        str | None: Description of the problem, None if the record is valid
+    """
+    if record_type == "P":
+        fields = line.split(";")
+        entries = fields[2:]
+        if entries and entries[-1] == "":
+            entries = entries[:-1]
+        if len(fields) < 3 or len(entries) % _PRICE_ENTRY_FIELDS != 0:
+            return f"P record entries must have {_PRICE_ENTRY_FIELDS} fields"
+        for index in range(0, len(entries), _PRICE_ENTRY_FIELDS):
+            price_type, price = entries[index + 1 : index + 3]
+            if price_type not in ("1", "2", "3"):
+                return f"invalid price indicator '{price_type}'"
+            if not price.isdigit():
+                return f"invalid price '{price}'"
+        return
+
+    match = _pattern(record_type).match(line)
+    if match is None:
+        return f"malformed {record_type} record"
+    if record_type == "A":
+        if not match.group("Preis").isdigit():
+            return f"invalid price '{match.group('Preis')}'"
+        if match.group("Preiseinheit") not in ("0", "1", "2", "3"):
+            return f"invalid price unit '{match.group('Preiseinheit')}'"
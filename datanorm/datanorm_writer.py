@@ -0,0 +1,251 @@
+"""
+DATANORM Writer
+---------------
+Serialises DatanormItems into DATANORM 4 files. The records are formatted in chunks
+and written as large encoded blocks, so writing is bound by I/O rather than by the
+handling of single lines. All methods accept arbitrary iterables, e.g. generators.
+
+REFERENCE for technical details: https://docplayer.org/115761786-Technische-spezifikationen-der-datanorm-dateien-in-haufe-lexware.html  # noqa: E501
+"""
+
+from collections.abc import Iterable, Iterator
+import datetime
+from decimal import Decimal
+from itertools import islice
+import os
+from . import (
+    DatanormBaseFile,
+    DatanormDiscountFile,
+    DatanormItem,
+    DatanormPriceFile,
+    DatanormProductGroupFile,
+)
+
+
+class DatanormWriter:
+    line_terminator = "\r\n"
+    buffer_size = 1 << 20
+    chunk_size = 4096
+    articles_per_price_line = 3
+
+    directory: str
+    date: datetime.datetime
+    header_1: str
+    header_2: str
+    header_3: str
+    version: int
+    currency: str
+
+    def __init__(
+        self,
+        directory: str,
+        header_1: str = "",
+        header_2: str = "",
+        header_3: str = "",
+        date: datetime.datetime | None = None,
+        version: int = 4,
+        currency: str = "EUR",
+    ) -> None:
+        """Writer for DATANORM 4 files.
+
+        Args:
+            directory (str): Directory to write the DATANORM files to
+            header_1 (str, optional): First information text of the V record
+            header_2 (str, optional): Second information text of the V record
+            header_3 (str, optional): Third information text of the V record
+            date (datetime.datetime | None, optional): Date of the V record.
+                Defaults to today.
+            version (int, optional): DATANORM version. Defaults to 4.
+            currency (str, optional): Currency of the prices. Defaults to "EUR".
+        """
+        self.directory = directory
+        self.header_1 = header_1
+        self.header_2 = header_2
+        self.header_3 = header_3
+        self.date = date or datetime.datetime.now()
+        self.version = version
+        self.currency = currency
+
+    def write_base_file(
+        self, items: Iterable[DatanormItem], filename: str = "DATANORM.001"
+    ) -> int:
+        """Writes the V header and the A/B records of the given items.
+
+        Args:
+            items (Iterable[DatanormItem]): Articles to write
+            filename (str, optional): File name. Defaults to "DATANORM.001".
+
+        Returns:
+            int: Number of written articles
+        """
+        counter = _Counter(items)
+        lines = (
+            line for di in counter for line in (self._a_record(di), self._b_record(di))
+        )
+        self._write(filename, DatanormBaseFile.encoding, lines)
+        return counter.count
+
+    def write_price_file(
+        self, items: Iterable[DatanormItem], filename: str = "DATPREIS.001"
+    ) -> int:
+        """Writes the V header and the P records of the given items. The prices of
+        several articles are packed into one P record.
+
+        Args:
+            items (Iterable[DatanormItem]): Articles to write the prices of
+            filename (str, optional): File name. Defaults to "DATPREIS.001".
+
+        Returns:
+            int: Number of written prices
+        """
+        counter = _Counter(self._price_entries(items))
+        self._write(filename, DatanormPriceFile.encoding, self._p_records(counter))
+        return counter.count
+
+    def write_product_group_file(
+        self, items: Iterable[DatanormItem], filename: str = "DATANORM.WRG"
+    ) -> int:
+        """Writes the V header and the S records of the product groups used by the
+        given items.
+
+        Args:
+            items (Iterable[DatanormItem]): Articles to collect the product groups of
+            filename (str, optional): File name. Defaults to "DATANORM.WRG".
+
+        Returns:
+            int: Number of written S records
+        """
+        main_groups = dict()
+        for di in items:
+            name, groups = main_groups.setdefault(
+                di.main_product_group_id, [None, dict()]
+            )
+            if name is None and di.main_product_group_name is not None:
+                main_groups[di.main_product_group_id][0] = di.main_product_group_name
+            if di.product_group_id and di.product_group_name is not None:
+                groups.setdefault(di.product_group_id, di.product_group_name)
+
+        lines = list()
+        for main_group_id, (name, groups) in main_groups.items():
+            lines.append(_checked(f"S;;{main_group_id};{name or ''};;;", 6))
+            lines.extend(
+                _checked(f"S;;{main_group_id};;{group_id};{group_name};", 6)
+                for group_id, group_name in groups.items()
+            )
+        self._write(filename, DatanormProductGroupFile.encoding, lines)
+        return len(lines)
+
+    def write_discount_file(
+        self,
+        discounts: Iterable[tuple[str, str, Decimal, str]],
+        filename: str = "DATANORM.RAB",
+    ) -> int:
+        """Writes the V header and the R records of the given discount groups.
+
+        Args:
+            discounts (Iterable[tuple[str, str, Decimal, str]]): Discount group,
+                discount indicator ("1": discount rate in %, "2": multiplicator),
+                discount value and name of the discount group
+            filename (str, optional): File name. Defaults to "DATANORM.RAB".
+
+        Returns:
+            int: Number of written R records
+        """
+        counter = _Counter(discounts)
+        lines = (
+            self._r_record(group, indicator, value, name)
+            for group, indicator, value, name in counter
+        )
+        self._write(filename, DatanormDiscountFile.encoding, lines)
+        return counter.count
+
+    def _v_record(self) -> str:
+        return (
+            f"V {self.date:%d%m%y}{self.header_1:<40.40}{self.header_2:<40.40}"
+            f"{self.header_3:<35.35}{self.version:02d}{self.currency:<3.3}"
+        )
+
+    def _a_record(self, di: DatanormItem) -> str:
+        return _checked(
+            f"A;{di.type or 'N'};{di.article_id};{di.text_indicator};"
+            f"{di.short_text_1};{di.short_text_2};{di.price_indicator};"
+            f"{di.price_unit_raw or ''};{di.unit_of_measure};{_cents(di.price_retail)};"
+            f"{di.discount_group};{di.main_product_group_id};{di.longtext_key};",
+            13,
+        )
+
+    def _b_record(self, di: DatanormItem) -> str:
+        return _checked(
+            f"B;{di.type or 'N'};{di.article_id};{di.matchcode};{di.alt_article_id};"
+            f"{di.catalogue_page};;{di.raw_material_key};{di.raw_material_weight};"
+            f"{di.ean};;{di.product_group_id};{di.type_of_cost};"
+            f"{di.minimum_packaging_quantity};;{di.reference_number};",
+            16,
+        )
+
+    def _r_record(self, group: str, indicator: str, value: Decimal, name: str) -> str:
+        # discount rates are stored in 1/100 %, multiplicators in 1/1000
+        factor = 1000 if indicator == "2" else 100
+        scaled = int((Decimal(value) * factor).to_integral_value())
+        return _checked(f"R;;{group};{indicator};{scaled};{name};;", 7)
+
+    @staticmethod
+    def _price_entries(items: Iterable[DatanormItem]) -> Iterator[str]:
+        """Formats the price entries ("Preiskennzeichen" 1: retail, 2: wholesale)"""
+        for di in items:
+            if di.price_retail:
+                yield _checked(f"{di.article_id};1;{_cents(di.price_retail)};;;;;;;", 9)
+            if di.price_wholesale:
+                yield _checked(
+                    f"{di.article_id};2;{_cents(di.price_wholesale)};;;;;;;", 9
+                )
+
+    def _p_records(self, entries: Iterable[str]) -> Iterator[str]:
+        entries = iter(entries)
+        while packed := "".join(islice(entries, self.articles_per_price_line)):
+            yield f"P;A;{packed}"
+
+    def _write(self, filename: str, encoding: str, lines: Iterable[str]):
+        """Writes the V header and the given records in large encoded blocks. The
+        records are written to a temporary file, which replaces the file when all
+        records are written, so an invalid record leaves no partial file behind.
+        """
+        path = os.path.join(self.directory, filename)
+        terminator = self.line_terminator
+        lines = iter(lines)
+        tmp_path = f"{path}.part"
+        try:
+            with open(tmp_path, "wb", buffering=self.buffer_size) as file_obj:
+                file_obj.write(f"{self._v_record()}{terminator}".encode(encoding))
+                while chunk := list(islice(lines, self.chunk_size)):
+                    chunk.append("")
+                    file_obj.write(terminator.join(chunk).encode(encoding))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+class _Counter:
+    """Iterable wrapper, counting the consumed elements"""
+
+    def __init__(self, iterable: Iterable):
+        self.iterable = iterable
+        self.count = 0
+
+    def __iter__(self):
+        for element in self.iterable:
+            self.count += 1
+            yield element
+
+
+def _cents(price: Decimal) -> int:
+    return int((Decimal(price) * 100).to_integral_value())
+
+
+def _checked(record: str, separators: int) -> str:
+    """Rejects records with field values containing separators or line breaks"""
+    if record.count(";") != separators or "\n" in record or "\r" in record:
+        raise ValueError(f"Field values must not contain ';' or line breaks: {record}")
+    return record
@@ -0,0 +1,186 @@
+from contextlib import redirect_stderr, redirect_stdout
+from datanorm.cli import main
+from importlib import import_module
+from importlib.resources import files
+import csv
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+GOOD_EAN_13 = "3250614315336"
+BAD_EAN1 = "12323"
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.DATANORM_WRG_PATH = str(files(this_package).joinpath("datanorm_test.WRG"))
+        return super().setUp()
+
+    def run_cli(self, *argv: str, stdin: str = "") -> str:
+        stdout = io.StringIO()
+        original_stdin = sys.stdin
+        sys.stdin = io.StringIO(stdin)
+        try:
+            with redirect_stdout(stdout):
+                self.assertEqual(main(list(argv)), 0)
+        finally:
+            sys.stdin = original_stdin
+        return stdout.getvalue()
+
+    def test_lookup(self):
+        output = self.run_cli(
+            "lookup",
+            self.DATANORM_PATH,
+            "--price",
+            self.DATPREIS_PATH,
+            "--wrg",
+            self.DATANORM_WRG_PATH,
+            stdin=f"{GOOD_EAN_13}\n\n{BAD_EAN1}\n",
+        )
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["id"], GOOD_EAN_13)
+        self.assertTrue(records[0]["is_valid"])
+        self.assertEqual(records[0]["article_id"], "899977")
+        self.assertEqual(records[0]["price_wholesale"], "90")
+        self.assertEqual(
+            records[0]["product_group_name"], "Sicherungsautomaten & Hauptschalter"
+        )
+        self.assertEqual(records[1]["id"], BAD_EAN1)
+        self.assertFalse(records[1]["is_valid"])
+
+    def test_stats(self):
+        output = self.run_cli("stats", self.DATANORM_PATH, self.DATPREIS_PATH)
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual(records[0]["records"], {"V": 1, "A": 1, "B": 1})
+        self.assertEqual(records[1]["records"], {"V": 1, "P": 4})
+
+    def test_export_csv(self):
+        output = self.run_cli("export", self.DATANORM_PATH, "--format", "csv")
+        rows = list(csv.DictReader(io.StringIO(output)))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["ean"], GOOD_EAN_13)
+        self.assertEqual(rows[0]["date"], "1999-01-01")
+
+    def test_export_jsonl(self):
+        output = self.run_cli("export", self.DATANORM_PATH)
+        self.assertEqual(json.loads(output)["article_id"], "899977")
+
+    def test_export_with_prices(self):
+        output = self.run_cli(
+            "export", self.DATANORM_PATH, "--price", self.DATPREIS_PATH
+        )
+        self.assertEqual(json.loads(output)["price_wholesale"], "90")
+
+    def test_export_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "export.db")
+            self.run_cli("export", self.DATANORM_PATH, "-f", "sqlite", "-o", path)
+            connection = sqlite3.connect(path)
+            rows = connection.execute("SELECT article_id, ean FROM articles").fetchall()
+            connection.close()
+        self.assertEqual(rows, [("899977", GOOD_EAN_13)])
+
+    def test_validate(self):
+        output = self.run_cli(
+            "validate", self.DATANORM_PATH, self.DATPREIS_PATH, self.DATANORM_WRG_PATH
+        )
+        self.assertEqual(output, "")
+
+    def test_validate_invalid_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001")
+            with open(path, "wb") as file_obj:
+                file_obj.write(b"A;N;1;00;Text;;1;0;Stk;;;;;\n")
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                self.assertEqual(main(["validate", path]), 1)
+        lines = stdout.getvalue().splitlines()
+        messages = [json.loads(line)["message"] for line in lines]
+        self.assertIn("missing V header", messages)
+
+    def test_conflicts(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = main(
+                ["conflicts", self.DATANORM_PATH, "--price", self.DATPREIS_PATH]
+            )
+        self.assertEqual(exit_code, 1)
+        kinds = {json.loads(line)["kind"] for line in stdout.getvalue().splitlines()}
+        self.assertEqual(kinds, {"orphan_price"})
+        self.assertEqual(self.run_cli("conflicts", self.DATANORM_PATH), "")
+
+    def test_conflicts_invalid_partitions(self):
+        with redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit) as context:
+                main(["conflicts", self.DATANORM_PATH, "--partitions", "0"])
+        self.assertEqual(context.exception.code, 2)
+        self.assertIn("must be at least 1", stderr.getvalue())
+
+    def test_lookup_with_indexes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001")
+            shutil.copyfile(self.DATANORM_PATH, path)
+            self.run_cli("index", "build", path)
+            output = self.run_cli("lookup", path, stdin=f"{GOOD_EAN_13}\nMCS316\n")
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual([record["id"] for record in records], [GOOD_EAN_13, "MCS316"])
+        self.assertTrue(all(record["is_valid"] for record in records))
+        self.assertEqual(records[1]["article_id"], "899977")
+
+    def test_lookup_with_unreadable_indexes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001")
+            shutil.copyfile(self.DATANORM_PATH, path)
+            for extension in ("idx", "bloom"):
+                with open(f"{path}.{extension}", "w") as file_obj:
+                    file_obj.write("garbage\n")
+            output = self.run_cli("lookup", path, stdin=f"{GOOD_EAN_13}\n")
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(records[0]["article_id"], "899977")
+
+    def test_index_build(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001.idx")
+            bloom_path = os.path.join(tmp_dir, "DATANORM.001.bloom")
+            manufacturers_path = os.path.join(tmp_dir, "DATANORM.001.mfr")
+            records_path = os.path.join(tmp_dir, "DATANORM.001.rec")
+            fields_path = os.path.join(tmp_dir, "DATANORM.001.fld")
+            self.run_cli(
+                "index",
+                "build",
+                self.DATANORM_PATH,
+                "--output",
+                path,
+                "--bloom",
+                bloom_path,
+                "--manufacturers",
+                manufacturers_path,
+                "--records",
+                records_path,
+                "--fields",
+                fields_path,
+            )
+            with open(path) as file_obj:
+                self.assertTrue(file_obj.readline().startswith("DATANORM-INDEX"))
+            with open(bloom_path, "rb") as file_obj:
+                self.assertTrue(file_obj.read().startswith(b"DNBLOOM"))
+            with open(manufacturers_path) as file_obj:
+                self.assertEqual(file_obj.readlines()[1], "HAGER\t899977\n")
+            with open(records_path, "rb") as file_obj:
+                self.assertTrue(file_obj.read().startswith(b"DATANORM-RECORDS"))
+            with open(fields_path) as file_obj:
+                self.assertIn("ean\t3250614315336\t129\n", file_obj.readlines())
@@ -0,0 +1,110 @@
+from decimal import Decimal
+from datanorm import (
+    DatanormBaseFile,
+    DatanormItem,
+    DatanormPriceFile,
+    DatanormPriceTable,
+    DatanormWriter,
+)
+from datanorm.datanorm_analytics import np
+from importlib import import_module
+from importlib.resources import files
+import math
+import os
+import tempfile
+import unittest
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestDatanormPriceTable(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def write_files(self):
+        # (article, manufacturer, group, discount group, unit, retail, wholesale)
+        articles = [
+            ("1", "ACME", "10", "R1", 1, "10.00", "8.00"),
+            ("2", "ACME", "10", "R1", 1, "20.00", "10.00"),
+            ("3", "ACME", "10", "R2", 1, "30.00", "0"),
+            ("4", "OTHER", "20", "R2", 100, "500.00", "250.00"),
+            ("5", "OTHER", "20", "R2", 10, "0", "0"),
+        ]
+        items = list()
+        for article in articles:
+            article_id, manufacturer, group, discount, unit, retail, wholesale = article
+            di = DatanormItem()
+            di.article_id = article_id
+            di.short_text_1 = f"{manufacturer} Article {article_id}"
+            di.main_product_group_id = "01"
+            di.product_group_id = group
+            di.discount_group = discount
+            di.price_unit = unit
+            di.price_retail = Decimal(retail)
+            di.price_wholesale = Decimal(wholesale)
+            items.append(di)
+        writer = DatanormWriter(self.tmp_dir.name)
+        writer.write_base_file(items)
+        writer.write_price_file(items)
+        return (
+            DatanormBaseFile(os.path.join(self.tmp_dir.name, "DATANORM.001")),
+            DatanormPriceFile(os.path.join(self.tmp_dir.name, "DATPREIS.001")),
+        )
+
+    def test_statistics_by_product_group(self):
+        dut = DatanormPriceTable.build(*self.write_files())
+        statistics = dut.statistics()
+
+        self.assertEqual(len(dut), 5)
+        first = statistics[("01", "10")]
+        self.assertEqual(first.count, 3)
+        self.assertEqual(first.retail_min, 10.0)
+        self.assertEqual(first.retail_median, 20.0)
+        self.assertEqual(first.retail_max, 30.0)
+        self.assertEqual(first.wholesale_median, 9.0)
+        self.assertAlmostEqual(first.margin_min, 0.2)
+        self.assertAlmostEqual(first.margin_max, 0.5)
+
+        # prices per 100 units are normalised, articles without prices left out
+        second = statistics[("01", "20")]
+        self.assertEqual(second.count, 2)
+        self.assertEqual(second.retail_median, 5.0)
+        self.assertEqual(second.wholesale_max, 2.5)
+
+    def test_other_groupings(self):
+        dut = DatanormPriceTable.build(*self.write_files())
+
+        by_manufacturer = dut.statistics("manufacturer")
+        self.assertEqual(set(by_manufacturer), {"ACME", "OTHER"})
+        self.assertEqual(by_manufacturer["ACME"].count, 3)
+        by_discount_group = dut.statistics("discount_group")
+        self.assertEqual(by_discount_group["R2"].count, 3)
+        self.assertEqual(by_discount_group["R2"].retail_max, 30.0)
+        self.assertEqual(dut.statistics("main_product_group")["01"].count, 5)
+        with self.assertRaises(ValueError):
+            dut.statistics("unknown")
+
+    def test_without_price_file(self):
+        dut = DatanormPriceTable.build(self.write_files()[0])
+        statistics = dut.statistics()
+
+        self.assertEqual(statistics[("01", "10")].retail_max, 30.0)
+        self.assertTrue(math.isnan(statistics[("01", "10")].wholesale_max))
+
+    def test_test_files(self):
+        dut = DatanormPriceTable.build(
+            DatanormBaseFile(self.DATANORM_PATH), DatanormPriceFile(self.DATPREIS_PATH)
+        )
+        statistics = dut.statistics("manufacturer")["HAGER"]
+
+        self.assertEqual(statistics.retail_median, 100.0)
+        self.assertEqual(statistics.wholesale_median, 90.0)
+        self.assertAlmostEqual(statistics.margin_median, 0.1)
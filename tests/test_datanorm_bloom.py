@@ -0,0 +1,108 @@
+from datanorm import (
+    DatanormBaseFile,
+    DatanormBloomFilter,
+    DatanormItem,
+    DatanormWriter,
+)
+from importlib import import_module
+from importlib.resources import files
+import os
+import tempfile
+import unittest
+
+GOOD_EAN_13 = "3250614315336"
+BAD_EAN1 = "12323"
+
+
+class TestDatanormBloomFilter(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        return super().setUp()
+
+    def test_build(self):
+        dut = DatanormBloomFilter.build(DatanormBaseFile(self.DATANORM_PATH))
+        self.assertIn(GOOD_EAN_13, dut)
+        self.assertIn("899977", dut)
+        self.assertIn("MCS316", dut)
+        self.assertNotIn(BAD_EAN1, dut)
+        self.assertFalse(dut.is_stale())
+
+    def test_false_positive_rate(self):
+        keys = [str(number) for number in range(0, 20000, 2)]
+        dut = DatanormBloomFilter.from_keys("DATANORM.001", keys, 0.01)
+
+        self.assertTrue(all(key in dut for key in keys))
+        false_positives = sum(str(number) in dut for number in range(1, 20000, 2))
+        self.assertLess(false_positives / len(keys), 0.02)
+
+    def test_save_and_load(self):
+        dut = DatanormBloomFilter.build(DatanormBaseFile(self.DATANORM_PATH))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001.bloom")
+            dut.save(path)
+            loaded = DatanormBloomFilter.load(self.DATANORM_PATH, path)
+
+        self.assertEqual(loaded.size, dut.size)
+        self.assertEqual(loaded.hash_count, dut.hash_count)
+        self.assertIn(GOOD_EAN_13, loaded)
+        self.assertNotIn(BAD_EAN1, loaded)
+        self.assertFalse(loaded.is_stale())
+
+    def test_load_invalid_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001.bloom")
+            with open(path, "wb") as file_obj:
+                file_obj.write(b"something else")
+            with self.assertRaises(ValueError):
+                DatanormBloomFilter.load(self.DATANORM_PATH, path)
+
+    def test_parse_with_bloom_filter(self):
+        base_file = DatanormBaseFile(self.DATANORM_PATH)
+        base_file.bloom_filter = DatanormBloomFilter.build(base_file)
+
+        di = DatanormItem()
+        base_file.parse(di, GOOD_EAN_13)
+        self.assertTrue(di.is_valid)
+
+        di = DatanormItem()
+        base_file.parse(di, BAD_EAN1)
+        self.assertFalse(di.is_valid)
+
+        result = base_file.parse_many([GOOD_EAN_13, BAD_EAN1])
+        self.assertEqual(set(result), {GOOD_EAN_13})
+
+    def test_parse_matchcode_with_bloom_filter(self):
+        # lookups match any field of the B record, not only article number and EAN
+        base_file = DatanormBaseFile(self.DATANORM_PATH)
+        base_file.bloom_filter = DatanormBloomFilter.build(base_file)
+
+        di = DatanormItem()
+        base_file.parse(di, "MCS316")
+        self.assertTrue(di.is_valid)
+        self.assertEqual(di.article_id, "899977")
+        self.assertEqual(set(base_file.parse_many(["MCS316"])), {"MCS316"})
+
+    def test_parse_with_stale_bloom_filter(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            writer = DatanormWriter(tmp_dir)
+            di = DatanormItem()
+            di.article_id = "100"
+            writer.write_base_file([di])
+            base_file = DatanormBaseFile(os.path.join(tmp_dir, "DATANORM.001"))
+            base_file.bloom_filter = DatanormBloomFilter.build(base_file)
+
+            new_item = DatanormItem()
+            new_item.article_id = "300"
+            writer.write_base_file([di, new_item])
+            path = base_file.datanorm_file
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            # the article added after building the filter is no definite miss
+            self.assertTrue(base_file.bloom_filter.is_stale())
+            di = DatanormItem()
+            base_file.parse(di, "300")
+            self.assertTrue(di.is_valid)
+            self.assertEqual(set(base_file.parse_many(["300"])), {"300"})
@@ -0,0 +1,155 @@
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from datanorm import DatanormCatalogue, DatanormFederation, DatanormItem, DatanormWriter
+from importlib import import_module
+from importlib.resources import files
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+GOOD_EAN_13 = "3250614315336"
+BAD_EAN1 = "12323"
+
+
+class TestDatanormCatalogue(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.DATANORM_WRG_PATH = str(files(this_package).joinpath("datanorm_test.WRG"))
+        return super().setUp()
+
+    def test_lookup(self):
+        dut = DatanormCatalogue(
+            self.DATANORM_PATH, self.DATPREIS_PATH, self.DATANORM_WRG_PATH, "A"
+        )
+        di = dut.lookup(GOOD_EAN_13)
+
+        self.assertEqual(di.tag, "A")
+        self.assertEqual(di.article_id, "899977")
+        self.assertEqual(di.price_wholesale, Decimal("90.00"))
+        self.assertEqual(di.product_group_name, "Sicherungsautomaten & Hauptschalter")
+        self.assertIsNone(dut.lookup(BAD_EAN1))
+
+    def test_default_name(self):
+        dut = DatanormCatalogue(self.DATANORM_PATH)
+        self.assertEqual(dut.name, "tests")
+
+    def test_load_unreadable_indexes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001")
+            shutil.copyfile(self.DATANORM_PATH, path)
+            for extension in ("idx", "bloom", "rec", "fld"):
+                with open(f"{path}.{extension}", "w") as file_obj:
+                    file_obj.write("garbage\n")
+            dut = DatanormCatalogue(path)
+            dut.load_indexes()
+
+            self.assertIsNone(dut.base_file.index)
+            self.assertIsNone(dut.base_file.bloom_filter)
+            self.assertIsNone(dut.base_file.offset_table)
+            self.assertIsNone(dut.base_file.field_index)
+            self.assertEqual(dut.lookup(GOOD_EAN_13).article_id, "899977")
+
+
+class _FailingCatalogue(DatanormCatalogue):
+    def lookup(self, id: str) -> DatanormItem | None:
+        raise OSError("unreadable file")
+
+
+class _SlowCatalogue(DatanormCatalogue):
+    scans = 0
+
+    def lookup(self, id: str) -> DatanormItem | None:
+        self.scans += 1
+        time.sleep(1.0)
+        return super().lookup(id)
+
+
+class TestDatanormFederation(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        DATANORM_2_PATH = str(files(this_package).joinpath("datanorm_2_test.001"))
+        DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.catalogues = [
+            DatanormCatalogue(DATANORM_PATH, name="without prices"),
+            DatanormCatalogue(DATANORM_PATH, DATPREIS_PATH, name="first"),
+            DatanormCatalogue(DATANORM_2_PATH, DATPREIS_PATH, name="second"),
+        ]
+        return super().setUp()
+
+    def test_lookup_all_hits(self):
+        with DatanormFederation(self.catalogues) as dut:
+            result = dut.lookup(GOOD_EAN_13)
+
+        self.assertEqual({di.tag for di in result[:2]}, {"first", "second"})
+        self.assertEqual(result[0].price_wholesale, Decimal("90.00"))
+        self.assertEqual(result[1].price_wholesale, Decimal("90.00"))
+        self.assertEqual(result[2].tag, "without prices")
+
+    def test_lookup_first_hit(self):
+        with DatanormFederation(self.catalogues) as dut:
+            result = dut.lookup(GOOD_EAN_13, first_hit=True)
+        self.assertGreaterEqual(len(result), 1)
+
+    def test_lookup_miss(self):
+        with DatanormFederation(self.catalogues) as dut:
+            self.assertEqual(dut.lookup(BAD_EAN1, timeout=10), [])
+
+    def test_lookup_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            dut = DatanormFederation(self.catalogues, executor=executor)
+            result = dut.lookup(GOOD_EAN_13)
+        self.assertEqual(len(result), 3)
+
+    def test_lookup_failing_catalogue(self):
+        catalogues = [_FailingCatalogue(self.catalogues[1].base_file.datanorm_file)]
+        with DatanormFederation(catalogues + self.catalogues) as dut:
+            with self.assertLogs("datanorm.datanorm_catalogue", "ERROR"):
+                result = dut.lookup(GOOD_EAN_13)
+        self.assertEqual(len(result), 3)
+
+    def test_lookup_timeout_does_not_block_later_lookups(self):
+        path = self.catalogues[1].base_file.datanorm_file
+        slow = _SlowCatalogue(path)
+        catalogues = [DatanormCatalogue(path, name="fast"), slow]
+        threads = threading.active_count()
+        with DatanormFederation(catalogues) as dut:
+            for _ in range(5):
+                result = dut.lookup(GOOD_EAN_13, timeout=0.2)
+                self.assertEqual([di.tag for di in result], ["fast"])
+            # skipped while the scan of the first lookup is still running
+            self.assertEqual(slow.scans, 1)
+            # one thread per catalogue, however many lookups timed out
+            self.assertLessEqual(threading.active_count(), threads + 2)
+
+    def test_lookup_ranks_price_per_unit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            catalogues = list()
+            offers = (("per 1", 1, "10"), ("per 100", 100, "500"))
+            for name, price_unit, price in offers:
+                di = DatanormItem()
+                di.article_id = "100"
+                di.price_unit = price_unit
+                di.price_wholesale = Decimal(price)
+                directory = os.path.join(tmp_dir, name)
+                os.mkdir(directory)
+                writer = DatanormWriter(directory)
+                writer.write_base_file([di])
+                writer.write_price_file([di])
+                catalogues.append(
+                    DatanormCatalogue(
+                        os.path.join(directory, "DATANORM.001"),
+                        os.path.join(directory, "DATPREIS.001"),
+                        name=name,
+                    )
+                )
+            with DatanormFederation(catalogues) as dut:
+                result = dut.lookup("100")
+        self.assertEqual([di.tag for di in result], ["per 100", "per 1"])
@@ -0,0 +1,119 @@
+from decimal import Decimal
+from datanorm import (
+    DatanormBaseFile,
+    DatanormItem,
+    DatanormPriceFile,
+    DatanormWriter,
+    find_conflicts,
+)
+from datanorm.datanorm_conflicts import (
+    CONFLICTING_PRICE,
+    DUPLICATE_ARTICLE,
+    ORPHAN_PRICE,
+    SHARED_EAN,
+)
+from importlib import import_module
+from importlib.resources import files
+import os
+import tempfile
+import unittest
+
+
+class TestFindConflicts(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def write_files(self):
+        # (article number, EAN, price)
+        articles = [
+            ("1", "4000000000001", "10.00"),
+            ("2", "4000000000002", "20.00"),
+            ("2", "", "21.00"),
+            ("3", "4000000000001", "30.00"),
+            ("4", "4000000000004", "40.00"),
+        ]
+        items = list()
+        for article_id, ean, price in articles:
+            di = DatanormItem()
+            di.article_id = article_id
+            di.short_text_1 = f"ACME Article {article_id}"
+            di.ean = ean
+            di.price_retail = Decimal(price)
+            items.append(di)
+        writer = DatanormWriter(self.tmp_dir.name)
+        writer.write_base_file(items)
+
+        prices = list()
+        for article_id, wholesale in (("1", "8.00"), ("4", "30.00"), ("9", "1.00")):
+            di = DatanormItem()
+            di.article_id = article_id
+            di.price_wholesale = Decimal(wholesale)
+            prices.append(di)
+        # a second, different wholesale price of article 4
+        di = DatanormItem()
+        di.article_id = "4"
+        di.price_wholesale = Decimal("32.00")
+        prices.append(di)
+        writer.write_price_file(prices)
+        return (
+            DatanormBaseFile(os.path.join(self.tmp_dir.name, "DATANORM.001")),
+            DatanormPriceFile(os.path.join(self.tmp_dir.name, "DATPREIS.001")),
+        )
+
+    def test_find_conflicts(self):
+        base_file, price_file = self.write_files()
+        conflicts = find_conflicts(base_file, price_file)
+
+        found = {(conflict.kind, conflict.key) for conflict in conflicts}
+        self.assertEqual(
+            found,
+            {
+                (DUPLICATE_ARTICLE, "2"),
+                (CONFLICTING_PRICE, "2"),
+                (SHARED_EAN, "4000000000001"),
+                (ORPHAN_PRICE, "9"),
+                (CONFLICTING_PRICE, "4"),
+            },
+        )
+        duplicate = next(c for c in conflicts if c.kind == DUPLICATE_ARTICLE)
+        offsets = [offset for offset, _, _ in base_file._iter_records()]
+        self.assertEqual(duplicate.offsets, (offsets[1], offsets[2]))
+        shared = next(c for c in conflicts if c.kind == SHARED_EAN)
+        self.assertEqual(shared.message, "EAN/GTIN shared by the articles 1, 3")
+        messages = {c.key: c.message for c in conflicts if c.kind == CONFLICTING_PRICE}
+        self.assertEqual(
+            messages["2"], "different prices in the A records: 20.00, 21.00"
+        )
+        self.assertEqual(messages["4"], "different wholesale prices: 30.00, 32.00")
+
+    def test_partitions(self):
+        base_file, price_file = self.write_files()
+        self.assertEqual(
+            find_conflicts(base_file, price_file, partitions=1),
+            find_conflicts(base_file, price_file, partitions=7),
+        )
+
+    def test_invalid_partitions(self):
+        with self.assertRaises(ValueError):
+            find_conflicts(DatanormBaseFile(self.DATANORM_PATH), partitions=0)
+
+    def test_test_files(self):
+        conflicts = find_conflicts(
+            DatanormBaseFile(self.DATANORM_PATH), DatanormPriceFile(self.DATPREIS_PATH)
+        )
+        orphans = [c.key for c in conflicts if c.kind == ORPHAN_PRICE]
+        self.assertEqual(len(orphans), len(conflicts))
+        self.assertNotIn("899977", orphans)
+        self.assertIn("899978", orphans)
+
+    def test_without_price_file(self):
+        self.assertEqual(find_conflicts(DatanormBaseFile(self.DATANORM_PATH)), [])
@@ -180,6 +180,34 @@ class TestDatanormBaseFile(unittest.TestCase):
         self.assertEqual(di.minimum_packaging_quantity, "1")
         self.assertEqual(di.reference_number, "")
 
+    def test_parse_many(self):
+        dut = DatanormBaseFile(self.DATANORM_PATH)
+        result = dut.parse_many([GOOD_EAN_13, "899977", BAD_EAN1])
+
+        self.assertEqual(set(result), {GOOD_EAN_13, "899977"})
+        self.assertIs(result[GOOD_EAN_13], result["899977"])
+        self.assertTrue(result[GOOD_EAN_13].is_valid)
+        self.assertEqual(result[GOOD_EAN_13].article_id, "899977")
+        self.assertEqual(result[GOOD_EAN_13].date, datetime(1999, 1, 1))
+
+    def test_parse_many_nonexisting_file(self):
+        dut = DatanormBaseFile("Datanorm.123")
+        self.assertEqual(dut.parse_many([GOOD_EAN_13]), {})
+
+    def test_iter_items(self):
+        dut = DatanormBaseFile(self.DATANORM_PATH)
+        items = list(dut.iter_items())
+
+        self.assertEqual(len(items), 1)
+        self.assertTrue(items[0].is_valid)
+        self.assertEqual(items[0].header_1, "Firmenname")
+        self.assertEqual(items[0].ean, GOOD_EAN_13)
+        self.assertEqual(items[0].price_retail, Decimal("100.00"))
+
+    def test_count_records(self):
+        dut = DatanormBaseFile(self.DATANORM_PATH)
+        self.assertEqual(dut.count_records(), {"V": 1, "A": 1, "B": 1})
+
 
 class TestDatanormProductGroupFile(unittest.TestCase):
 
@@ -432,3 +460,22 @@ class TestDatanormPriceFile(unittest.TestCase):
         self.assertTrue(di.is_valid)
         self.assertEqual(di.price_retail, Decimal("100.00"))
         self.assertEqual(di.price_wholesale, Decimal("90.00"))
+
+    def test_parse_many(self):
+        di_1 = DatanormItem()
+        di_1.article_id = "899977"
+        di_1.is_valid = True
+        di_2 = DatanormItem()
+        di_2.article_id = "996634"
+        di_2.is_valid = True
+        di_3 = DatanormItem()
+        di_3.article_id = "996635"
+
+        dut = DatanormPriceFile(self.DATPREIS_PATH)
+        dut.parse_many([di_1, di_2, di_3])
+
+        self.assertEqual(di_1.price_retail, Decimal("100.00"))
+        self.assertEqual(di_1.price_wholesale, Decimal("90.00"))
+        self.assertEqual(di_2.price_retail, Decimal("100.00"))
+        self.assertEqual(di_2.price_wholesale, Decimal("90.00"))
+        self.assertEqual(di_3.price_retail, Decimal("0"))
@@ -0,0 +1,108 @@
+from datanorm import (
+    DatanormBaseFile,
+    DatanormItem,
+    DatanormProductGroupFile,
+    DatanormProductGroupTree,
+    DatanormWriter,
+)
+from importlib import import_module
+from importlib.resources import files
+import os
+import tempfile
+import unittest
+
+
+class TestDatanormProductGroupTree(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.DATANORM_WRG_PATH = str(files(this_package).joinpath("datanorm_test.WRG"))
+        return super().setUp()
+
+    def test_build_hierarchy(self):
+        dut = DatanormProductGroupTree.build(
+            DatanormProductGroupFile(self.DATANORM_WRG_PATH)
+        )
+
+        self.assertEqual([group.id for group in dut], ["01", "02", "03"])
+        self.assertEqual(dut.group("01").name, "Installationsgeräte & -systeme")
+        self.assertEqual(list(dut.group("01").children), ["12"])
+        self.assertEqual(
+            dut.group("01", "12").name, "Sicherungsautomaten & Hauptschalter"
+        )
+        self.assertEqual(dut.group("02").name, "Kabel & Leitung")
+        self.assertEqual(
+            dut.group("02", "020101").name, "Fernmeldekabel (Aussen /Innen)"
+        )
+        self.assertEqual(dut.group("03").children, {})
+        self.assertIsNone(dut.group("04"))
+        self.assertIsNone(dut.group("01", "13"))
+
+    def test_build_skips_malformed_records(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.WRG")
+            with open(path, "wb") as file_obj:
+                file_obj.write(b"V 010199\r\nS;;01;Installation\r\nS;;02;Kabel;;;\r\n")
+            dut = DatanormProductGroupTree.build(DatanormProductGroupFile(path))
+
+        self.assertEqual([group.id for group in dut], ["02"])
+        self.assertEqual(dut.group("02").name, "Kabel")
+
+    def test_build_with_articles(self):
+        dut = DatanormProductGroupTree.build(
+            DatanormProductGroupFile(self.DATANORM_WRG_PATH),
+            DatanormBaseFile(self.DATANORM_PATH),
+        )
+
+        self.assertEqual(dut.group("01").count, 1)
+        self.assertEqual(dut.group("01", "12").count, 1)
+        self.assertEqual(dut.group("02").count, 0)
+        self.assertEqual(dut.article_ids_of("01"), ["899977"])
+        self.assertEqual(dut.article_ids_of("01", "12"), ["899977"])
+        self.assertEqual(dut.article_ids_of("04"), [])
+
+    def test_build_with_malformed_articles(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001")
+            with open(self.DATANORM_PATH, "rb") as file_obj:
+                header = file_obj.readline()
+                records = file_obj.read()
+            with open(path, "wb") as file_obj:
+                file_obj.write(header + b"A;N;1;\r\nB;N;1;MC;\r\n" + records)
+            dut = DatanormProductGroupTree.build(
+                DatanormProductGroupFile(self.DATANORM_WRG_PATH),
+                DatanormBaseFile(path),
+            )
+
+        # the malformed record keeps its record number, but has no group
+        self.assertEqual(dut.article_ids, ["1", "899977"])
+        self.assertEqual(list(dut.group("01").postings), [1])
+        self.assertEqual(dut.article_ids_of("01", "12"), ["899977"])
+
+    def test_posting_lists(self):
+        items = list()
+        for number, (main_group_id, group_id) in enumerate(
+            [("01", "12"), ("02", ""), ("01", "13"), ("01", "12"), ("05", "51")]
+        ):
+            di = DatanormItem()
+            di.article_id = str(number)
+            di.main_product_group_id = main_group_id
+            di.product_group_id = group_id
+            items.append(di)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            DatanormWriter(tmp_dir).write_base_file(items)
+            dut = DatanormProductGroupTree.build(
+                DatanormProductGroupFile(self.DATANORM_WRG_PATH),
+                DatanormBaseFile(os.path.join(tmp_dir, "DATANORM.001")),
+            )
+
+        self.assertEqual(list(dut.group("01").postings), [0, 2, 3])
+        self.assertEqual(list(dut.group("01", "12").postings), [0, 3])
+        self.assertEqual(list(dut.group("01", "13").postings), [2])
+        self.assertEqual(list(dut.group("02").postings), [1])
+        self.assertEqual(dut.article_ids_of("01", "12"), ["0", "3"])
+        # groups missing in the WRG file
+        self.assertIsNone(dut.group("05").name)
+        self.assertEqual(dut.article_ids_of("05", "51"), ["4"])
@@ -0,0 +1,328 @@
+from datanorm import (
+    DatanormBaseFile,
+    DatanormFieldIndex,
+    DatanormIndex,
+    DatanormItem,
+    DatanormManufacturerIndex,
+    DatanormOffsetTable,
+    DatanormWriter,
+)
+from importlib import import_module
+from importlib.resources import files
+import os
+import tempfile
+import unittest
+
+GOOD_EAN_13 = "3250614315336"
+BAD_EAN1 = "12323"
+
+
+class TestDatanormIndex(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        return super().setUp()
+
+    def test_build(self):
+        dut = DatanormIndex.build(DatanormBaseFile(self.DATANORM_PATH))
+        self.assertEqual(dut.lookup("899977"), 129)
+        self.assertEqual(dut.lookup(GOOD_EAN_13), 129)
+        self.assertIsNone(dut.lookup(BAD_EAN1))
+        self.assertFalse(dut.is_stale())
+
+    def test_build_with_malformed_records(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001")
+            with open(self.DATANORM_PATH, "rb") as file_obj:
+                header = file_obj.readline()
+                records = file_obj.read()
+            with open(path, "wb") as file_obj:
+                file_obj.write(header + b"A;N;1;\r\nB;N;1;MC;\r\n" + records)
+            base_file = DatanormBaseFile(path)
+            manufacturer_index = DatanormManufacturerIndex(path)
+            dut = DatanormIndex.build(base_file, manufacturer_index)
+
+        self.assertEqual(dut.lookup("1"), len(header))
+        self.assertEqual(dut.lookup(GOOD_EAN_13), len(header) + 19)
+        self.assertEqual(manufacturer_index.lookup("HAGER"), ["899977"])
+
+    def test_save_and_load(self):
+        dut = DatanormIndex.build(DatanormBaseFile(self.DATANORM_PATH))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001.idx")
+            dut.save(path)
+            loaded = DatanormIndex.load(self.DATANORM_PATH, path)
+        self.assertEqual(loaded.offsets, dut.offsets)
+        self.assertFalse(loaded.is_stale())
+
+    def test_load_invalid_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001.idx")
+            with open(path, "w") as file_obj:
+                file_obj.write("something\telse\t1\t2\n")
+            with self.assertRaises(ValueError):
+                DatanormIndex.load(self.DATANORM_PATH, path)
+
+    def test_load_truncated_file(self):
+        dut = DatanormIndex.build(DatanormBaseFile(self.DATANORM_PATH))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001.idx")
+            dut.save(path)
+            with open(path, "r+") as file_obj:
+                file_obj.truncate(len(file_obj.readline()) + 3)
+            with self.assertRaisesRegex(ValueError, "is not a DATANORM index"):
+                DatanormIndex.load(self.DATANORM_PATH, path)
+            with open(path, "w") as file_obj:
+                file_obj.write("garbage\n")
+            with self.assertRaisesRegex(ValueError, "is not a DATANORM index"):
+                DatanormIndex.load(self.DATANORM_PATH, path)
+
+    def test_parse_with_index(self):
+        base_file = DatanormBaseFile(self.DATANORM_PATH)
+        base_file.index = DatanormIndex.build(base_file)
+
+        di = DatanormItem()
+        base_file.parse(di, GOOD_EAN_13)
+        self.assertTrue(di.is_valid)
+        self.assertEqual(di.article_id, "899977")
+        self.assertEqual(di.header_1, "Firmenname")
+
+        di = DatanormItem()
+        base_file.parse(di, BAD_EAN1)
+        self.assertFalse(di.is_valid)
+
+    def test_parse_many_with_index(self):
+        base_file = DatanormBaseFile(self.DATANORM_PATH)
+        base_file.index = DatanormIndex.build(base_file)
+
+        # the matchcode is not indexed and found by the pass over the file
+        result = base_file.parse_many([GOOD_EAN_13, "MCS316", BAD_EAN1])
+        self.assertEqual(set(result), {GOOD_EAN_13, "MCS316"})
+        self.assertEqual(result[GOOD_EAN_13].article_id, "899977")
+        self.assertEqual(result[GOOD_EAN_13].header_1, "Firmenname")
+        self.assertEqual(result["MCS316"].article_id, "899977")
+
+    def test_parse_with_stale_index(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            writer = DatanormWriter(tmp_dir)
+            items = list()
+            for article_id in ("100", "200"):
+                di = DatanormItem()
+                di.article_id = article_id
+                items.append(di)
+            writer.write_base_file(items)
+            base_file = DatanormBaseFile(os.path.join(tmp_dir, "DATANORM.001"))
+            base_file.index = DatanormIndex.build(base_file)
+
+            # new first article, the indexed offsets point to other articles now
+            new_item = DatanormItem()
+            new_item.article_id = "300"
+            writer.write_base_file([new_item] + items)
+            path = base_file.datanorm_file
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            self.assertTrue(base_file.index.is_stale())
+            di = DatanormItem()
+            base_file.parse(di, "100")
+            self.assertEqual(di.article_id, "100")
+            self.assertEqual(base_file.parse_many(["100"])["100"].article_id, "100")
+
+
+class TestDatanormManufacturerIndex(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        return super().setUp()
+
+    def test_build(self):
+        dut = DatanormManufacturerIndex.build(DatanormBaseFile(self.DATANORM_PATH))
+        self.assertEqual(dut.lookup("HAGER"), ["899977"])
+        self.assertEqual(dut.lookup("ACME"), [])
+        self.assertEqual(dut.counts(), {"HAGER": 1})
+
+    def test_build_with_index(self):
+        dut = DatanormManufacturerIndex(self.DATANORM_PATH)
+        DatanormIndex.build(DatanormBaseFile(self.DATANORM_PATH), dut)
+        self.assertEqual(dut.lookup("HAGER"), ["899977"])
+
+    def test_counts(self):
+        dut = DatanormManufacturerIndex("DATANORM.001")
+        dut.add("ACME", "1")
+        dut.add("HAGER", "2")
+        dut.add("HAGER", "3")
+        self.assertEqual(list(dut.counts().items()), [("HAGER", 2), ("ACME", 1)])
+
+    def test_save_and_load(self):
+        dut = DatanormManufacturerIndex.build(DatanormBaseFile(self.DATANORM_PATH))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "DATANORM.001.mfr")
+            dut.save(path)
+            loaded = DatanormManufacturerIndex.load(self.DATANORM_PATH, path)
+        self.assertEqual(loaded.article_ids, {"HAGER": ["899977"]})
+        self.assertFalse(loaded.is_stale())
+
+
+class TestDatanormOffsetTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        items = list()
+        for article_id in range(250):
+            di = DatanormItem()
+            di.article_id = str(article_id)
+            di.short_text_1 = f"ACME Article {article_id}"
+            items.append(di)
+        DatanormWriter(self.tmp_dir.name).write_base_file(items)
+        self.base_file = DatanormBaseFile(
+            os.path.join(self.tmp_dir.name, "DATANORM.001")
+        )
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_build(self):
+        dut = DatanormOffsetTable.build(self.base_file)
+        self.assertEqual(len(dut), 250)
+        offsets = [offset for offset, _, _ in self.base_file._iter_records()]
+        self.assertEqual(list(dut.offsets), offsets)
+        self.assertFalse(dut.is_stale())
+
+    def test_build_with_index(self):
+        dut = DatanormOffsetTable(self.base_file.datanorm_file)
+        index = DatanormIndex.build(self.base_file, offset_table=dut)
+        self.assertEqual(dut[7], index.lookup("7"))
+
+    def test_save_and_load(self):
+        dut = DatanormOffsetTable.build(self.base_file)
+        dut.save()
+        loaded = DatanormOffsetTable.load(self.base_file.datanorm_file)
+        self.assertEqual(loaded.offsets, dut.offsets)
+        self.assertFalse(loaded.is_stale())
+
+    def test_load_invalid_file(self):
+        path = os.path.join(self.tmp_dir.name, "DATANORM.001.rec")
+        with open(path, "wb") as file_obj:
+            file_obj.write(b"something\telse\t1\t2\n")
+        with self.assertRaises(ValueError):
+            DatanormOffsetTable.load(self.base_file.datanorm_file, path)
+
+    def test_page(self):
+        expected = [di.article_id for di in self.base_file.page(120, 50)]
+        self.base_file.offset_table = DatanormOffsetTable.build(self.base_file)
+
+        page = self.base_file.page(120, 50)
+        self.assertEqual([di.article_id for di in page], expected)
+        self.assertEqual(expected, [str(article_id) for article_id in range(120, 170)])
+        self.assertEqual(page[0].short_text_1, "ACME Article 120")
+        self.assertEqual(len(self.base_file.page(240, 50)), 10)
+        self.assertEqual(self.base_file.page(250, 50), [])
+        self.assertEqual(self.base_file.item_at(249).article_id, "249")
+        self.assertIsNone(self.base_file.item_at(250))
+        with self.assertRaises(ValueError):
+            self.base_file.page(-1, 50)
+
+    def test_page_with_stale_table(self):
+        self.base_file.offset_table = DatanormOffsetTable.build(self.base_file)
+        items = list()
+        for article_id in range(250):
+            di = DatanormItem()
+            di.article_id = f"NEW-{article_id}"
+            items.append(di)
+        DatanormWriter(self.tmp_dir.name).write_base_file(items)
+        path = self.base_file.datanorm_file
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertTrue(self.base_file.offset_table.is_stale())
+        page = self.base_file.page(120, 2)
+        self.assertEqual([di.article_id for di in page], ["NEW-120", "NEW-121"])
+        self.assertEqual(self.base_file.item_at(249).article_id, "NEW-249")
+
+
+class TestDatanormFieldIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        items = list()
+        for article_id in range(1, 7):
+            di = DatanormItem()
+            di.article_id = str(article_id)
+            di.short_text_1 = f"ACME Article {article_id}"
+            di.matchcode = "MCS316" if article_id % 2 else "MCS320"
+            di.alt_article_id = str(article_id + 1)
+            di.ean = f"400000000000{article_id}"
+            di.reference_number = "1" if article_id > 4 else ""
+            items.append(di)
+        DatanormWriter(self.tmp_dir.name).write_base_file(items)
+        self.base_file = DatanormBaseFile(
+            os.path.join(self.tmp_dir.name, "DATANORM.001")
+        )
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def assertFound(self, base_file: DatanormBaseFile):
+        def article_ids(**fields):
+            return [di.article_id for di in base_file.find_by(**fields)]
+
+        self.assertEqual(article_ids(matchcode="MCS316"), ["1", "3", "5"])
+        # "1" is an article number, alt. article number and reference number
+        self.assertEqual(article_ids(article_id="1"), ["1"])
+        self.assertEqual(article_ids(alt_article_id="2"), ["1"])
+        self.assertEqual(article_ids(reference_number="1"), ["5", "6"])
+        self.assertEqual(article_ids(ean="4000000000003"), ["3"])
+        self.assertEqual(article_ids(matchcode="MCS320", reference_number="1"), ["6"])
+        self.assertEqual(article_ids(ean="12323"), [])
+
+    def test_find_by_scan(self):
+        self.assertFound(self.base_file)
+
+    def test_find_by_index(self):
+        self.base_file.field_index = DatanormFieldIndex.build(self.base_file)
+        self.assertFound(self.base_file)
+
+    def test_find_by_stale_index(self):
+        self.base_file.field_index = DatanormFieldIndex.build(self.base_file)
+        items = list()
+        for article_id in range(1, 7):
+            di = DatanormItem()
+            di.article_id = f"NEW-{article_id}"
+            di.matchcode = "MCS316"
+            items.append(di)
+        DatanormWriter(self.tmp_dir.name).write_base_file(items)
+        path = self.base_file.datanorm_file
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertTrue(self.base_file.field_index.is_stale())
+        found = self.base_file.find_by(matchcode="MCS316")
+        self.assertEqual(
+            [di.article_id for di in found], [f"NEW-{n}" for n in range(1, 7)]
+        )
+
+    def test_find_by_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.base_file.find_by(short_text_1="ACME")
+        with self.assertRaises(ValueError):
+            self.base_file.find_by()
+
+    def test_build_with_index(self):
+        dut = DatanormFieldIndex(self.base_file.datanorm_file)
+        index = DatanormIndex.build(self.base_file, field_index=dut)
+        self.assertEqual(dut.lookup("ean", "4000000000002"), [index.lookup("2")])
+
+    def test_save_and_load(self):
+        dut = DatanormFieldIndex.build(self.base_file)
+        dut.save()
+        loaded = DatanormFieldIndex.load(self.base_file.datanorm_file)
+        self.assertEqual(loaded.offsets, dut.offsets)
+        self.assertFalse(loaded.is_stale())
+        self.base_file.field_index = loaded
+        self.assertFound(self.base_file)
@@ -1,4 +1,5 @@
-from datanorm import DatanormItem
+from datanorm import DatanormItem, unit_price
+from decimal import Decimal
 from importlib import import_module
 from importlib.resources import files
 import unittest
@@ -48,6 +49,25 @@ class TestDatanormItem(unittest.TestCase):
             dut.short_text_1 = input
             self.assertEqual(dut.item_name, expectation)
 
+    def test_manufacturer_name_cache(self):
+        dut = DatanormItem()
+        dut.short_text_1 = "ACME some product"
+        self.assertEqual(dut.manufacturer_name, "ACME")
+        self.assertEqual(dut.item_name, "some product")
+
+        dut.short_text_1 = "HAGER other product"
+        self.assertEqual(dut.manufacturer_name, "HAGER")
+        self.assertEqual(dut.item_name, "other product")
+
+    def test_split_manufacturer(self):
+        self.assertEqual(
+            DatanormItem.split_manufacturer("ACME some product"),
+            ("ACME", "some product"),
+        )
+        self.assertEqual(
+            DatanormItem.split_manufacturer("some product"), (None, "some product")
+        )
+
     def test_description(self):
         dut = DatanormItem()
         dut.short_text_1 = "KT1"
@@ -97,3 +117,30 @@ class TestDatanormItem(unittest.TestCase):
         self.assertEqual(dut.price_unit_raw, "3")
         dut.price_unit = 2
         self.assertIsNone(dut.price_unit_raw)
+
+    def test_unit_price(self):
+        self.assertEqual(unit_price(Decimal("12.34"), "0"), 12340000)
+        self.assertEqual(unit_price(Decimal("12.34"), "2"), 123400)
+        self.assertEqual(unit_price(Decimal("0.01"), "3"), 10)
+        self.assertIsNone(unit_price(Decimal("12.34"), "4"))
+        self.assertIsNone(unit_price(Decimal("12.34"), None))
+        self.assertEqual(unit_price(Decimal("0"), "0"), 0)
+
+        dut = DatanormItem()
+        dut.price_unit = 100
+        dut.price_retail = Decimal("250.00")
+        dut.price_wholesale = Decimal("125.50")
+        self.assertEqual(dut.unit_price_retail, 2500000)
+        self.assertEqual(dut.unit_price_wholesale, 1255000)
+        self.assertEqual(dut.__dict__["_unit_price_retail"], 2500000)
+
+        # stored values follow changes of the price and the price unit
+        dut.price_retail = Decimal("300.00")
+        self.assertEqual(dut.unit_price_retail, 3000000)
+        dut.price_unit = 1
+        self.assertEqual(dut.unit_price_retail, 300000000)
+        self.assertEqual(dut.unit_price_wholesale, 125500000)
+        dut.price_unit_raw = "4"
+        self.assertIsNone(dut.unit_price_retail)
+        self.assertIsNone(dut.unit_price_wholesale)
+        self.assertIsNone(DatanormItem().unit_price_retail)
@@ -0,0 +1,104 @@
+from datanorm import DatanormCatalogueManager
+from importlib import import_module
+from importlib.resources import files
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+GOOD_EAN_13 = "3250614315336"
+
+
+class TestDatanormCatalogueManager(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_2_PATH = str(files(this_package).joinpath("datanorm_2_test.001"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "DATANORM.001")
+        shutil.copy(files(this_package).joinpath("datanorm_test.001"), self.path)
+        shutil.copy(
+            files(this_package).joinpath("datpreis_test.001"),
+            os.path.join(self.tmp_dir.name, "DATPREIS.001"),
+        )
+        self.dut = DatanormCatalogueManager(
+            self.path, os.path.join(self.tmp_dir.name, "DATPREIS.001"), name="A"
+        )
+        return super().setUp()
+
+    def tearDown(self):
+        self.dut.stop()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def _replace_base_file(self):
+        # new file renamed into place, like a finished download
+        new_path = self.path + ".part"
+        shutil.copy(self.DATANORM_2_PATH, new_path)
+        os.replace(new_path, self.path)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_unchanged(self):
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "899977")
+        self.assertFalse(self.dut.check())
+        self.assertEqual(self.dut.version, 0)
+
+    def test_check_swaps_catalogue(self):
+        previous = self.dut.compiled
+        self._replace_base_file()
+
+        self.assertTrue(self.dut.check())
+        self.assertEqual(self.dut.version, 1)
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "996634")
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).tag, "A")
+        # lookups still holding the previous version are not affected
+        self.assertEqual(previous.lookup(GOOD_EAN_13).article_id, "899977")
+
+    def test_failed_rebuild_keeps_previous_version(self):
+        with open(self.path, "wb") as file_obj:
+            file_obj.write(b"V 100423\r\nA;N;1\r\nB;N;1\r\n")
+
+        self.assertFalse(self.dut.check())
+        self.assertIsNotNone(self.dut.last_error)
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "899977")
+
+    def test_missing_base_file_keeps_previous_version(self):
+        # delivery deleted and copied again between two checks
+        os.remove(self.path)
+        self.assertFalse(self.dut.check())
+        self.assertIsInstance(self.dut.last_error, FileNotFoundError)
+        self.assertEqual(self.dut.version, 0)
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "899977")
+
+        open(self.path, "wb").close()
+        self.assertFalse(self.dut.check())
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "899977")
+
+        self._replace_base_file()
+        self.assertTrue(self.dut.check())
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "996634")
+
+    def test_base_file_without_articles_keeps_previous_version(self):
+        with open(self.path, "rb") as file_obj:
+            header = file_obj.readline()
+        with open(self.path, "wb") as file_obj:
+            file_obj.write(header)
+
+        self.assertFalse(self.dut.check())
+        self.assertIsInstance(self.dut.last_error, ValueError)
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "899977")
+
+    def test_background_reload(self):
+        self.dut.interval = 0.01
+        with self.dut:
+            self._replace_base_file()
+            deadline = time.monotonic() + 10
+            while self.dut.version == 0 and time.monotonic() < deadline:
+                # lookups are answered during the rebuild
+                self.assertIsNotNone(self.dut.lookup(GOOD_EAN_13))
+                time.sleep(0.01)
+
+        self.assertEqual(self.dut.version, 1)
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, "996634")
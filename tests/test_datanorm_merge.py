@@ -0,0 +1,116 @@
+from decimal import Decimal
+from datanorm import (
+    DatanormBaseFile,
+    DatanormItem,
+    DatanormPriceFile,
+    DatanormWriter,
+    enrich_with_prices,
+)
+from importlib import import_module
+from importlib.resources import files
+import os
+import tempfile
+import unittest
+
+
+class TestEnrichWithPrices(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def write_files(self, article_ids: list[str], price_ids: list[str]):
+        writer = DatanormWriter(self.tmp_dir.name)
+        items = list()
+        for article_id in article_ids:
+            di = DatanormItem()
+            di.article_id = article_id
+            di.short_text_1 = f"ACME {article_id}"
+            items.append(di)
+        writer.write_base_file(items)
+
+        prices = list()
+        for article_id in price_ids:
+            di = DatanormItem()
+            di.article_id = article_id
+            di.price_retail = Decimal(article_id)
+            di.price_wholesale = Decimal(article_id) / 2
+            prices.append(di)
+        writer.write_price_file(prices)
+
+        return (
+            DatanormBaseFile(os.path.join(self.tmp_dir.name, "DATANORM.001")),
+            DatanormPriceFile(os.path.join(self.tmp_dir.name, "DATPREIS.001")),
+        )
+
+    def assertPriced(self, items: list[DatanormItem], price_ids: list[str]):
+        for di in items:
+            if di.article_id in price_ids:
+                self.assertEqual(di.price_retail, Decimal(di.article_id))
+                self.assertEqual(di.price_wholesale, Decimal(di.article_id) / 2)
+            else:
+                self.assertEqual(di.price_retail, Decimal("0"))
+                self.assertEqual(di.price_wholesale, Decimal("0"))
+
+    def test_enrich_test_files(self):
+        result = list(
+            enrich_with_prices(
+                DatanormBaseFile(self.DATANORM_PATH),
+                DatanormPriceFile(self.DATPREIS_PATH),
+            )
+        )
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0].header_1, "Firmenname")
+        self.assertEqual(result[0].price_retail, Decimal("100.00"))
+        self.assertEqual(result[0].price_wholesale, Decimal("90.00"))
+
+    def test_enrich_sorted(self):
+        article_ids = ["11", "12", "13", "15", "17"]
+        price_ids = ["10", "12", "13", "14", "17", "18"]
+        base_file, price_file = self.write_files(article_ids, price_ids)
+
+        result = list(enrich_with_prices(base_file, price_file))
+        self.assertEqual([di.article_id for di in result], article_ids)
+        self.assertPriced(result, price_ids)
+
+    def test_enrich_numerically_sorted(self):
+        article_ids = ["9", "10", "100"]
+        price_ids = ["8", "10", "100"]
+        base_file, price_file = self.write_files(article_ids, price_ids)
+
+        result = list(enrich_with_prices(base_file, price_file))
+        self.assertEqual([di.article_id for di in result], article_ids)
+        self.assertPriced(result, price_ids)
+
+    def test_enrich_numerically_sorted_leading_zeros(self):
+        # "0100" and "100" are different article numbers
+        article_ids = ["9", "0100"]
+        price_ids = ["9", "100"]
+        base_file, price_file = self.write_files(article_ids, price_ids)
+
+        result = list(enrich_with_prices(base_file, price_file))
+        self.assertEqual([di.article_id for di in result], article_ids)
+        self.assertPriced(result, price_ids)
+
+    def test_enrich_unsorted(self):
+        article_ids = ["17", "12", "15", "11", "13", "12"]
+        price_ids = ["18", "13", "10", "12", "17", "14"]
+        base_file, price_file = self.write_files(article_ids, price_ids)
+
+        for sorted_input in (None, False):
+            result = list(
+                enrich_with_prices(
+                    base_file, price_file, sorted_input=sorted_input, chunk_size=2
+                )
+            )
+            self.assertEqual(
+                [di.article_id for di in result], sorted(article_ids)
+            )
+            self.assertPriced(result, price_ids)
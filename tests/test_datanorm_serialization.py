@@ -0,0 +1,105 @@
+from datetime import datetime
+from decimal import Decimal
+from datanorm import (
+    DatanormBaseFile,
+    DatanormItem,
+    DatanormPriceFile,
+    decode_item,
+    decode_items,
+    encode_item,
+    encode_items,
+)
+from importlib import import_module
+from importlib.resources import files
+import pickle
+import unittest
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.di = next(DatanormBaseFile(DATANORM_PATH).iter_items())
+        self.di.tag = "supplier"
+        DatanormPriceFile(DATPREIS_PATH).parse(self.di)
+        return super().setUp()
+
+    def items(self, count: int) -> list[DatanormItem]:
+        items = list()
+        for number in range(count):
+            di = DatanormItem(self.di.tag)
+            di.__dict__.update(self.di.__dict__)
+            di.article_id = str(100000 + number)
+            di.short_text_1 = f"HAGER Leitungsschutzschalter {number}"
+            di.ean = str(3250614315336 + number)
+            di.price_retail = Decimal(number) / 100
+            items.append(di)
+        return items
+
+    def assertItemEqual(self, result: DatanormItem, expectation: DatanormItem):
+        self.assertEqual(result.to_dict(), expectation.to_dict())
+        self.assertEqual(result.tag, expectation.tag)
+
+    def test_round_trip(self):
+        result = decode_item(encode_item(self.di))
+        self.assertItemEqual(result, self.di)
+        self.assertTrue(result.is_valid)
+        self.assertEqual(result.date, datetime(1999, 1, 1))
+        self.assertEqual(result.price_wholesale, Decimal("90.00"))
+        self.assertIsNone(result.product_group_name)
+        self.assertEqual(result.manufacturer_name, "HAGER")
+
+    def test_round_trip_batch(self):
+        items = self.items(100)
+        items[5].header_1 = "Other supplier"
+        items[7].price_unit_raw = None
+        items[9].price_wholesale = Decimal("1.2345")
+
+        result = decode_items(encode_items(items))
+        self.assertEqual(len(result), len(items))
+        for di, expectation in zip(result, items):
+            self.assertItemEqual(di, expectation)
+
+    def test_round_trip_fractions_of_cents(self):
+        self.di.price_retail = Decimal("1.2345")
+        self.di.price_unit_raw = None
+        data = encode_item(self.di)
+        for result in (decode_item(data), decode_item(memoryview(data))):
+            self.assertItemEqual(result, self.di)
+            self.assertEqual(result.price_retail, Decimal("1.2345"))
+            self.assertIsNone(result.price_unit_raw)
+        self.assertItemEqual(decode_items(data)[0], self.di)
+
+    def test_round_trip_empty_batch(self):
+        self.assertEqual(decode_items(encode_items([])), [])
+
+    def test_pickle(self):
+        # default pickling keeps all attributes, also those the codec does not know
+        self.di.short_text_1 = "unit\x1fseparator"
+        self.di.note = "extra"
+        result = pickle.loads(pickle.dumps(self.di))
+        self.assertItemEqual(result, self.di)
+        self.assertEqual(result.note, "extra")
+
+    def test_invalid_data(self):
+        with self.assertRaises(ValueError):
+            decode_item(b"something else")
+        with self.assertRaises(ValueError):
+            decode_item(encode_items(self.items(2)))
+        with self.assertRaises(ValueError):
+            decode_item(encode_items([]))
+
+    def test_invalid_text(self):
+        self.di.short_text_1 = "unit\x1fseparator"
+        with self.assertRaises(ValueError):
+            encode_item(self.di)
+
+    def test_size(self):
+        items = self.items(2000)
+        # reference: default pickling of the instance dictionaries
+        pickled = pickle.dumps([di.__dict__ for di in items])
+
+        self.assertLess(len(encode_items(items)), len(pickled))
+        self.assertLess(len(encode_item(self.di)), len(pickle.dumps(self.di.__dict__)))
@@ -0,0 +1,138 @@
+import datanorm
+from datanorm import DatanormCatalogue, DatanormSharedCatalogue, cheapest_per_unit
+from importlib import import_module
+from importlib.resources import files
+from multiprocessing import get_context
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+GOOD_EAN_13 = "3250614315336"
+GOOD_ARTICLE_ID = "899977"
+BAD_EAN1 = "12323"
+
+
+def _lookup_in_worker(name: str, id: str) -> tuple:
+    with DatanormSharedCatalogue.attach(name) as shared:
+        di = shared.lookup(id)
+        return di.article_id, di.price_wholesale, di.tag
+
+
+class TestDatanormSharedCatalogue(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.catalogue = DatanormCatalogue(
+            str(files(this_package).joinpath("datanorm_test.001")),
+            str(files(this_package).joinpath("datpreis_test.001")),
+            str(files(this_package).joinpath("datanorm_test.WRG")),
+            "A",
+        )
+        self.dut = DatanormSharedCatalogue.create(self.catalogue)
+        return super().setUp()
+
+    def tearDown(self):
+        self.dut.close()
+        self.dut.unlink()
+        return super().tearDown()
+
+    def test_lookup(self):
+        expected = self.catalogue.lookup(GOOD_EAN_13)
+        di = self.dut.lookup(GOOD_EAN_13)
+
+        self.assertEqual(di.to_dict(), expected.to_dict())
+        self.assertEqual(self.dut.lookup(GOOD_ARTICLE_ID).ean, GOOD_EAN_13)
+        self.assertIsNone(self.dut.lookup(BAD_EAN1))
+
+    def test_records(self):
+        items = list(self.dut)
+
+        self.assertEqual(len(items), len(self.dut))
+        self.assertEqual(
+            [di.article_id for di in items],
+            [di.article_id for di in self.catalogue.base_file.iter_items()],
+        )
+        with self.assertRaises(IndexError):
+            self.dut[len(self.dut)]
+
+    def test_attach_from_other_process(self):
+        context = get_context("spawn")
+        with context.Pool(1) as pool:
+            result = pool.apply(_lookup_in_worker, (self.dut.name, GOOD_EAN_13))
+
+        expected = self.catalogue.lookup(GOOD_EAN_13)
+        self.assertEqual(result, (expected.article_id, expected.price_wholesale, "A"))
+        # the block survives the worker
+        self.assertEqual(self.dut.lookup(GOOD_EAN_13).article_id, GOOD_ARTICLE_ID)
+
+    def test_attach_from_unrelated_process(self):
+        # the resource tracker of the unrelated process must not remove the block
+        code = (
+            "from datanorm import DatanormSharedCatalogue\n"
+            f"with DatanormSharedCatalogue.attach({self.dut.name!r}) as shared:\n"
+            f"    print(shared.lookup({GOOD_EAN_13!r}).article_id)\n"
+        )
+        package_root = os.path.dirname(os.path.dirname(datanorm.__file__))
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, PYTHONPATH=package_root),
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), GOOD_ARTICLE_ID)
+        self.assertNotIn("leaked", result.stderr)
+        with DatanormSharedCatalogue.attach(self.dut.name) as shared:
+            self.assertEqual(shared.lookup(GOOD_EAN_13).article_id, GOOD_ARTICLE_ID)
+
+    def test_compile_and_open(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "catalogue.dnc")
+            DatanormSharedCatalogue.compile(self.catalogue, path)
+            with DatanormSharedCatalogue.open(path) as mapped:
+                self.assertEqual(len(mapped), len(self.dut))
+                self.assertEqual(
+                    mapped.lookup(GOOD_EAN_13).to_dict(),
+                    self.dut.lookup(GOOD_EAN_13).to_dict(),
+                )
+
+    def test_unit_prices(self):
+        expected = self.catalogue.lookup(GOOD_EAN_13)
+        retail, wholesale = self.dut.unit_price_columns()
+        record_number = self.dut.record_numbers(GOOD_EAN_13)[0]
+
+        self.assertEqual(len(retail), len(self.dut))
+        self.assertEqual(retail[record_number], expected.unit_price_retail)
+        self.assertEqual(wholesale[record_number], expected.unit_price_wholesale)
+        prices = (expected.unit_price_retail, expected.unit_price_wholesale)
+        self.assertEqual(
+            self.dut.unit_prices([GOOD_EAN_13, GOOD_ARTICLE_ID, BAD_EAN1]),
+            {GOOD_EAN_13: prices, GOOD_ARTICLE_ID: prices},
+        )
+
+    def test_cheapest_per_unit(self):
+        # without price file, the articles of the other catalogue lack wholesale prices
+        other = DatanormSharedCatalogue.build(
+            DatanormCatalogue(self.catalogue.base_file.datanorm_file, name="B")
+        )
+        expected = self.catalogue.lookup(GOOD_EAN_13)
+
+        offers = cheapest_per_unit([other, self.dut], [GOOD_EAN_13, BAD_EAN1])
+        self.assertEqual(list(offers), [GOOD_EAN_13])
+        offer = offers[GOOD_EAN_13]
+        self.assertIs(offer.catalogue, self.dut)
+        self.assertEqual(offer.unit_price, expected.unit_price_wholesale)
+        self.assertEqual(offer.catalogue[offer.record_number].ean, GOOD_EAN_13)
+
+        # equal retail prices, ties go to the first catalogue
+        offers = cheapest_per_unit([other, self.dut], [GOOD_EAN_13], "retail")
+        self.assertIs(offers[GOOD_EAN_13].catalogue, other)
+        self.assertEqual(offers[GOOD_EAN_13].unit_price, expected.unit_price_retail)
+        with self.assertRaises(ValueError):
+            cheapest_per_unit([self.dut], [GOOD_EAN_13], "factory")
+
+    def test_invalid_buffer(self):
+        with self.assertRaises(ValueError):
+            DatanormSharedCatalogue(bytes(32))
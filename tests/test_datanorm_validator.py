@@ -0,0 +1,174 @@
+from datanorm import (
+    DatanormBaseFile,
+    DatanormPriceFile,
+    DatanormProductGroupFile,
+    DatanormValidationError,
+    validate,
+)
+from datanorm.datanorm_files import DatanormFile
+from importlib import import_module
+from importlib.resources import files
+import os
+import tempfile
+import unittest
+
+HEADER = b"V 010199Firmenname                              E-Business                              Ansprechpartner, Tel.-Nr.          04EUR\r\n"  # noqa: E501
+LINE_A = b"A;N;899977;00;HAGER Leitungsschutzschalter;MCS316;1;0;Stk;10000;HB86;01;;\r\n"  # noqa: E501
+LINE_B = b"B;N;899977;MCS316;MCS316;;0;0;0;3250614315336;;12;0;1;;;\r\n"
+
+
+class TestValidate(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.DATPREIS_PATH = str(files(this_package).joinpath("datpreis_test.001"))
+        self.DATANORM_WRG_PATH = str(files(this_package).joinpath("datanorm_test.WRG"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def write(self, content: bytes, filename: str = "DATANORM.001") -> str:
+        path = os.path.join(self.tmp_dir.name, filename)
+        with open(path, "wb") as file_obj:
+            file_obj.write(content)
+        return path
+
+    def test_valid_files(self):
+        self.assertEqual(validate(DatanormBaseFile(self.DATANORM_PATH)), [])
+        self.assertEqual(validate(DatanormPriceFile(self.DATPREIS_PATH)), [])
+        self.assertEqual(
+            validate(DatanormProductGroupFile(self.DATANORM_WRG_PATH)), []
+        )
+
+    def test_nonexisting_file(self):
+        errors = validate(DatanormBaseFile("Datanorm.123"))
+        self.assertEqual(errors[0].message, "file does not exist")
+
+    def test_missing_header(self):
+        path = self.write(LINE_A + LINE_B)
+        self.assertEqual(
+            validate(DatanormBaseFile(path)),
+            [DatanormValidationError(1, 0, "A", "missing V header")],
+        )
+
+    def test_malformed_header(self):
+        path = self.write(b"V 999999Firmenname\r\n" + LINE_A + LINE_B)
+        self.assertEqual(
+            validate(DatanormBaseFile(path)),
+            [DatanormValidationError(1, 0, "V", "malformed V header")],
+        )
+
+    def test_pairing(self):
+        path = self.write(HEADER + LINE_A + LINE_A + LINE_B + LINE_B + LINE_A)
+        errors = validate(DatanormBaseFile(path))
+        self.assertEqual(
+            [(error.line, error.message) for error in errors],
+            [
+                (2, "A record without B record"),
+                (5, "B record without A record"),
+                (6, "A record without B record"),
+            ],
+        )
+        self.assertEqual(errors[0].offset, len(HEADER))
+
+    def test_malformed_records(self):
+        path = self.write(
+            HEADER
+            + b"A;N;1;00;Text;;1;0;Stk;12,50;HB86;01;;\r\n"
+            + b"B;N;1;;;\r\n"
+            + b"A;N;2;00;Text;;1;7;Stk;100;HB86;01;;\r\n"
+            + b"B;N;3;MCS316;MCS316;;0;0;0;3250614315336;;12;0;1;;;\r\n"
+            + b"X;unknown\r\n"
+        )
+        errors = validate(DatanormBaseFile(path))
+        self.assertEqual(
+            [(error.line, error.record_type, error.message) for error in errors],
+            [
+                (2, "A", "invalid price '12,50'"),
+                (3, "B", "malformed B record"),
+                (4, "A", "invalid price unit '7'"),
+                (5, "B", "article number differs from A record"),
+                (6, "X", "unknown record type"),
+            ],
+        )
+
+    def test_price_records(self):
+        path = self.write(
+            HEADER
+            + b"P;A;1;1;100;;;;;;;2;1;100;;;;;;;\r\n"
+            + b"P;A;1;1;100;;;;;;;2;1;100;;\r\n"
+            + b"P;A;1;4;100;;;;;;;\r\n"
+            + b"A;N;899977;00;HAGER;MCS316;1;0;Stk;10000;HB86;01;;\r\n",
+            "DATPREIS.001",
+        )
+        errors = validate(DatanormPriceFile(path))
+        self.assertEqual(
+            [(error.line, error.message) for error in errors],
+            [
+                (3, "P record entries must have 9 fields"),
+                (4, "invalid price indicator '4'"),
+                (5, "unknown record type"),
+            ],
+        )
+
+    def test_encoding(self):
+        path = self.write(HEADER + b"S;;01;Installationsger\x81te;;;\r\n", "X.WRG")
+        errors = validate(DatanormProductGroupFile(path))
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].message.startswith("not encoded in cp1252"))
+
+    def test_utf_8_encoding(self):
+        short_text = "Leitungsschutzschalter 16 A für Hutschiene".encode("utf-8")
+        path = self.write(
+            HEADER
+            + LINE_A.replace(b"HAGER Leitungsschutzschalter", short_text)
+            + LINE_B
+            + LINE_A.replace(b"HAGER", "HÄGER".encode("cp850"))
+            + LINE_B
+        )
+        errors = validate(DatanormBaseFile(path))
+        self.assertEqual(
+            [(error.line, error.message) for error in errors],
+            [(2, "not encoded in cp850: UTF-8 characters")],
+        )
+
+    def test_max_errors(self):
+        path = self.write(LINE_B * 10)
+        self.assertEqual(len(validate(DatanormBaseFile(path), max_errors=3)), 3)
+
+    def test_max_errors_parallel(self):
+        broken_b = b"B;N;899978;MCS316;MCS316;;0;0;0;3250614315336;;12;0;1;;;\r\n"
+        content = HEADER + (LINE_A + broken_b) * 3 + (LINE_A + LINE_B) * 247
+        content += (LINE_A + broken_b) * 500
+        path = self.write(content)
+
+        errors = validate(DatanormBaseFile(path), workers=4, max_errors=2)
+        self.assertEqual([error.line for error in errors], [3, 5])
+        # the line numbers of later chunks do not depend on the early stops
+        errors = validate(DatanormBaseFile(path), workers=4, max_errors=10)
+        self.assertEqual(
+            [error.line for error in errors],
+            [error.line for error in validate(DatanormBaseFile(path))][:10],
+        )
+        self.assertEqual(errors[3].line, 503)
+
+    def test_unsupported_file_type(self):
+        with self.assertRaises(ValueError):
+            validate(DatanormFile(self.DATANORM_PATH))
+
+    def test_parallel(self):
+        broken_b = b"B;N;899978;MCS316;MCS316;;0;0;0;3250614315336;;12;0;1;;;\r\n"
+        content = HEADER + (LINE_A + LINE_B) * 500 + LINE_A + broken_b
+        content += (LINE_A + LINE_B) * 500
+        path = self.write(content)
+
+        errors = validate(DatanormBaseFile(path), workers=4)
+        self.assertEqual(errors, validate(DatanormBaseFile(path)))
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].line, 1003)
+        offset = len(HEADER) + 500 * len(LINE_A + LINE_B) + len(LINE_A)
+        self.assertEqual(errors[0].offset, offset)
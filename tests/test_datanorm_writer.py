@@ -0,0 +1,143 @@
+from datetime import datetime
+from decimal import Decimal
+from datanorm import (
+    DatanormBaseFile,
+    DatanormItem,
+    DatanormPriceFile,
+    DatanormProductGroupFile,
+    DatanormWriter,
+)
+from datanorm.datanorm_files import DATANORM_REGEX
+from importlib import import_module
+from importlib.resources import files
+import os
+import re
+import tempfile
+import unittest
+
+GOOD_EAN_13 = "3250614315336"
+
+
+class TestDatanormWriter(unittest.TestCase):
+
+    def setUp(self):
+        this_package = import_module(".", package="tests")
+        self.DATANORM_PATH = str(files(this_package).joinpath("datanorm_test.001"))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dut = DatanormWriter(
+            self.tmp_dir.name,
+            header_1="Firmenname",
+            header_2="E-Business",
+            header_3="Ansprechpartner, Tel.-Nr.",
+            date=datetime(1999, 1, 1),
+        )
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def items(self):
+        di = next(DatanormBaseFile(self.DATANORM_PATH).iter_items())
+        di.price_wholesale = Decimal("90.00")
+        di.main_product_group_name = "Installationsgeräte & -systeme"
+        di.product_group_name = "Sicherungsautomaten & Hauptschalter"
+        yield di
+        for number in range(5):
+            di = DatanormItem()
+            di.article_id = f"10{number}"
+            di.short_text_1 = f"ACME Artikel {number}"
+            di.price_retail = Decimal(number)
+            di.main_product_group_id = "02"
+            yield di
+
+    def test_write_base_file(self):
+        self.assertEqual(self.dut.write_base_file(self.items()), 6)
+        path = os.path.join(self.tmp_dir.name, "DATANORM.001")
+
+        with open(path, "rb") as file_obj:
+            header = file_obj.readline().decode("cp850").rstrip("\r\n")
+        self.assertIsNotNone(re.search(DATANORM_REGEX["V"], header))
+
+        expected = list(self.items())
+        result = list(DatanormBaseFile(path).iter_items())
+        self.assertEqual(len(result), len(expected))
+        for di, expectation in zip(result, expected):
+            self.assertEqual(di.date, datetime(1999, 1, 1))
+            self.assertEqual(di.header_3, "Ansprechpartner, Tel.-Nr.")
+            self.assertEqual(di.article_id, expectation.article_id)
+            self.assertEqual(di.short_text_1, expectation.short_text_1)
+            self.assertEqual(di.short_text_2, expectation.short_text_2)
+            self.assertEqual(di.price_retail, expectation.price_retail)
+            self.assertEqual(di.ean, expectation.ean)
+            self.assertEqual(di.product_group_id, expectation.product_group_id)
+
+    def test_write_price_file(self):
+        self.assertEqual(self.dut.write_price_file(self.items()), 6)
+        path = os.path.join(self.tmp_dir.name, "DATPREIS.001")
+
+        with open(path, "rb") as file_obj:
+            lines = file_obj.read().decode("cp850").split("\r\n")
+        self.assertEqual(
+            lines[1],
+            "P;A;899977;1;10000;;;;;;;899977;2;9000;;;;;;;101;1;100;;;;;;;",
+        )
+        self.assertEqual(len(lines), 4)
+
+        di = DatanormItem()
+        di.article_id = "899977"
+        di.is_valid = True
+        DatanormPriceFile(path).parse(di)
+        self.assertEqual(di.price_retail, Decimal("100.00"))
+        self.assertEqual(di.price_wholesale, Decimal("90.00"))
+
+    def test_write_product_group_file(self):
+        self.assertEqual(self.dut.write_product_group_file(self.items()), 3)
+        path = os.path.join(self.tmp_dir.name, "DATANORM.WRG")
+
+        di = DatanormItem()
+        di.main_product_group_id = "01"
+        di.product_group_id = "12"
+        di.is_valid = True
+        DatanormProductGroupFile(path).parse(di)
+        self.assertEqual(di.main_product_group_name, "Installationsgeräte & -systeme")
+        self.assertEqual(di.product_group_name, "Sicherungsautomaten & Hauptschalter")
+
+    def test_write_discount_file(self):
+        discounts = [("HB86", "1", Decimal("12.5"), "Hager"), ("HB87", "2", 1, "")]
+        self.assertEqual(self.dut.write_discount_file(iter(discounts)), 2)
+        path = os.path.join(self.tmp_dir.name, "DATANORM.RAB")
+
+        with open(path, "rb") as file_obj:
+            lines = file_obj.read().decode("cp850").split("\r\n")
+        self.assertEqual(lines[1:], ["R;;HB86;1;1250;Hager;;", "R;;HB87;2;1000;;;", ""])
+
+    def test_write_invalid_field(self):
+        di = DatanormItem()
+        di.short_text_1 = "semicolon; inside"
+        with self.assertRaises(ValueError):
+            self.dut.write_base_file(list(self.items()) + [di])
+        # no partial file is left behind
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_write_invalid_product_group_name(self):
+        for name in ("A;B", "A\nB"):
+            di = DatanormItem()
+            di.main_product_group_id = "01"
+            di.main_product_group_name = name
+            with self.assertRaises(ValueError):
+                self.dut.write_product_group_file([di])
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_write_unknown_price_unit(self):
+        di = DatanormItem()
+        di.article_id = "100"
+        di.price_unit = 2
+        self.assertIsNone(di.price_unit_raw)
+        self.dut.write_base_file([di])
+        path = os.path.join(self.tmp_dir.name, "DATANORM.001")
+
+        with open(path, "rb") as file_obj:
+            lines = file_obj.read().decode("cp850").split("\r\n")
+        self.assertEqual(lines[1].split(";")[7], "")
+        self.assertEqual(next(DatanormBaseFile(path).iter_items()).price_unit_raw, "")
@@ -0,0 +1,64 @@
+import datanorm
+import os
+import subprocess
+import sys
+import unittest
+
+# modules, which must not be loaded by "import datanorm"
+HEAVY_MODULES = (
+    "concurrent.futures",
+    "multiprocessing",
+    "numpy",
+    "sqlite3",
+    "datanorm.datanorm_files",
+)
+
+# upper bound of the cumulative import time, far above the expected few ms
+IMPORT_TIME_BUDGET_US = 100000
+
+
+class TestImport(unittest.TestCase):
+
+    def run_python(self, code: str, *options: str) -> subprocess.CompletedProcess:
+        package_root = os.path.dirname(os.path.dirname(datanorm.__file__))
+        env = dict(os.environ, PYTHONPATH=package_root)
+        return subprocess.run(
+            [sys.executable, *options, "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+
+    def import_time(self) -> int:
+        result = self.run_python("import datanorm", "-X", "importtime")
+        # lines of -X importtime: "import time: self [us] | cumulative | module"
+        return next(
+            int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.split("|")[-1].strip() == "datanorm"
+        )
+
+    def test_import_time(self):
+        # best of three runs, so a busy machine does not fail the budget
+        import_time = min(self.import_time() for _ in range(3))
+        self.assertLess(import_time, IMPORT_TIME_BUDGET_US)
+
+    def test_submodules_are_imported_lazily(self):
+        result = self.run_python(
+            "import sys, datanorm; print('\\n'.join(sorted(sys.modules)))"
+        )
+        loaded = set(result.stdout.splitlines())
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, loaded)
+
+    def test_lazy_attributes(self):
+        self.assertIs(datanorm.DatanormItem, datanorm.datanorm_item.DatanormItem)
+        self.assertIn("DatanormBaseFile", dir(datanorm))
+        # names of the module namespace besides the lazy exports
+        self.assertIn("datanorm_item", dir(datanorm))
+        self.assertIn("__file__", dir(datanorm))
+        for name in datanorm.__all__:
+            self.assertIsNotNone(getattr(datanorm, name))
+        with self.assertRaises(AttributeError):
+            datanorm.DatanormUnknown